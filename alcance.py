@@ -0,0 +1,391 @@
+"""
+Módulo para comprobar si los niveles del juego SuperNick se pueden completar.
+Calcula de antemano los arcos de salto que puede hacer Nick con las
+constantes de fisica y, con ellos, construye para cada nivel un grafo de
+alcance entre plataformas. Informa de las plataformas a las que no se puede
+llegar y de las monedas que no se pueden recoger sin simular secuencias de
+entradas, y analiza varios niveles en paralelo en un grupo de procesos.
+
+El análisis es una aproximación: las plataformas solo sostienen a Nick
+desde arriba (como en fisica.detectar_colision_plataforma), la velocidad
+horizontal se puede cambiar en cada paso y no se tienen en cuenta los
+enemigos ni las plataformas que se cruzan en la trayectoria.
+
+Uso:
+    python alcance.py [archivos...] [--procesos N]
+"""
+
+import sys
+import copy
+import json
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import numpy as np
+import pygame
+import fisica
+import niveles
+
+# Dimensiones del mundo (las mismas que main.ANCHO y main.ALTO)
+ANCHO_PANTALLA = 800
+ALTO_PANTALLA = 600
+# Límite inferior de los pies de Nick (Nick.limites)
+Y_SUELO = ALTO_PANTALLA - 50
+# Centro de Nick al empezar y al perder una vida (Nick.reposicionar)
+POSICION_INICIAL = (ANCHO_PANTALLA // 4, ALTO_PANTALLA // 2)
+
+# Los arcos se siguen hasta caer esta distancia por debajo de la salida
+DESCENSO_MAXIMO = ALTO_PANTALLA
+# Diferencias de altura que cubren las tablas de alcance: dy en
+# [-DESPLAZAMIENTO, DESCENSO_MAXIMO]
+DESPLAZAMIENTO = ALTO_PANTALLA
+# Altura de salida de los arcos relativos, lejos del techo
+Y_LEJANA = 100000
+
+# Resultado del análisis de un nivel; los índices son los del archivo
+Resultado = namedtuple("Resultado", ["ruta", "num_plataformas", "num_monedas",
+                                     "plataformas_inalcanzables", "monedas_inalcanzables",
+                                     "segundos"])
+
+class _Cuerpo:
+    """Rectángulo con velocidad vertical que se mueve como Nick."""
+
+    def __init__(self, rect):
+        self.rect = rect
+        self.velocidad_y = 0
+
+def _trayectoria(y_pies, alto, paso_salto=None):
+    """
+    Simula la trayectoria vertical de Nick al dejar una superficie.
+
+    Sigue el mismo orden que Nick.update: gravedad, límites y movimiento.
+
+    Args:
+        y_pies: Altura de los pies de Nick al empezar
+        alto: Alto de Nick
+        paso_salto: Paso en el que salta (None para caer sin saltar)
+
+    Returns:
+        list: (pies, cabeza, bajando) de cada paso, relativos a y_pies; el
+            paso 0 es Nick sobre la superficie
+    """
+    cuerpo = _Cuerpo(pygame.Rect(0, y_pies - alto, 1, alto))
+    limites = (0, 0, 1, 2 * Y_LEJANA)  # Solo el techo: el suelo se aplica al consultar
+    puntos = [(0, -alto, False)]
+    paso = 0
+    while cuerpo.rect.bottom - y_pies <= DESCENSO_MAXIMO:
+        paso += 1
+        if paso == paso_salto:
+            cuerpo.velocidad_y = fisica.VELOCIDAD_SALTO
+        fisica.aplicar_gravedad(cuerpo)
+        fisica.limitar_movimiento(cuerpo, limites)
+        cuerpo.rect.y += cuerpo.velocidad_y
+        puntos.append((cuerpo.rect.bottom - y_pies, cuerpo.rect.top - y_pies, cuerpo.velocidad_y > 0))
+    return puntos
+
+def _pasos_alcance(trayectorias, alto_moneda, num_pasos):
+    """
+    Calcula en qué pasos alcanza cada arco cada diferencia de altura.
+
+    Args:
+        trayectorias: Trayectorias de _trayectoria()
+        alto_moneda: Alto de las monedas
+        num_pasos: Pasos a los que se rellenan las trayectorias
+
+    Returns:
+        tuple: Arrays (arcos x diferencias de altura) con el paso en que se
+            posa en una plataforma (num_pasos si no se posa) y el último
+            paso en que toca una moneda (-1 si no la toca), y los pies en
+            cada paso (arcos x pasos)
+    """
+    forma = (len(trayectorias), num_pasos)
+    # Los pasos de relleno quedan muy por debajo y no cuentan
+    pies = np.full(forma, 2 * Y_LEJANA)
+    cabeza = np.full(forma, 2 * Y_LEJANA)
+    bajando = np.zeros(forma, dtype=bool)
+    for i, trayectoria in enumerate(trayectorias):
+        pies[i, :len(trayectoria)], cabeza[i, :len(trayectoria)], bajando[i, :len(trayectoria)] = \
+            zip(*trayectoria)
+
+    dy = np.arange(-DESPLAZAMIENTO, DESCENSO_MAXIMO + 1)
+    pasos = np.arange(num_pasos)
+
+    # Plataformas: Nick se posa en el primer paso en que, bajando, sus pies
+    # pasan de la altura de la plataforma con la cabeza todavía por encima
+    posa = bajando[:, :, None] & (cabeza[:, :, None] < dy) & (dy < pies[:, :, None])
+    aterrizaje = np.where(posa.any(axis=1), posa.argmax(axis=1), num_pasos)
+
+    # Monedas: cualquier paso en que Nick se solapa con ellas en vertical
+    solapa = (cabeza[:, :, None] < dy + alto_moneda) & (dy < pies[:, :, None])
+    moneda = np.where(solapa, pasos[None, :, None], -1).max(axis=1)
+    return aterrizaje, moneda, pies
+
+class ArcosSalto:
+    """
+    Arcos de salto de Nick y pasos en que alcanzan cada diferencia de altura.
+
+    El arco k cae k pasos tras salir por el borde de la superficie y luego
+    salta (como Nick conserva en_suelo hasta que salta, puede saltar en el
+    aire); el arco 0 salta desde la superficie y el último cae sin saltar.
+    """
+
+    def __init__(self, y_pies, tamaño_nick, tamaño_moneda, saltos=True):
+        """
+        Args:
+            y_pies: Altura de los pies de Nick en la salida (Y_LEJANA para
+                arcos que no tocan el techo)
+            tamaño_nick: (ancho, alto) de Nick
+            tamaño_moneda: (ancho, alto) de las monedas
+            saltos: False para calcular solo la caída sin saltar
+        """
+        self.alto_nick = tamaño_nick[1]
+        self.alto_moneda = tamaño_moneda[1]
+        caida = _trayectoria(y_pies, self.alto_nick)
+        self.pasos_salto = list(range(1, len(caida))) if saltos else []
+        self.trayectorias = [_trayectoria(y_pies, self.alto_nick, paso) for paso in self.pasos_salto]
+        self.pasos_salto.append(None)
+        self.trayectorias.append(caida)
+
+        self.num_pasos = max(len(trayectoria) for trayectoria in self.trayectorias)
+        self.cabeza_minima = np.array([min(cabeza for _, cabeza, _ in trayectoria)
+                                       for trayectoria in self.trayectorias])
+        self.aterrizaje, self.moneda, self.pies = _pasos_alcance(self.trayectorias, self.alto_moneda,
+                                                                 self.num_pasos)
+
+    def desde(self, y_pies):
+        """
+        Adapta arcos calculados lejos del techo a una salida desde y_pies.
+
+        Solo se vuelven a simular los arcos que chocan con el techo.
+
+        Args:
+            y_pies: Altura de la superficie de salida
+
+        Returns:
+            ArcosSalto: Estos mismos arcos si ninguno toca el techo, o una copia
+        """
+        tocan = np.flatnonzero(y_pies + self.cabeza_minima < 0)
+        if not len(tocan):
+            return self
+        trayectorias = [_trayectoria(y_pies, self.alto_nick, self.pasos_salto[i]) for i in tocan]
+        aterrizaje, moneda, pies = _pasos_alcance(trayectorias, self.alto_moneda, self.num_pasos)
+        copia = copy.copy(self)
+        copia.aterrizaje = self.aterrizaje.copy()
+        copia.moneda = self.moneda.copy()
+        copia.pies = self.pies.copy()
+        copia.aterrizaje[tocan], copia.moneda[tocan], copia.pies[tocan] = aterrizaje, moneda, pies
+        return copia
+
+    def tablas(self, y_pies):
+        """
+        Calcula las tablas de alcance desde una superficie.
+
+        Un arco termina al llegar al suelo, que depende de la altura de salida.
+
+        Args:
+            y_pies: Altura de la superficie de salida
+
+        Returns:
+            tuple: (plataformas, monedas), arrays indexados por dy + DESPLAZAMIENTO
+                con el paso más tardío en que se alcanza esa diferencia de
+                altura (-1 si no se alcanza)
+        """
+        # Paso en que cada arco llega al suelo
+        fin = (self.pies > Y_SUELO - y_pies).argmax(axis=1)[:, None]
+        plataformas = np.where(self.aterrizaje <= fin, self.aterrizaje, -1).max(axis=0)
+        # Tras llegar al suelo solo podría tocar monedas a ras de suelo, que
+        # también toca al llegar
+        monedas = np.where(self.moneda >= 0, np.minimum(self.moneda, fin), -1).max(axis=0)
+        return plataformas, monedas
+
+# Arcos y tablas ya calculados en este proceso
+_arcos = {}
+_tablas = {}
+
+def tablas_alcance(y_pies, tamaño_nick, tamaño_moneda):
+    """
+    Devuelve las tablas de alcance desde una altura, calculándolas una vez por proceso.
+
+    Los arcos que no llegan al techo son iguales desde cualquier altura y se
+    comparten; desde las superficies más altas se simulan de nuevo los que
+    chocan con el techo.
+
+    Args:
+        y_pies: Altura de la superficie de salida
+        tamaño_nick: (ancho, alto) de Nick
+        tamaño_moneda: (ancho, alto) de las monedas
+
+    Returns:
+        tuple: (plataformas, monedas), ver ArcosSalto.tablas()
+    """
+    clave = (y_pies, tamaño_nick, tamaño_moneda)
+    if clave not in _tablas:
+        relativos = (tamaño_nick, tamaño_moneda)
+        if relativos not in _arcos:
+            _arcos[relativos] = ArcosSalto(Y_LEJANA, tamaño_nick, tamaño_moneda)
+        _tablas[clave] = _arcos[relativos].desde(y_pies).tablas(y_pies)
+    return _tablas[clave]
+
+def _consultar(tabla, dy):
+    """Valores de una tabla de alcance para un array de diferencias de altura."""
+    indices = dy + DESPLAZAMIENTO
+    fuera = (indices < 0) | (indices >= len(tabla))
+    indices[fuera] = 0
+    pasos = tabla[indices]
+    pasos[fuera] = -1
+    return pasos
+
+def _separacion(izquierda_a, derecha_a, izquierda_b, derecha_b):
+    """Distancia horizontal entre dos rangos de posiciones (0 si se solapan)."""
+    return np.maximum(0, np.maximum(izquierda_b - derecha_a, izquierda_a - derecha_b))
+
+def analizar(ruta, tamaño_nick, tamaño_moneda):
+    """
+    Analiza un nivel: qué plataformas se alcanzan y qué monedas se pueden recoger.
+
+    Args:
+        ruta: Archivo JSON del nivel
+        tamaño_nick: (ancho, alto) de Nick
+        tamaño_moneda: (ancho, alto) de las monedas
+
+    Returns:
+        Resultado: Índices de las plataformas y monedas inalcanzables
+    """
+    inicio = time.perf_counter()
+    tamaño_nick, tamaño_moneda = tuple(tamaño_nick), tuple(tamaño_moneda)
+    with open(ruta, encoding="utf-8") as f:
+        definicion = json.load(f)
+    plataformas = np.array(definicion.get("plataformas", []), dtype=np.int64).reshape(-1, 4)
+    monedas = np.array(definicion.get("monedas", []), dtype=np.int64).reshape(-1, 2)
+    ancho_nick, alto_nick = tamaño_nick
+    ancho_moneda, alto_moneda = tamaño_moneda
+
+    # Las plataformas largas (como el suelo) se parten en tramos de una
+    # pantalla, para que las consultas por posición solo revisen las cercanas
+    num_tramos = np.maximum(-(-plataformas[:, 2] // ANCHO_PANTALLA), 1)
+    origen = np.repeat(np.arange(len(plataformas)), num_tramos)
+    desplazamiento = (np.arange(len(origen)) - np.repeat(np.cumsum(num_tramos) - num_tramos, num_tramos)) \
+        * ANCHO_PANTALLA
+    x_tramos = plataformas[origen, 0] + desplazamiento
+    anchos_tramos = np.minimum(plataformas[origen, 2] - desplazamiento, ANCHO_PANTALLA)
+
+    # Posiciones del borde izquierdo de Nick en las que toca cada tramo y
+    # cada moneda, dentro del ancho del mundo
+    ancho_mundo = max(ANCHO_PANTALLA, int((plataformas[:, 0] + plataformas[:, 2]).max(initial=0)))
+    x_maxima = ancho_mundo - ancho_nick
+    izquierda = np.maximum(x_tramos - ancho_nick + 1, 0)
+    derecha = np.minimum(x_tramos + anchos_tramos - 1, x_maxima)
+    alturas = plataformas[origen, 1]
+    izquierda_monedas = np.maximum(monedas[:, 0] - ancho_nick + 1, 0)
+    derecha_monedas = np.minimum(monedas[:, 0] + ancho_moneda - 1, x_maxima)
+
+    # Índices ordenados por posición para consultar solo los cercanos
+    orden_plataformas = np.argsort(izquierda, kind="stable")
+    izquierda_ordenada = izquierda[orden_plataformas]
+    orden_monedas = np.argsort(izquierda_monedas, kind="stable")
+    izquierda_monedas_ordenada = izquierda_monedas[orden_monedas]
+    ancho_maximo = int((derecha - izquierda).max(initial=0))
+    ancho_maximo_monedas = int((derecha_monedas - izquierda_monedas).max(initial=0))
+
+    alcanzadas = np.zeros(len(origen), dtype=bool)
+    recogidas = np.zeros(len(monedas), dtype=bool)
+    pendientes = []
+
+    def explorar(izquierda_a, derecha_a, y_pies, tablas):
+        """Marca lo que se alcanza desde un rango de posiciones a una altura."""
+        tabla_plataformas, tabla_monedas = tablas
+        # Distancia horizontal máxima en el arco más largo
+        alcance = fisica.VELOCIDAD_MOVIMIENTO * max(int(tabla_plataformas.max()), int(tabla_monedas.max()), 0)
+        inicio_rango = np.searchsorted(izquierda_ordenada, izquierda_a - alcance - ancho_maximo)
+        fin_rango = np.searchsorted(izquierda_ordenada, derecha_a + alcance, side="right")
+        candidatas = orden_plataformas[inicio_rango:fin_rango]
+        candidatas = candidatas[~alcanzadas[candidatas]]
+        pasos = _consultar(tabla_plataformas, alturas[candidatas] - y_pies)
+        separacion = _separacion(izquierda_a, derecha_a, izquierda[candidatas], derecha[candidatas])
+        nuevas = candidatas[(pasos >= 0) & (separacion <= fisica.VELOCIDAD_MOVIMIENTO * pasos)
+                            & (izquierda[candidatas] <= derecha[candidatas])]
+        alcanzadas[nuevas] = True
+        pendientes.extend(nuevas.tolist())
+
+        inicio_rango = np.searchsorted(izquierda_monedas_ordenada, izquierda_a - alcance - ancho_maximo_monedas)
+        fin_rango = np.searchsorted(izquierda_monedas_ordenada, derecha_a + alcance, side="right")
+        candidatas = orden_monedas[inicio_rango:fin_rango]
+        candidatas = candidatas[~recogidas[candidatas]]
+        pasos = _consultar(tabla_monedas, monedas[candidatas, 1] - y_pies)
+        separacion = _separacion(izquierda_a, derecha_a,
+                                 izquierda_monedas[candidatas], derecha_monedas[candidatas])
+        recogidas[candidatas[(pasos >= 0) & (separacion <= fisica.VELOCIDAD_MOVIMIENTO * pasos)
+                             & (izquierda_monedas[candidatas] <= derecha_monedas[candidatas])]] = True
+
+    # Al empezar Nick cae desde su posición inicial sin poder saltar
+    x_inicial = POSICION_INICIAL[0] - ancho_nick // 2
+    y_inicial = POSICION_INICIAL[1] - alto_nick // 2 + alto_nick
+    caida = ArcosSalto(y_inicial, tamaño_nick, tamaño_moneda, saltos=False)
+    explorar(x_inicial, x_inicial, y_inicial, caida.tablas(y_inicial))
+
+    while pendientes:
+        a = pendientes.pop()
+        y_pies = int(alturas[a])
+        explorar(izquierda[a], derecha[a], y_pies, tablas_alcance(y_pies, tamaño_nick, tamaño_moneda))
+
+    plataformas_alcanzadas = np.zeros(len(plataformas), dtype=bool)
+    plataformas_alcanzadas[origen[alcanzadas]] = True
+    return Resultado(ruta, len(plataformas), len(monedas),
+                     np.flatnonzero(~plataformas_alcanzadas).tolist(), np.flatnonzero(~recogidas).tolist(),
+                     time.perf_counter() - inicio)
+
+def analizar_niveles(rutas, tamaño_nick, tamaño_moneda, procesos=None):
+    """
+    Analiza varios niveles en paralelo en un grupo de procesos.
+
+    Args:
+        rutas: Archivos JSON de los niveles
+        tamaño_nick: (ancho, alto) de Nick
+        tamaño_moneda: (ancho, alto) de las monedas
+        procesos: Número de procesos (None para uno por núcleo)
+
+    Returns:
+        list: Resultado de cada nivel, en el mismo orden que rutas
+    """
+    rutas = list(rutas)
+    if len(rutas) <= 1 or procesos == 1:
+        return [analizar(ruta, tamaño_nick, tamaño_moneda) for ruta in rutas]
+    with ProcessPoolExecutor(max_workers=procesos) as grupo:
+        return list(grupo.map(analizar, rutas, repeat(tamaño_nick), repeat(tamaño_moneda)))
+
+if __name__ == "__main__":
+    import argparse
+    import simulacion
+    import main
+
+    parser = argparse.ArgumentParser(description="Comprobar si los niveles de SuperNick se pueden completar")
+    parser.add_argument("archivos", nargs="*", help="Archivos de niveles (por defecto los de assets/niveles)")
+    parser.add_argument("--procesos", type=int, help="Número de procesos (por defecto uno por núcleo)")
+    opciones = parser.parse_args()
+
+    rutas = opciones.archivos or [niveles.ruta_nivel(numero) for numero in niveles.numeros_disponibles()]
+    # El tamaño de Nick y de las monedas es el de sus imágenes
+    simulacion.inicializar_sin_ventana()
+    tamaño_nick = main.Nick().rect.size
+    tamaño_moneda = main.Moneda(0, 0).rect.size
+
+    inicio = time.perf_counter()
+    resultados = analizar_niveles(rutas, tamaño_nick, tamaño_moneda, opciones.procesos)
+    duracion = time.perf_counter() - inicio
+
+    con_problemas = 0
+    for resultado in resultados:
+        estado = "ok"
+        if resultado.plataformas_inalcanzables or resultado.monedas_inalcanzables:
+            estado = (f"{len(resultado.plataformas_inalcanzables)} plataformas inalcanzables, "
+                      f"{len(resultado.monedas_inalcanzables)} monedas sin recoger")
+            con_problemas += 1
+        print(f"{resultado.ruta}: {resultado.num_plataformas} plataformas, {resultado.num_monedas} monedas, "
+              f"{resultado.segundos * 1000:.1f} ms - {estado}")
+        if resultado.plataformas_inalcanzables:
+            print(f"  plataformas: {resultado.plataformas_inalcanzables[:20]}")
+        if resultado.monedas_inalcanzables:
+            print(f"  monedas: {resultado.monedas_inalcanzables[:20]}")
+    print(f"{len(resultados)} niveles en {duracion:.2f} s, {con_problemas} con problemas")
+    sys.exit(1 if con_problemas else 0)
@@ -0,0 +1,419 @@
+"""
+Módulo de benchmarks del juego SuperNick.
+Ejecuta escenarios con entradas fijas sin ventana y mide la distribución
+del tiempo por frame (lógica y dibujado), la memoria reservada por frame y
+el tiempo de arranque. Los resultados se guardan en JSON y se comparan con
+una referencia guardada, marcando como regresión lo que supere los umbrales.
+
+Uso:
+    python benchmark.py                       Ejecutar y comparar con la referencia
+    python benchmark.py --guardar-referencia  Ejecutar y guardar como referencia
+    python benchmark.py --escenarios nivel1 menu_reposo
+    python benchmark.py --grabaciones grabaciones/partida.snr
+"""
+
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import numpy as np
+import pygame
+
+import simulacion
+import repeticion
+import generador
+import main
+
+# Archivos de resultados
+DIR_BENCHMARKS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+RUTA_REFERENCIA = os.path.join(DIR_BENCHMARKS, "referencia.json")
+RUTA_RESULTADOS = os.path.join(DIR_BENCHMARKS, "ultimo.json")
+
+# Frames medidos por escenario y frames previos de calentamiento
+FRAMES = 600
+FRAMES_CALENTAMIENTO = 60
+FRAMES_MEMORIA = 120  # Frames medidos con tracemalloc (es lento)
+REPETICIONES_REINICIO = 20
+FRAMES_REINICIO = 300  # Frames jugados antes de cada reinicio
+REPETICIONES_ARRANQUE = 5
+FRAMES_ROLLBACK = 8  # Pasos que se vuelven a simular en cada frame del escenario rollback
+
+# Niveles de estrés generados: nombre -> (plataformas, enemigos, monedas)
+NIVELES_ESTRES = {
+    "estres_monedas": (20, 0, 3000),
+    "estres_enemigos": (20, 3000, 20),
+    "estres_escala": (20000, 20000, 20000),
+}
+SEMILLA_ESTRES = 1
+VIDAS_ESTRES = 10 ** 6
+
+# Regresión si métrica_nueva > métrica_referencia * umbral
+UMBRALES = {
+    "p50_ms": 1.15,
+    "p99_ms": 1.30,
+    "kb_por_frame": 1.25,
+    "kb_por_reinicio": 1.25,
+    "arranque_ms": 1.20,
+}
+# Por debajo de este valor absoluto no se considera regresión (ruido)
+MINIMOS = {
+    "p50_ms": 0.05,
+    "p99_ms": 0.5,
+    "kb_por_frame": 1.0,
+    "kb_por_reinicio": 4.0,
+    "arranque_ms": 5.0,
+}
+
+def distribucion(segundos):
+    """
+    Resume una lista de duraciones.
+
+    Args:
+        segundos: Duraciones en segundos
+
+    Returns:
+        dict: Media, p50, p90, p99 y máximo en milisegundos
+    """
+    ms = np.asarray(segundos) * 1000
+    p50, p90, p99 = np.percentile(ms, (50, 90, 99))
+    return {"media_ms": float(ms.mean()), "p50_ms": float(p50), "p90_ms": float(p90),
+            "p99_ms": float(p99), "max_ms": float(ms.max())}
+
+def entradas_guion(frame):
+    """
+    Entradas fijas de los escenarios de partida: avanzar a la derecha con
+    un salto cada 45 frames y un tramo hacia la izquierda cada 300.
+    """
+    izquierda = frame % 300 >= 240
+    return simulacion.Entradas(izquierda, not izquierda, frame % 45 == 0)
+
+class EscenarioPartida:
+    """Partida en un nivel con las entradas del guion, reiniciada si termina."""
+
+    def __init__(self, nivel_numero=1, ruta=None, vidas=None, historial=0):
+        """
+        Args:
+            nivel_numero: Número del nivel
+            ruta: Archivo del nivel (None para el de assets/niveles)
+            vidas: Vidas de Nick (None para las normales); los niveles de
+                estrés dan muchas para que la partida no se reinicie sin parar
+            historial: Pasos que guarda la simulación para rebobinar
+        """
+        self.nivel_numero = nivel_numero
+        self.ruta = ruta
+        self.vidas = vidas
+        self.superficie = pygame.Surface((main.ANCHO, main.ALTO)).convert()
+        self.simulacion = simulacion.Simulacion(self.nivel_numero, self.ruta, historial)
+        self.reiniciar()
+
+    def reiniciar(self):
+        # Como al reintentar en el juego: se reutilizan el nivel y Nick
+        self.simulacion.reiniciar()
+        if self.vidas is not None:
+            self.simulacion.nick.vidas = self.vidas
+
+    def entradas(self):
+        return entradas_guion(self.simulacion.frame)
+
+    def frame(self):
+        """
+        Ejecuta un frame: un paso de lógica y el dibujado completo.
+
+        Returns:
+            tuple: (segundos de lógica, segundos de dibujado)
+        """
+        if self.simulacion.terminada:
+            self.reiniciar()
+        sim = self.simulacion
+        inicio = time.perf_counter()
+        sim.step(self.entradas())
+        medio = time.perf_counter()
+        sim.nivel.enfocar(sim.nick)
+        sim.nivel.dibujar_estatico(self.superficie)
+        main.dibujar_partida(self.superficie, sim.nivel, sim.nick, sim.todos_los_sprites)
+        return medio - inicio, time.perf_counter() - medio
+
+class EscenarioRollback(EscenarioPartida):
+    """
+    Partida que en cada frame vuelve FRAMES_ROLLBACK pasos atrás y los
+    simula de nuevo antes de avanzar, como un rollback en cada tick.
+    """
+
+    def __init__(self, nivel_numero=1, ruta=None, vidas=None):
+        super().__init__(nivel_numero, ruta, vidas, historial=FRAMES_ROLLBACK + 1)
+
+    def frame(self):
+        sim = self.simulacion
+        if sim.terminada:
+            self.reiniciar()
+        inicio = time.perf_counter()
+        if sim.frame >= FRAMES_ROLLBACK:
+            hasta = sim.frame
+            sim.rebobinar(hasta - FRAMES_ROLLBACK)
+            while sim.frame < hasta and not sim.terminada:
+                sim.step(entradas_guion(sim.frame))
+        sim.step(self.entradas())
+        medio = time.perf_counter()
+        sim.nivel.enfocar(sim.nick)
+        sim.nivel.dibujar_estatico(self.superficie)
+        main.dibujar_partida(self.superficie, sim.nivel, sim.nick, sim.todos_los_sprites)
+        return medio - inicio, time.perf_counter() - medio
+
+class EscenarioGrabacion(EscenarioPartida):
+    """Partida grabada con --grabar, repetida desde el principio al terminar."""
+
+    def __init__(self, ruta_grabacion):
+        self.reproduccion = simulacion.Reproduccion(repeticion.Grabacion.leer(ruta_grabacion))
+        super().__init__()
+
+    def reiniciar(self):
+        self.simulacion = self.reproduccion.desde_clave(0)
+
+    def entradas(self):
+        grabacion = self.reproduccion.grabacion
+        if self.simulacion.frame >= grabacion.num_frames:
+            self.reiniciar()
+        return simulacion.Entradas(*grabacion.entradas_del_paso(self.simulacion.frame))
+
+class EscenarioMenu:
+    """Menú principal sin actividad, con un cambio de opción cada 30 frames."""
+
+    def __init__(self):
+        self.superficie = pygame.Surface((main.ANCHO, main.ALTO)).convert()
+        self.menu = main.Menu()
+        self.num_frame = 0
+
+    def frame(self):
+        self.num_frame += 1
+        inicio = time.perf_counter()
+        if self.num_frame % 30 == 0:
+            self.menu.manejar_eventos(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_DOWN))
+        medio = time.perf_counter()
+        self.menu.dibujar(self.superficie)
+        return medio - inicio, time.perf_counter() - medio
+
+def medir_frames(escenario):
+    """
+    Mide la distribución de tiempos y la memoria reservada por frame.
+
+    Returns:
+        dict: Distribuciones de lógica, dibujado y total, y memoria por frame
+    """
+    for _ in range(FRAMES_CALENTAMIENTO):
+        escenario.frame()
+
+    logica, dibujado = [], []
+    gc.collect()
+    bloques_inicio = sys.getallocatedblocks()
+    for _ in range(FRAMES):
+        t_logica, t_dibujado = escenario.frame()
+        logica.append(t_logica)
+        dibujado.append(t_dibujado)
+    bloques_fin = sys.getallocatedblocks()
+
+    # Memoria reservada durante cada frame (pico menos la del inicio del
+    # frame), en una pasada aparte porque tracemalloc ralentiza mucho
+    tracemalloc.start()
+    reservado = []
+    for _ in range(FRAMES_MEMORIA):
+        antes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        escenario.frame()
+        reservado.append(tracemalloc.get_traced_memory()[1] - antes)
+    tracemalloc.stop()
+
+    total = np.add(logica, dibujado)
+    resultado = {"total": distribucion(total), "logica": distribucion(logica),
+                 "dibujado": distribucion(dibujado)}
+    resultado["p50_ms"] = resultado["total"]["p50_ms"]
+    resultado["p99_ms"] = resultado["total"]["p99_ms"]
+    resultado["kb_por_frame"] = float(np.mean(reservado)) / 1024
+    resultado["bloques_netos_por_frame"] = (bloques_fin - bloques_inicio) / FRAMES
+    return resultado
+
+def medir_reinicio():
+    """
+    Mide el reintento de una partida en cada nivel tras jugar unos frames,
+    y la memoria que reserva.
+    """
+    simulaciones = [simulacion.Simulacion(numero) for numero in main.niveles.numeros_disponibles()]
+
+    def jugar_y_reiniciar(simulacion_nivel):
+        simulacion_nivel.ejecutar(entradas_guion(frame) for frame in range(FRAMES_REINICIO))
+        inicio = time.perf_counter()
+        simulacion_nivel.reiniciar()
+        return time.perf_counter() - inicio
+
+    duraciones = [jugar_y_reiniciar(simulacion_nivel)
+                  for _ in range(REPETICIONES_REINICIO) for simulacion_nivel in simulaciones]
+
+    reservado = []
+    for simulacion_nivel in simulaciones:
+        simulacion_nivel.ejecutar(entradas_guion(frame) for frame in range(FRAMES_REINICIO))
+        tracemalloc.start()
+        simulacion_nivel.reiniciar()
+        reservado.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+
+    resultado = {"total": distribucion(duraciones)}
+    resultado["p50_ms"] = resultado["total"]["p50_ms"]
+    resultado["p99_ms"] = resultado["total"]["p99_ms"]
+    resultado["kb_por_reinicio"] = float(np.mean(reservado)) / 1024
+    return resultado
+
+def medir_arranque():
+    """
+    Lanza procesos nuevos que arrancan el juego hasta el primer frame del menú.
+
+    Returns:
+        dict: Tiempo total del proceso y de cada fase (mediana de las repeticiones)
+    """
+    totales = []
+    fases = {}
+    entorno = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    for _ in range(REPETICIONES_ARRANQUE):
+        inicio = time.perf_counter()
+        salida = subprocess.run([sys.executable, os.path.abspath(__file__), "--proceso-arranque"],
+                                env=entorno, capture_output=True, text=True, check=True).stdout
+        totales.append(time.perf_counter() - inicio)
+        for nombre, segundos in json.loads(salida.strip().splitlines()[-1]):
+            fases.setdefault(nombre, []).append(segundos * 1000)
+    return {"arranque_ms": float(np.median(totales) * 1000),
+            "fases_ms": {nombre: float(np.median(valores)) for nombre, valores in fases.items()}}
+
+def proceso_arranque():
+    """Arranque medido dentro del proceso hijo de medir_arranque()."""
+    cronometro = main.rendimiento.CronometroArranque(main.INICIO_PROCESO)
+    cronometro.marcar("importación")
+    main.inicializar(cronometro)
+    menu = main.Menu()
+    pygame.display.update(menu.dibujar(main.pantalla))
+    cronometro.marcar("primer frame")
+    print(json.dumps(cronometro.fases))
+
+def escenarios_disponibles(grabaciones=()):
+    """
+    Devuelve los escenarios por nombre.
+
+    Args:
+        grabaciones: Archivos de partidas grabadas que se añaden como escenarios
+
+    Returns:
+        dict: nombre -> función que ejecuta el escenario y devuelve sus resultados
+    """
+    escenarios = {}
+    for numero in main.niveles.numeros_disponibles():
+        escenarios[f"nivel{numero}"] = lambda numero=numero: medir_frames(EscenarioPartida(numero))
+    escenarios["menu_reposo"] = lambda: medir_frames(EscenarioMenu())
+    for nombre, (plataformas, enemigos, monedas) in NIVELES_ESTRES.items():
+        escenarios[nombre] = lambda cantidades=(plataformas, enemigos, monedas): medir_frames(
+            EscenarioPartida(ruta=generador.generar_archivo(*cantidades, SEMILLA_ESTRES),
+                             vidas=VIDAS_ESTRES))
+    escenarios["rollback"] = lambda: medir_frames(EscenarioRollback(1))
+    escenarios["rollback_estres"] = lambda: medir_frames(EscenarioRollback(
+        ruta=generador.generar_archivo(*NIVELES_ESTRES["estres_escala"], SEMILLA_ESTRES), vidas=VIDAS_ESTRES))
+    escenarios["reinicio"] = medir_reinicio
+    escenarios["arranque"] = medir_arranque
+    for ruta in grabaciones:
+        nombre = os.path.splitext(os.path.basename(ruta))[0]
+        escenarios[f"grabacion_{nombre}"] = lambda ruta=ruta: medir_frames(EscenarioGrabacion(ruta))
+    return escenarios
+
+def comparar(resultados, referencia):
+    """
+    Compara los resultados con la referencia.
+
+    Returns:
+        list: (escenario, métrica, referencia, nuevo, proporción, es_regresión)
+    """
+    filas = []
+    for escenario, metricas in resultados["escenarios"].items():
+        anterior = referencia.get("escenarios", {}).get(escenario)
+        if anterior is None:
+            continue
+        for metrica, umbral in UMBRALES.items():
+            if metrica not in metricas or metrica not in anterior:
+                continue
+            nuevo, viejo = metricas[metrica], anterior[metrica]
+            proporcion = nuevo / viejo if viejo > 0 else float("inf")
+            regresion = nuevo > viejo * umbral and nuevo - viejo > MINIMOS[metrica]
+            filas.append((escenario, metrica, viejo, nuevo, proporcion, regresion))
+    return filas
+
+def guardar(ruta, datos):
+    """Guarda un JSON de forma atómica."""
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta + ".tmp", "w") as f:
+        json.dump(datos, f, indent=2)
+    os.replace(ruta + ".tmp", ruta)
+
+def ejecutar(nombres=None, grabaciones=()):
+    """
+    Ejecuta los escenarios indicados (todos si nombres es None).
+
+    Args:
+        nombres: Nombres de los escenarios
+        grabaciones: Archivos de partidas grabadas que se añaden como escenarios
+
+    Returns:
+        dict: Resultados con información del equipo
+    """
+    simulacion.inicializar_sin_ventana()
+    resultados = {"python": platform.python_version(), "pygame": pygame.version.ver,
+                  "plataforma": platform.platform(), "frames": FRAMES, "escenarios": {}}
+    escenarios = escenarios_disponibles(grabaciones)
+    for nombre in nombres or escenarios:
+        print(f"  {nombre}...", end="", flush=True)
+        resultados["escenarios"][nombre] = escenarios[nombre]()
+        metricas = resultados["escenarios"][nombre]
+        resumen = ", ".join(f"{clave} {metricas[clave]:.2f}" for clave in UMBRALES if clave in metricas)
+        print(f" {resumen}")
+    return resultados
+
+def procesar_argumentos(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de SuperNick")
+    parser.add_argument("--escenarios", nargs="+", help="Escenarios a ejecutar (por defecto todos)")
+    parser.add_argument("--grabaciones", nargs="+", default=[],
+                        help="Partidas grabadas con --grabar que se añaden como escenarios")
+    parser.add_argument("--guardar-referencia", action="store_true",
+                        help="Guardar los resultados como nueva referencia")
+    parser.add_argument("--referencia", default=RUTA_REFERENCIA, help="Archivo de referencia")
+    parser.add_argument("--salida", default=RUTA_RESULTADOS, help="Archivo de resultados")
+    parser.add_argument("--proceso-arranque", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args(argumentos)
+
+if __name__ == "__main__":
+    opciones = procesar_argumentos()
+    if opciones.proceso_arranque:
+        proceso_arranque()
+        sys.exit(0)
+
+    print("Ejecutando benchmarks:")
+    resultados = ejecutar(opciones.escenarios, opciones.grabaciones)
+    guardar(opciones.salida, resultados)
+    print(f"Resultados guardados en {opciones.salida}")
+
+    if opciones.guardar_referencia:
+        guardar(opciones.referencia, resultados)
+        print(f"Referencia guardada en {opciones.referencia}")
+        sys.exit(0)
+
+    if not os.path.exists(opciones.referencia):
+        print("No hay referencia con la que comparar (usa --guardar-referencia)")
+        sys.exit(0)
+
+    with open(opciones.referencia) as f:
+        filas = comparar(resultados, json.load(f))
+    regresiones = 0
+    print(f"\n{'escenario':<18}{'métrica':<14}{'referencia':>12}{'actual':>12}{'cambio':>9}")
+    for escenario, metrica, viejo, nuevo, proporcion, regresion in filas:
+        marca = "  REGRESIÓN" if regresion else ""
+        print(f"{escenario:<18}{metrica:<14}{viejo:>12.3f}{nuevo:>12.3f}{(proporcion - 1) * 100:>+8.1f}%{marca}")
+        regresiones += regresion
+    print(f"\n{regresiones} regresiones")
+    sys.exit(1 if regresiones else 0)
@@ -1,13 +1,24 @@
 """
 Módulo para gestionar la configuración del juego SuperNick.
+La configuración se carga del disco la primera vez que se consulta, no al
+importar el módulo. Los cambios se acumulan en memoria y un hilo en segundo
+plano los escribe poco después del último cambio, reemplazando el archivo
+de forma atómica; lo pendiente se guarda también al salir.
 """
 
 import os
+import copy
 import json
+import time
+import atexit
+import threading
 
 # Ruta del archivo de configuración
 CONFIG_FILE = "config.json"
 
+# Segundos sin cambios que espera el hilo escritor antes de guardar
+RETARDO_GUARDADO = 0.5
+
 # Configuración por defecto
 DEFAULT_CONFIG = {
     "pantalla": {
@@ -36,6 +47,16 @@ DEFAULT_CONFIG = {
 # Variable global para almacenar la configuración actual
 config = {}
 
+# Protege config frente al hilo escritor
+_cerrojo = threading.RLock()
+# Avisa al hilo escritor de que hay cambios
+_hay_cambios = threading.Condition(_cerrojo)
+_cambios_pendientes = False
+_ultimo_cambio = 0.0
+_escritor = None
+# Evita que dos escrituras del archivo se solapen
+_cerrojo_archivo = threading.Lock()
+
 def cargar_configuracion():
     """
     Carga la configuración desde el archivo. Si no existe, crea uno con la configuración por defecto.
@@ -45,42 +66,96 @@ def cargar_configuracion():
     """
     global config
     
-    try:
-        if os.path.exists(CONFIG_FILE):
-            with open(CONFIG_FILE, 'r') as f:
-                config = json.load(f)
-                
-            # Verificar que todas las claves existan, si no, usar valores por defecto
-            for seccion, valores in DEFAULT_CONFIG.items():
-                if seccion not in config:
-                    config[seccion] = valores
-                else:
-                    for clave, valor in valores.items():
-                        if clave not in config[seccion]:
-                            config[seccion][clave] = valor
-        else:
-            config = DEFAULT_CONFIG.copy()
-            guardar_configuracion()
-    except Exception as e:
-        print(f"Error al cargar la configuración: {e}")
-        config = DEFAULT_CONFIG.copy()
-        
-    return config
+    with _cerrojo:
+        try:
+            if os.path.exists(CONFIG_FILE):
+                with open(CONFIG_FILE, 'r') as f:
+                    config = json.load(f)
+                    
+                # Verificar que todas las claves existan, si no, usar valores por defecto
+                for seccion, valores in DEFAULT_CONFIG.items():
+                    if seccion not in config:
+                        config[seccion] = copy.deepcopy(valores)
+                    else:
+                        for clave, valor in valores.items():
+                            if clave not in config[seccion]:
+                                config[seccion][clave] = copy.deepcopy(valor)
+            else:
+                config = copy.deepcopy(DEFAULT_CONFIG)
+                programar_guardado()
+        except Exception as e:
+            print(f"Error al cargar la configuración: {e}")
+            config = copy.deepcopy(DEFAULT_CONFIG)
+            
+        return config
 
 def guardar_configuracion():
     """
-    Guarda la configuración actual en el archivo.
+    Guarda ya la configuración actual en el archivo, sin esperar al hilo escritor.
+    
+    El archivo se escribe en uno temporal que luego reemplaza al original,
+    así que un fallo a mitad de escritura nunca deja un archivo truncado.
     
     Returns:
         bool: True si se guardó correctamente, False en caso contrario
     """
-    try:
-        with open(CONFIG_FILE, 'w') as f:
-            json.dump(config, f, indent=4)
-        return True
-    except Exception as e:
-        print(f"Error al guardar la configuración: {e}")
-        return False
+    global _cambios_pendientes
+    
+    with _cerrojo_archivo:
+        with _cerrojo:
+            texto = json.dumps(config, indent=4)
+            _cambios_pendientes = False
+            
+        try:
+            ruta_temporal = CONFIG_FILE + ".tmp"
+            with open(ruta_temporal, 'w') as f:
+                f.write(texto)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(ruta_temporal, CONFIG_FILE)
+            return True
+        except Exception as e:
+            print(f"Error al guardar la configuración: {e}")
+            return False
+
+def programar_guardado():
+    """
+    Marca la configuración como modificada para que la guarde el hilo escritor.
+    No accede al disco, así que se puede llamar desde el bucle del juego.
+    """
+    global _cambios_pendientes, _ultimo_cambio, _escritor
+    
+    with _hay_cambios:
+        _cambios_pendientes = True
+        _ultimo_cambio = time.monotonic()
+        if _escritor is None:
+            _escritor = threading.Thread(target=_escribir_en_segundo_plano,
+                                         name="configuracion", daemon=True)
+            _escritor.start()
+        _hay_cambios.notify()
+
+def _escribir_en_segundo_plano():
+    """Bucle del hilo escritor: guarda cuando pasa RETARDO_GUARDADO sin cambios."""
+    while True:
+        with _hay_cambios:
+            while not _cambios_pendientes:
+                _hay_cambios.wait()
+            # Agrupar los cambios seguidos: esperar hasta que pasen
+            # RETARDO_GUARDADO segundos sin ninguno nuevo
+            while True:
+                restante = _ultimo_cambio + RETARDO_GUARDADO - time.monotonic()
+                if restante <= 0:
+                    break
+                _hay_cambios.wait(restante)
+        guardar_configuracion()
+
+def guardar_pendiente():
+    """Guarda los cambios que todavía no haya escrito el hilo escritor."""
+    if _cambios_pendientes:
+        guardar_configuracion()
+
+# Lo pendiente se guarda al salir del programa
+atexit.register(guardar_pendiente)
 
 def obtener_configuracion(seccion=None, clave=None):
     """
@@ -123,9 +198,11 @@ def establecer_configuracion(seccion, clave, valor):
     if not config:
         cargar_configuracion()
         
-    if seccion in config:
-        config[seccion][clave] = valor
-        return guardar_configuracion()
+    with _cerrojo:
+        if seccion in config:
+            config[seccion][clave] = valor
+            programar_guardado()
+            return True
     
     return False
 
@@ -137,8 +214,10 @@ def restablecer_configuracion():
         bool: True si se restableció correctamente, False en caso contrario
     """
     global config
-    config = DEFAULT_CONFIG.copy()
-    return guardar_configuracion()
+    with _cerrojo:
+        config = copy.deepcopy(DEFAULT_CONFIG)
+        programar_guardado()
+    return True
 
 def desbloquear_nivel(nivel):
     """
@@ -165,7 +244,4 @@ def obtener_niveles_desbloqueados():
         list: Lista de niveles desbloqueados
     """
     nivel_desbloqueado = obtener_configuracion("juego", "nivel_desbloqueado")
-    return list(range(1, nivel_desbloqueado + 1))
-
-# Inicializar la configuración al importar el módulo
-cargar_configuracion() 
\ No newline at end of file
+    return list(range(1, nivel_desbloqueado + 1)) 
@@ -0,0 +1,137 @@
+"""
+Módulo para gestionar los enemigos del juego SuperNick.
+Guarda la posición, velocidad y dirección de todos los enemigos de un nivel
+en arrays de NumPy y los actualiza en un único paso vectorizado.
+"""
+
+import numpy as np
+
+class SistemaEnemigos:
+    """
+    Estado y movimiento de todos los enemigos de un nivel.
+
+    Los arrays son la fuente de verdad de la posición de los enemigos; los
+    rect de los sprites solo se actualizan cuando hacen falta para dibujar o
+    para devolverlos en una colisión. Solo se actualizan, consultan y
+    dibujan los enemigos del rango activo [inicio, fin).
+    """
+
+    def __init__(self, datos):
+        """
+        Args:
+            datos: Lista de tuplas (x, y, ancho, alto, velocidad, direccion,
+                limite_izquierdo, limite_derecho), una por enemigo
+        """
+        tabla = np.array(datos, dtype=np.float64).reshape(-1, 8)
+
+        self.x = tabla[:, 0].copy()
+        self.y = tabla[:, 1].copy()
+        self.ancho = tabla[:, 2].copy()
+        self.alto = tabla[:, 3].copy()
+        self.velocidad = tabla[:, 4].copy()
+        self.direccion = tabla[:, 5].copy()
+        self.limite_izquierdo = tabla[:, 6].copy()
+        self.limite_derecho = tabla[:, 7].copy()
+
+        # Posición antes del último paso, para interpolar al dibujar
+        self.x_anterior = self.x.copy()
+
+        # Estado inicial, para reiniciar el nivel sin volver a crearlo
+        self.x_inicial = self.x.copy()
+        self.direccion_inicial = self.direccion.copy()
+
+        # Sprite de cada enemigo (None si está fuera del rango activo)
+        self.sprites = [None] * len(self.x)
+
+        # Rango de enemigos activos
+        self.inicio = 0
+        self.fin = len(self.x)
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def reiniciar(self):
+        """Devuelve todos los enemigos a su posición y dirección iniciales."""
+        self.x[:] = self.x_inicial
+        self.x_anterior[:] = self.x_inicial
+        self.direccion[:] = self.direccion_inicial
+
+    def establecer_activos(self, inicio, fin):
+        """
+        Cambia el rango de enemigos que se actualizan, consultan y dibujan.
+
+        Args:
+            inicio: Índice del primer enemigo activo
+            fin: Índice siguiente al último enemigo activo
+        """
+        # Los que acaban de activarse no deben interpolar desde una posición antigua
+        self.x_anterior[inicio:fin] = self.x[inicio:fin]
+        self.inicio = inicio
+        self.fin = fin
+
+    def actualizar(self):
+        """Mueve los enemigos activos un paso de lógica y los hace rebotar en sus límites."""
+        activos = slice(self.inicio, self.fin)
+        x = self.x[activos]
+        self.x_anterior[activos] = x
+        x += self.velocidad[activos] * self.direccion[activos]
+
+        # Cambiar dirección al llegar a los límites
+        rebote = (x + self.ancho[activos] > self.limite_derecho[activos]) | (x < self.limite_izquierdo[activos])
+        self.direccion[activos][rebote] *= -1
+
+    def sincronizar_rects(self, indices=None):
+        """
+        Copia las posiciones de los arrays a los rect de los sprites.
+
+        Args:
+            indices: Índices de los enemigos a sincronizar (None para los activos)
+        """
+        if indices is None:
+            indices = range(self.inicio, self.fin)
+        for i in indices:
+            sprite = self.sprites[i]
+            if sprite is not None:
+                sprite.rect.x = int(self.x[i])
+                sprite.pos_anterior = (int(self.x_anterior[i]), sprite.rect.y)
+
+    def colisiones(self, rect):
+        """
+        Devuelve los enemigos activos cuyo rectángulo colisiona con rect.
+
+        Args:
+            rect: Rectángulo de consulta
+
+        Returns:
+            list: Sprites de los enemigos que colisionan (con el rect sincronizado)
+        """
+        activos = slice(self.inicio, self.fin)
+        x = np.floor(self.x[activos])
+        y = self.y[activos]
+        choque = ((x < rect.right) & (x + self.ancho[activos] > rect.left) &
+                  (y < rect.bottom) & (y + self.alto[activos] > rect.top))
+        indices = (np.flatnonzero(choque) + self.inicio).tolist()
+        self.sincronizar_rects(indices)
+        return [self.sprites[i] for i in indices if self.sprites[i] is not None]
+
+    def dibujar(self, pantalla, alpha=1.0, camara_x=0):
+        """
+        Dibuja los enemigos activos interpolando entre su posición anterior y la actual.
+
+        Args:
+            pantalla: Superficie donde dibujar
+            alpha: Fracción del paso de lógica transcurrida (0.0 a 1.0)
+            camara_x: Posición horizontal de la cámara en el mundo
+
+        Returns:
+            list: Rectángulos dibujados
+        """
+        if self.inicio >= self.fin:
+            return []
+        activos = slice(self.inicio, self.fin)
+        x_anterior = self.x_anterior[activos]
+        x = np.rint(x_anterior + (self.x[activos] - x_anterior) * alpha) - camara_x
+        return pantalla.blits([(sprite.image, (int(px), int(py)))
+                               for sprite, px, py in zip(self.sprites[activos], x.tolist(),
+                                                         self.y[activos].tolist())
+                               if sprite is not None])
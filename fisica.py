@@ -1,16 +1,122 @@
 """
 Módulo para gestionar la física del juego SuperNick.
-Incluye funciones para detectar colisiones y aplicar gravedad.
+Incluye funciones para detectar colisiones y aplicar gravedad, y una rejilla
+espacial para limitar las consultas de colisión a los objetos cercanos.
 """
 
 import pygame
 
-# Constantes físicas
+# Constantes físicas (expresadas por paso de lógica de duración fija, 1/60 s)
 GRAVEDAD = 0.5
 VELOCIDAD_SALTO = -12
 VELOCIDAD_MOVIMIENTO = 5
 VELOCIDAD_MAXIMA_CAIDA = 10
 
+# Tamaño en píxeles de cada celda de la rejilla espacial
+TAMANO_CELDA = 128
+
+class RejillaEspacial:
+    """
+    Índice espacial por celdas (spatial hash) de objetos con rect.
+    
+    Cada objeto se registra en todas las celdas que toca su rect, de modo que
+    una consulta solo revisa los objetos de las celdas cercanas en lugar de
+    todo el grupo.
+    """
+    
+    def __init__(self, tamano_celda=TAMANO_CELDA):
+        self.tamano_celda = tamano_celda
+        self.celdas = {}  # (columna, fila) -> dict usado como conjunto ordenado
+        self.celdas_objeto = {}  # objeto -> celdas en las que está registrado
+        
+    @classmethod
+    def construir(cls, objetos, tamano_celda=TAMANO_CELDA):
+        """
+        Crea una rejilla con todos los objetos de un grupo o lista.
+        
+        Args:
+            objetos: Iterable de objetos con rect
+            tamano_celda: Tamaño en píxeles de cada celda
+            
+        Returns:
+            RejillaEspacial: Rejilla con los objetos insertados
+        """
+        rejilla = cls(tamano_celda)
+        for objeto in objetos:
+            rejilla.insertar(objeto)
+        return rejilla
+        
+    def _celdas_rect(self, rect):
+        """Devuelve las celdas que toca un rectángulo."""
+        t = self.tamano_celda
+        columna_fin = (rect.left + max(rect.width, 1) - 1) // t
+        fila_fin = (rect.top + max(rect.height, 1) - 1) // t
+        return [(columna, fila)
+                for columna in range(rect.left // t, columna_fin + 1)
+                for fila in range(rect.top // t, fila_fin + 1)]
+        
+    def insertar(self, objeto):
+        """Registra un objeto en las celdas que ocupa su rect."""
+        celdas = self._celdas_rect(objeto.rect)
+        self.celdas_objeto[objeto] = celdas
+        for celda in celdas:
+            self.celdas.setdefault(celda, {})[objeto] = None
+            
+    def eliminar(self, objeto):
+        """Elimina un objeto de la rejilla (si estaba registrado)."""
+        celdas = self.celdas_objeto.pop(objeto, None)
+        if celdas is None:
+            return
+        for celda in celdas:
+            contenido = self.celdas[celda]
+            del contenido[objeto]
+            if not contenido:
+                del self.celdas[celda]
+                
+    def mover(self, objeto):
+        """Actualiza las celdas de un objeto cuyo rect ha cambiado."""
+        if self._celdas_rect(objeto.rect) != self.celdas_objeto.get(objeto):
+            self.eliminar(objeto)
+            self.insertar(objeto)
+            
+    def consultar(self, rect):
+        """
+        Devuelve los objetos registrados en las celdas que toca un rectángulo.
+        
+        Args:
+            rect: Rectángulo de consulta
+            
+        Returns:
+            list: Objetos candidatos (sin repetir), que pueden no colisionar
+        """
+        candidatos = {}
+        for celda in self._celdas_rect(rect):
+            contenido = self.celdas.get(celda)
+            if contenido:
+                candidatos.update(contenido)
+        return list(candidatos)
+        
+    def colisiones(self, rect):
+        """
+        Devuelve los objetos cuyo rect colisiona con un rectángulo.
+        
+        Args:
+            rect: Rectángulo de consulta
+            
+        Returns:
+            list: Objetos que colisionan
+        """
+        return [objeto for objeto in self.consultar(rect) if rect.colliderect(objeto.rect)]
+        
+    def __len__(self):
+        return len(self.celdas_objeto)
+
+def _colisiones(objeto, grupo, rejilla):
+    """Obtiene los sprites de un grupo que colisionan, usando la rejilla si existe."""
+    if rejilla is not None:
+        return rejilla.colisiones(objeto.rect)
+    return pygame.sprite.spritecollide(objeto, grupo, False)
+
 def aplicar_gravedad(objeto, delta_tiempo=1.0):
     """
     Aplica gravedad a un objeto.
@@ -25,13 +131,14 @@ def aplicar_gravedad(objeto, delta_tiempo=1.0):
     if objeto.velocidad_y > VELOCIDAD_MAXIMA_CAIDA:
         objeto.velocidad_y = VELOCIDAD_MAXIMA_CAIDA
 
-def detectar_colision_plataforma(objeto, plataformas):
+def detectar_colision_plataforma(objeto, plataformas, rejilla=None):
     """
     Detecta colisiones con plataformas y ajusta la posición del objeto.
     
     Args:
         objeto: Objeto que colisiona (debe tener rect, velocidad_y)
         plataformas: Grupo de sprites de plataformas
+        rejilla: RejillaEspacial de las plataformas (opcional)
         
     Returns:
         bool: True si hay colisión con alguna plataforma
@@ -40,20 +147,23 @@ def detectar_colision_plataforma(objeto, plataformas):
     pos_y_anterior = objeto.rect.y
     
     # Detectar colisiones
-    hits = pygame.sprite.spritecollide(objeto, plataformas, False)
+    hits = _colisiones(objeto, plataformas, rejilla)
     
-    if hits:
-        # Si estamos cayendo (velocidad positiva) y nuestra posición anterior
-        # estaba por encima de la plataforma, nos posicionamos encima
-        if objeto.velocidad_y > 0 and pos_y_anterior < hits[0].rect.top:
-            objeto.rect.bottom = hits[0].rect.top
+    # Si estamos cayendo (velocidad positiva) y nuestra posición anterior
+    # estaba por encima de la plataforma, nos posicionamos encima. Si hay
+    # varias, nos quedamos con la más alta
+    if hits and objeto.velocidad_y > 0:
+        debajo = [plataforma for plataforma in hits if pos_y_anterior < plataforma.rect.top]
+        if debajo:
+            plataforma = min(debajo, key=lambda p: p.rect.top)
+            objeto.rect.bottom = plataforma.rect.top
             objeto.velocidad_y = 0
             objeto.en_suelo = True
             return True
     
     return False
 
-def detectar_colision_enemigo(objeto, enemigos, callback=None):
+def detectar_colision_enemigo(objeto, enemigos, callback=None, rejilla=None):
     """
     Detecta colisiones con enemigos.
     
@@ -61,18 +171,20 @@ def detectar_colision_enemigo(objeto, enemigos, callback=None):
         objeto: Objeto que colisiona
         enemigos: Grupo de sprites de enemigos
         callback: Función a llamar cuando hay colisión
+        rejilla: RejillaEspacial u otro índice con método colisiones(rect),
+            como enemigos.SistemaEnemigos (opcional)
         
     Returns:
         bool: True si hay colisión con algún enemigo
     """
-    hits = pygame.sprite.spritecollide(objeto, enemigos, False)
+    hits = _colisiones(objeto, enemigos, rejilla)
     
     if hits and callback:
         callback(hits[0])
         
     return len(hits) > 0
 
-def detectar_colision_moneda(objeto, monedas, callback=None):
+def detectar_colision_moneda(objeto, monedas, callback=None, rejilla=None):
     """
     Detecta colisiones con monedas y las elimina.
     
@@ -80,11 +192,16 @@ def detectar_colision_moneda(objeto, monedas, callback=None):
         objeto: Objeto que colisiona
         monedas: Grupo de sprites de monedas
         callback: Función a llamar cuando hay colisión
+        rejilla: RejillaEspacial de las monedas (opcional)
         
     Returns:
         int: Número de monedas recogidas
     """
-    hits = pygame.sprite.spritecollide(objeto, monedas, True)
+    hits = _colisiones(objeto, monedas, rejilla)
+    for moneda in hits:
+        moneda.kill()
+        if rejilla is not None:
+            rejilla.eliminar(moneda)
     
     if hits and callback:
         for moneda in hits:
@@ -0,0 +1,178 @@
+"""
+Módulo para generar niveles del juego SuperNick.
+Crea niveles aleatorios pero reproducibles (a partir de una semilla) con el
+número de plataformas, enemigos y monedas que se pida, hasta decenas de
+miles de cada uno, para medir cómo escala cada parte del juego. Los niveles
+se escriben en el mismo formato JSON que los de assets/niveles, así que se
+cargan con Nivel(numero, ruta).
+
+Uso:
+    python generador.py --plataformas 20000 --enemigos 20000 --monedas 20000 --semilla 3
+"""
+
+import os
+import json
+import argparse
+import numpy as np
+import recursos
+import main
+
+# Directorio por defecto de los niveles generados
+DIR_GENERADOS = os.path.join(recursos.DIR_CACHE, "generados")
+
+# Dimensiones del mundo (las mismas que main.ANCHO, main.ALTO y ANCHO_SEGMENTO)
+ANCHO_PANTALLA = 800
+ALTO_PANTALLA = 600
+ALTO_SUELO = 50
+Y_SUELO = ALTO_PANTALLA - ALTO_SUELO
+
+# Plataformas: pocos tamaños distintos, porque cada tamaño ocupa un hueco
+# en el atlas de texturas
+ANCHOS_PLATAFORMA = (80, 100, 150, 200)
+ALTO_PLATAFORMA = 20
+# Separación horizontal y cambio de altura entre plataformas consecutivas,
+# dentro del alcance de un salto (unos 138 píxeles de alto y 240 de largo)
+HUECO_MINIMO = 40
+HUECO_MAXIMO = 120
+SUBIDA_MAXIMA = 110
+Y_PLATAFORMA_MINIMA = 150
+Y_PLATAFORMA_MAXIMA = Y_SUELO - 60
+
+# Los mismos tamaños que los sprites del juego
+TAMAÑO_ENEMIGO = main.Enemigo.TAMAÑO
+TAMAÑO_MONEDA = main.Moneda.TAMAÑO
+# Altura de las monedas sobre la plataforma en la que están
+ALTURA_MONEDA_MINIMA = 30
+ALTURA_MONEDA_MAXIMA = 100
+# Zona alrededor de la posición inicial de Nick sin enemigos
+ZONA_SEGURA = 400
+
+def generar(plataformas=100, enemigos=50, monedas=100, semilla=0):
+    """
+    Genera la definición de un nivel.
+
+    Las plataformas forman una cadena de izquierda a derecha sobre el suelo,
+    con huecos y desniveles que se pueden saltar. Cada enemigo patrulla una
+    plataforma o un tramo del suelo y cada moneda flota sobre una plataforma
+    o sobre el suelo.
+
+    Args:
+        plataformas: Número de plataformas, sin contar el suelo
+        enemigos: Número de enemigos
+        monedas: Número de monedas (al menos una: sin monedas el nivel se
+            gana en el primer paso)
+        semilla: Semilla del generador aleatorio
+
+    Returns:
+        dict: Definición del nivel en el formato de los archivos de niveles
+
+    Raises:
+        ValueError: Si se piden menos de una moneda
+    """
+    if monedas < 1:
+        raise ValueError("Un nivel necesita al menos una moneda")
+    generador = np.random.default_rng(semilla)
+
+    # Cadena de plataformas: cada una empieza tras el hueco que deja la anterior
+    anchos = generador.choice(ANCHOS_PLATAFORMA, plataformas)
+    huecos = generador.integers(HUECO_MINIMO, HUECO_MAXIMO + 1, plataformas)
+    pasos = (anchos + huecos).astype(np.int64)
+    x = ZONA_SEGURA + np.cumsum(pasos) - pasos
+    # Paseo aleatorio de la altura, sin salir de la franja jugable
+    y = np.empty(plataformas, dtype=np.int64)
+    altura = Y_PLATAFORMA_MAXIMA
+    for i, cambio in enumerate(generador.integers(-SUBIDA_MAXIMA, SUBIDA_MAXIMA + 1, plataformas).tolist()):
+        altura = min(max(altura + cambio, Y_PLATAFORMA_MINIMA), Y_PLATAFORMA_MAXIMA)
+        y[i] = altura
+
+    fin_cadena = int(x[-1] + anchos[-1]) if plataformas else 0
+    ancho = max(ANCHO_PANTALLA, fin_cadena + ZONA_SEGURA)
+    ancho += -ancho % ANCHO_PANTALLA
+    # El suelo se parte en tramos de una pantalla para repartir los enemigos
+    num_tramos = ancho // ANCHO_PANTALLA
+    superficies = np.concatenate((
+        np.column_stack((x, y, anchos)),
+        np.column_stack((np.arange(num_tramos) * ANCHO_PANTALLA, np.full(num_tramos, Y_SUELO),
+                         np.full(num_tramos, ANCHO_PANTALLA))),
+    )).astype(np.int64)
+
+    # Enemigos sobre superficies al azar, lejos de la posición inicial
+    lejanas = superficies[superficies[:, 0] + superficies[:, 2] > ZONA_SEGURA + TAMAÑO_ENEMIGO]
+    elegidas = lejanas[generador.integers(0, len(lejanas), enemigos)]
+    izquierda = np.maximum(elegidas[:, 0], ZONA_SEGURA)
+    derecha = elegidas[:, 0] + elegidas[:, 2]
+    x_enemigos = generador.integers(izquierda, derecha - TAMAÑO_ENEMIGO + 1)
+    tabla_enemigos = np.column_stack((x_enemigos, elegidas[:, 1] - TAMAÑO_ENEMIGO, izquierda, derecha))
+
+    # Monedas sobre superficies al azar
+    elegidas = superficies[generador.integers(0, len(superficies), monedas)]
+    x_monedas = generador.integers(elegidas[:, 0], elegidas[:, 0] + elegidas[:, 2] - TAMAÑO_MONEDA + 1)
+    y_monedas = elegidas[:, 1] - generador.integers(ALTURA_MONEDA_MINIMA, ALTURA_MONEDA_MAXIMA + 1, monedas)
+    tabla_monedas = np.column_stack((x_monedas, y_monedas))
+
+    # Tiempo para recorrer el nivel dos veces a la velocidad de Nick
+    tiempo_limite = max(120, 2 * ancho // (5 * 60))
+
+    return {
+        "nombre": f"Generado {plataformas}/{enemigos}/{monedas} (semilla {semilla})",
+        "descripcion": "Nivel generado",
+        "tiempo_limite": int(tiempo_limite),
+        "fondo": "fondo_nivel1.png",
+        "plataformas": [[0, Y_SUELO, ancho, ALTO_SUELO]]
+                       + np.column_stack((x, y, anchos, np.full(plataformas, ALTO_PLATAFORMA))).tolist(),
+        "enemigos": tabla_enemigos.tolist(),
+        "monedas": tabla_monedas.tolist(),
+    }
+
+def ruta_generado(plataformas, enemigos, monedas, semilla):
+    """Ruta por defecto de un nivel generado con estos parámetros."""
+    return os.path.join(DIR_GENERADOS, f"generado_{plataformas}_{enemigos}_{monedas}_{semilla}.json")
+
+def generar_archivo(plataformas=100, enemigos=50, monedas=100, semilla=0, ruta=None):
+    """
+    Genera un nivel y lo escribe en un archivo.
+
+    Si el archivo ya tiene el mismo contenido no se vuelve a escribir, de
+    modo que sigue valiendo su caché compilada.
+
+    Args:
+        plataformas: Número de plataformas, sin contar el suelo
+        enemigos: Número de enemigos
+        monedas: Número de monedas
+        semilla: Semilla del generador aleatorio
+        ruta: Archivo de destino (None para el de ruta_generado())
+
+    Returns:
+        str: Ruta del archivo del nivel
+    """
+    if ruta is None:
+        ruta = ruta_generado(plataformas, enemigos, monedas, semilla)
+    contenido = json.dumps(generar(plataformas, enemigos, monedas, semilla)).encode("utf-8")
+    try:
+        with open(ruta, "rb") as f:
+            if f.read() == contenido:
+                return ruta
+    except OSError:
+        pass
+
+    os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+    ruta_temporal = ruta + ".tmp"
+    with open(ruta_temporal, "wb") as f:
+        f.write(contenido)
+    os.replace(ruta_temporal, ruta)
+    return ruta
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generar niveles de SuperNick")
+    parser.add_argument("--plataformas", type=int, default=100, help="Número de plataformas")
+    parser.add_argument("--enemigos", type=int, default=50, help="Número de enemigos")
+    parser.add_argument("--monedas", type=int, default=100, help="Número de monedas (al menos una)")
+    parser.add_argument("--semilla", type=int, default=0, help="Semilla del generador")
+    parser.add_argument("--salida", help="Archivo de destino (por defecto en cache/generados)")
+    opciones = parser.parse_args()
+    if opciones.monedas < 1:
+        parser.error("--monedas debe ser al menos 1")
+
+    ruta = generar_archivo(opciones.plataformas, opciones.enemigos, opciones.monedas,
+                           opciones.semilla, opciones.salida)
+    print(f"Nivel generado en {ruta}")
@@ -0,0 +1,121 @@
+"""
+Módulo para dibujar el texto del HUD del juego SuperNick.
+Reutiliza las fuentes y guarda el texto ya renderizado hasta que cambia su
+valor. Los números se componen a partir de un atlas de dígitos renderizados
+una sola vez, de modo que un cambio de valor no vuelve a llamar a render.
+"""
+
+import pygame
+import recursos
+
+# Tamaño de fuente por defecto del HUD
+TAMAÑO_FUENTE = 36
+
+# Caracteres que pueden aparecer en un valor numérico del HUD
+CARACTERES_NUMERICOS = "0123456789-"
+
+# Etiquetas creadas, por (prefijo, tamaño, color)
+_etiquetas = {}
+
+# Atlas de dígitos creados, por (tamaño, color)
+_atlas = {}
+
+class AtlasDigitos:
+    """Glifos de los dígitos renderizados una vez para una fuente y un color."""
+
+    def __init__(self, fuente, color):
+        self.color = color
+        self.glifos = {caracter: fuente.render(caracter, True, color)
+                       for caracter in CARACTERES_NUMERICOS}
+        self.alto = max(glifo.get_height() for glifo in self.glifos.values())
+
+    def ancho(self, texto):
+        """Ancho en píxeles de un número compuesto con el atlas."""
+        return sum(self.glifos[caracter].get_width() for caracter in texto)
+
+    def componer(self, texto, destino, x):
+        """
+        Dibuja un número carácter a carácter sobre una superficie.
+
+        Args:
+            texto: Número como cadena (solo CARACTERES_NUMERICOS)
+            destino: Superficie donde dibujar
+            x: Posición horizontal inicial
+        """
+        for caracter in texto:
+            glifo = self.glifos[caracter]
+            destino.blit(glifo, (x, 0))
+            x += glifo.get_width()
+
+class EtiquetaHud:
+    """Texto del HUD con un prefijo fijo y un valor que cambia poco."""
+
+    def __init__(self, prefijo, tamaño=TAMAÑO_FUENTE, color=(0, 0, 0)):
+        self.fuente = recursos.cargar_fuente(None, tamaño)
+        self.prefijo = prefijo
+        self.color = color
+        self.superficie_prefijo = self.fuente.render(prefijo, True, color)
+        self.atlas = obtener_atlas(tamaño, color)
+        self.valor = None
+        self.superficie = None
+
+    def renderizar(self, valor):
+        """
+        Devuelve la superficie del texto, renderizándola solo si el valor cambió.
+
+        Args:
+            valor: Valor a mostrar tras el prefijo
+
+        Returns:
+            pygame.Surface: Texto renderizado
+        """
+        if self.superficie is not None and valor == self.valor:
+            return self.superficie
+
+        texto = str(valor)
+        if all(caracter in self.atlas.glifos for caracter in texto):
+            # Componer el número con el atlas de dígitos
+            ancho_prefijo = self.superficie_prefijo.get_width()
+            ancho = ancho_prefijo + self.atlas.ancho(texto)
+            alto = max(self.superficie_prefijo.get_height(), self.atlas.alto)
+            superficie = pygame.Surface((ancho, alto), pygame.SRCALPHA)
+            # Fondo transparente del mismo color que el texto para que los
+            # bordes suavizados no se oscurezcan al mezclar
+            superficie.fill((*self.color[:3], 0))
+            superficie.blit(self.superficie_prefijo, (0, 0))
+            self.atlas.componer(texto, superficie, ancho_prefijo)
+        else:
+            superficie = self.fuente.render(self.prefijo + texto, True, self.color)
+
+        self.valor = valor
+        self.superficie = superficie
+        return superficie
+
+def obtener_atlas(tamaño=TAMAÑO_FUENTE, color=(0, 0, 0)):
+    """Devuelve el atlas de dígitos de un tamaño y color, creándolo si no existe."""
+    clave = (tamaño, tuple(color))
+    if clave not in _atlas:
+        _atlas[clave] = AtlasDigitos(recursos.cargar_fuente(None, tamaño), color)
+    return _atlas[clave]
+
+def obtener_etiqueta(prefijo, tamaño=TAMAÑO_FUENTE, color=(0, 0, 0)):
+    """Devuelve la etiqueta de un prefijo, tamaño y color, creándola si no existe."""
+    clave = (prefijo, tamaño, tuple(color))
+    if clave not in _etiquetas:
+        _etiquetas[clave] = EtiquetaHud(prefijo, tamaño, color)
+    return _etiquetas[clave]
+
+def renderizar(prefijo, valor, tamaño=TAMAÑO_FUENTE, color=(0, 0, 0)):
+    """
+    Devuelve el texto "prefijo + valor" renderizado, usando la caché.
+
+    Args:
+        prefijo: Texto fijo (por ejemplo "Tiempo: ")
+        valor: Valor variable a mostrar
+        tamaño: Tamaño de la fuente
+        color: Color del texto
+
+    Returns:
+        pygame.Surface: Texto renderizado
+    """
+    return obtener_etiqueta(prefijo, tamaño, color).renderizar(valor)
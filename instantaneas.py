@@ -0,0 +1,193 @@
+"""
+Módulo para guardar y restaurar instantáneas del estado de una partida de SuperNick.
+Todo lo que cambia al avanzar la lógica (Nick, los enemigos, las monedas
+recogidas, el tiempo y la puntuación) se copia en un registro de NumPy de
+tamaño fijo para cada nivel. Guardar no crea objetos si se reutiliza el
+registro, y restaurar tarda microsegundos: solo se crean o quitan los
+sprites de las monedas que han cambiado y los segmentos solo se recargan si
+los cargados son otros. Con un Historial de los últimos pasos se puede
+volver a uno de ellos y simular de nuevo desde ahí (rollback).
+"""
+
+import functools
+import numpy as np
+
+# Segmentos cargados a la vez como máximo; en el juego son como mucho
+# 2 * main.SEGMENTOS_LIBERACION + 1
+MAX_SEGMENTOS = 8
+
+@functools.lru_cache(maxsize=None)
+def formato(num_enemigos, num_monedas):
+    """
+    Tipo de registro de las instantáneas de un nivel.
+
+    Args:
+        num_enemigos: Número de enemigos del nivel
+        num_monedas: Número de monedas del nivel
+
+    Returns:
+        np.dtype: Tipo estructurado de tamaño fijo
+    """
+    return np.dtype([
+        # Posición, posición anterior (x, y, x_anterior, y_anterior) y
+        # velocidades de Nick
+        ("nick_posicion", "<i4", (4,)),
+        ("nick_velocidad", "<f8", (2,)),
+        ("nick_en_suelo", "?"),
+        ("nick_vidas", "<i4"),
+        ("nick_direccion", "<i4"),
+        ("puntuacion", "<i4"),
+        # Tiempo restante, pasos del segundo en curso y reloj de animación
+        ("tiempo", "<i4", (3,)),
+        # Segmento de Nick y segmentos cargados (-1 en los huecos)
+        ("segmento_actual", "<i4"),
+        ("segmentos", "<i4", (MAX_SEGMENTOS,)),
+        # Rango de enemigos activos y su estado
+        ("enemigos_activos", "<i4", (2,)),
+        ("enemigos_x", "<f8", (num_enemigos,)),
+        ("enemigos_x_anterior", "<f8", (num_enemigos,)),
+        ("enemigos_direccion", "i1", (num_enemigos,)),
+        # Monedas recogidas, un bit por moneda
+        ("num_monedas_recogidas", "<i4"),
+        ("monedas_recogidas", "u1", ((num_monedas + 7) // 8,)),
+    ])
+
+def formato_nivel(nivel):
+    """Tipo de registro de las instantáneas de un nivel cargado."""
+    return formato(len(nivel.sistema_enemigos), nivel.monedas_totales)
+
+def crear(nivel):
+    """
+    Crea un registro vacío para guardar instantáneas de un nivel.
+
+    Returns:
+        np.ndarray: Array de dimensión 0 con el formato del nivel
+    """
+    return np.zeros((), dtype=formato_nivel(nivel))
+
+def capturar(nivel, jugador, destino=None):
+    """
+    Guarda el estado de la partida que cambia al avanzar la lógica.
+
+    Los datos del nivel y las plataformas no cambian y no se guardan.
+
+    Args:
+        nivel: Nivel en curso
+        jugador: Instancia de Nick
+        destino: Registro donde guardarlo, de crear() o de un Historial
+            (None para crear uno nuevo)
+
+    Returns:
+        Registro con el estado
+    """
+    if destino is None:
+        destino = crear(nivel)
+    if len(nivel.segmentos_activos) > MAX_SEGMENTOS:
+        raise ValueError(f"Hay {len(nivel.segmentos_activos)} segmentos cargados (máximo {MAX_SEGMENTOS})")
+
+    destino["nick_posicion"] = (jugador.rect.x, jugador.rect.y, *jugador.pos_anterior)
+    destino["nick_velocidad"] = (jugador.velocidad_x, jugador.velocidad_y)
+    destino["nick_en_suelo"] = jugador.en_suelo
+    destino["nick_vidas"] = jugador.vidas
+    destino["nick_direccion"] = jugador.direccion
+    destino["puntuacion"] = jugador.puntuacion
+    destino["tiempo"] = (nivel.tiempo_restante, nivel.frames_segundo, nivel.reloj_animacion)
+
+    destino["segmento_actual"] = -1 if nivel.segmento_actual is None else nivel.segmento_actual
+    segmentos = sorted(nivel.segmentos_activos)
+    destino["segmentos"] = segmentos + [-1] * (MAX_SEGMENTOS - len(segmentos))
+
+    sistema = nivel.sistema_enemigos
+    destino["enemigos_activos"] = (sistema.inicio, sistema.fin)
+    destino["enemigos_x"] = sistema.x
+    destino["enemigos_x_anterior"] = sistema.x_anterior
+    destino["enemigos_direccion"] = sistema.direccion
+
+    destino["num_monedas_recogidas"] = nivel.num_monedas_recogidas
+    destino["monedas_recogidas"] = np.packbits(nivel.monedas_recogidas)
+    return destino
+
+def restaurar(nivel, jugador, instantanea):
+    """
+    Devuelve la partida al estado de una instantánea.
+
+    Args:
+        nivel: Nivel en el que se capturó la instantánea (u otro creado con
+            el mismo archivo)
+        jugador: Instancia de Nick
+        instantanea: Registro de capturar()
+    """
+    x, y, x_anterior, y_anterior = instantanea["nick_posicion"].tolist()
+    velocidad_x, velocidad_y = instantanea["nick_velocidad"].tolist()
+    jugador.rect.topleft = (x, y)
+    jugador.pos_anterior = (x_anterior, y_anterior)
+    jugador.velocidad_x = int(velocidad_x)
+    jugador.velocidad_y = velocidad_y
+    jugador.en_suelo = bool(instantanea["nick_en_suelo"])
+    jugador.vidas = int(instantanea["nick_vidas"])
+    jugador.direccion = int(instantanea["nick_direccion"])
+    jugador.puntuacion = int(instantanea["puntuacion"])
+    jugador.limites = nivel.limites
+
+    nivel.tiempo_restante, nivel.frames_segundo, nivel.reloj_animacion = instantanea["tiempo"].tolist()
+
+    # Las monedas se restauran antes de cargar segmentos para que los que se
+    # activen ya creen solo las que no estaban recogidas
+    recogidas = np.unpackbits(instantanea["monedas_recogidas"], count=nivel.monedas_totales).view(bool)
+    nivel.establecer_monedas_recogidas(recogidas, int(instantanea["num_monedas_recogidas"]))
+
+    sistema = nivel.sistema_enemigos
+    sistema.x[:] = instantanea["enemigos_x"]
+    segmentos = [indice for indice in instantanea["segmentos"].tolist() if indice >= 0]
+    if segmentos != sorted(nivel.segmentos_activos):
+        nivel.cargar_segmentos(segmentos)
+    actual = int(instantanea["segmento_actual"])
+    nivel.segmento_actual = None if actual < 0 else actual
+    # Cargar segmentos cambia el rango activo y la posición anterior
+    sistema.inicio, sistema.fin = instantanea["enemigos_activos"].tolist()
+    sistema.x_anterior[:] = instantanea["enemigos_x_anterior"]
+    sistema.direccion[:] = instantanea["enemigos_direccion"]
+
+class Historial:
+    """
+    Instantáneas de los últimos pasos de una partida en un búfer circular.
+
+    Los registros se reservan al crearlo y se sobrescriben al guardar, así
+    que guardar un paso en cada tick no reserva memoria.
+    """
+
+    def __init__(self, nivel, capacidad):
+        """
+        Args:
+            nivel: Nivel de la partida
+            capacidad: Número de pasos que se conservan
+        """
+        self.registros = np.zeros(capacidad, dtype=formato_nivel(nivel))
+        self.pasos = [None] * capacidad  # Paso guardado en cada registro
+
+    def __contains__(self, paso):
+        return self.pasos[paso % len(self.pasos)] == paso
+
+    def guardar(self, paso, nivel, jugador):
+        """
+        Guarda el estado de la partida al empezar un paso.
+
+        Args:
+            paso: Número del paso de lógica
+            nivel: Nivel en curso
+            jugador: Instancia de Nick
+        """
+        indice = paso % len(self.pasos)
+        capturar(nivel, jugador, self.registros[indice])
+        self.pasos[indice] = paso
+
+    def restaurar(self, paso, nivel, jugador):
+        """
+        Devuelve la partida al estado guardado de un paso.
+
+        Raises:
+            KeyError: Si el paso no está en el historial
+        """
+        if paso not in self:
+            raise KeyError(f"El paso {paso} no está en el historial")
+        restaurar(nivel, jugador, self.registros[paso % len(self.pasos)])
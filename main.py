@@ -1,35 +1,50 @@
+import time
+INICIO_PROCESO = time.perf_counter()  # Para medir también las importaciones
+
 import pygame
 import sys
 import os
+import argparse
+import random
 from pygame.locals import *
 import recursos
 import fisica
 import sonido
+import enemigos
+import hud
+import renderizado
+import niveles
+import rendimiento
+import repeticion
 import math
-
-# Inicialización de Pygame
-pygame.init()
-pygame.mixer.init()
+import numpy as np
 
 # Constantes
 ANCHO = 800
 ALTO = 600
-FPS = 60
+FPS = 60  # Frecuencia fija de la lógica (pasos por segundo)
+PASO_LOGICO = 1.0 / FPS  # Duración de un paso de lógica en segundos
+MAX_PASOS_POR_FRAME = 5  # Pasos máximos por frame dibujado antes de ralentizar
+FPS_RENDER_MAXIMO = 240  # Límite de frames dibujados por segundo (0 sin límite)
+FPS_MENU = 30  # Frecuencia del bucle en los menús, que apenas cambian
 TITULO = "SuperNick"
+DURACION_PERFIL = 5  # Segundos que dura una captura de perfil iniciada con F4
+
+# Mundo: los niveles se dividen en segmentos que se cargan cerca de Nick
+ANCHO_SEGMENTO = ANCHO
+SEGMENTOS_ACTIVACION = 1  # Segmentos a cada lado de Nick que se cargan
+SEGMENTOS_LIBERACION = 2  # Distancia en segmentos a partir de la que se liberan
+PARALAJE_FONDO = 0.5  # Velocidad del fondo respecto a la cámara
 
 # Colores
 NEGRO = (0, 0, 0)
 BLANCO = (255, 255, 255)
 AZUL_CIELO = (107, 140, 255)
 
-# Configuración de la pantalla
-pantalla = pygame.display.set_mode((ANCHO, ALTO))
-pygame.display.set_caption(TITULO)
-reloj = pygame.time.Clock()
-
-# Inicializar recursos
-recursos.inicializar_recursos()
-sonido.inicializar()
+# Pantalla, reloj y carga de imágenes en curso (se crean en inicializar())
+pantalla = None
+reloj = None
+carga_recursos = None
 
 # Estados del juego
 MENU = 0
@@ -42,19 +57,26 @@ SELECCION_NIVEL = 4
 class Nick(pygame.sprite.Sprite):
     def __init__(self):
         super().__init__()
-        # Usar imagen de recursos
-        self.image = recursos.imagenes["nick.png"]
+        # Usar imagen del atlas de recursos
+        self.image = recursos.atlas.obtener("nick.png")
         self.rect = self.image.get_rect()
-        self.rect.center = (ANCHO // 4, ALTO // 2)
+        self.reiniciar()
+        
+    def reiniciar(self):
+        """Devuelve a Nick al estado del principio de una partida."""
+        self.limites = (0, 0, ANCHO, ALTO - 50)  # Límites del nivel en curso
+        self.reposicionar()
         
         # Propiedades físicas
-        self.velocidad_x = 0
-        self.velocidad_y = 0
         self.en_suelo = False
         self.vidas = 3
         self.direccion = 1  # 1 derecha, -1 izquierda
         self.puntuacion = 0
         
+    def guardar_posicion(self):
+        """Guarda la posición antes del paso de lógica para interpolar al dibujar."""
+        self.pos_anterior = self.rect.topleft
+        
     def update(self):
         # Aplicar gravedad
         fisica.aplicar_gravedad(self)
@@ -62,8 +84,8 @@ class Nick(pygame.sprite.Sprite):
         # Movimiento horizontal
         self.rect.x += self.velocidad_x
         
-        # Limitar movimiento dentro de la pantalla
-        fisica.limitar_movimiento(self, (0, 0, ANCHO, ALTO - 50))
+        # Limitar movimiento dentro del nivel
+        fisica.limitar_movimiento(self, self.limites)
             
         # Movimiento vertical
         self.rect.y += self.velocidad_y
@@ -92,6 +114,7 @@ class Nick(pygame.sprite.Sprite):
         
     def reposicionar(self):
         self.rect.center = (ANCHO // 4, ALTO // 2)
+        self.pos_anterior = self.rect.topleft  # Sin interpolar el salto de posición
         self.velocidad_x = 0
         self.velocidad_y = 0
         
@@ -103,269 +126,632 @@ class Nick(pygame.sprite.Sprite):
 class Plataforma(pygame.sprite.Sprite):
     def __init__(self, x, y, ancho, alto):
         super().__init__()
-        # Usar imagen de recursos
-        self.original_image = recursos.imagenes["plataforma.png"]
-        
-        # Información de depuración
-        print(f"DEBUG - Plataforma creada:")
-        print(f"  - Tamaño original: {self.original_image.get_width()}x{self.original_image.get_height()}")
-        print(f"  - Tamaño deseado: {ancho}x{alto}")
-        
-        # Escalar la imagen al tamaño deseado
-        self.image = pygame.transform.scale(self.original_image, (ancho, alto))
-        
-        # Más información de depuración
-        print(f"  - Tamaño final: {self.image.get_width()}x{self.image.get_height()}")
+        self.rect = pygame.Rect(0, 0, 0, 0)
+        self.colocar(x, y, ancho, alto)
         
-        self.rect = self.image.get_rect()
-        self.rect.x = x
-        self.rect.y = y
+    def colocar(self, x, y, ancho, alto):
+        """Cambia la posición y el tamaño de la plataforma para reutilizarla."""
+        # Imagen escalada al tamaño deseado, compartida en el atlas por todas
+        # las plataformas del mismo tamaño
+        self.image = recursos.atlas.obtener("plataforma.png", (ancho, alto))
+        self.rect.update((x, y), self.image.get_size())
 
 # Clase para enemigos
 class Enemigo(pygame.sprite.Sprite):
+    TAMAÑO = 30
+    VELOCIDAD = 2
+    
     def __init__(self, x, y):
         super().__init__()
-        # Usar imagen de recursos
-        self.original_image = recursos.imagenes["enemigo.png"]
-        # Ajustar el tamaño del enemigo a un tamaño adecuado (30x30 píxeles)
-        self.image = pygame.transform.scale(self.original_image, (30, 30))
+        # Imagen del atlas ajustada a un tamaño adecuado (30x30 píxeles)
+        self.image = recursos.atlas.obtener("enemigo.png", (Enemigo.TAMAÑO, Enemigo.TAMAÑO))
         self.rect = self.image.get_rect()
-        self.rect.x = x
-        self.rect.y = y
-        self.velocidad = 2
-        self.direccion = 1
+        self.colocar(x, y)
         
-    def update(self):
-        self.rect.x += self.velocidad * self.direccion
-        
-        # Cambiar dirección al llegar a ciertos límites
-        if self.rect.right > ANCHO - 100 or self.rect.left < 100:
-            self.direccion *= -1
+    def colocar(self, x, y):
+        """Cambia la posición del enemigo para reutilizarlo."""
+        self.rect.topleft = (x, y)
+        # El movimiento lo gestiona enemigos.SistemaEnemigos
+        self.pos_anterior = self.rect.topleft
 
 # Clase para monedas
 class Moneda(pygame.sprite.Sprite):
+    # Animación de giro precalculada, compartida por todas las monedas:
+    # lista de (superficie, desplazamiento respecto a rect.topleft)
+    fotogramas = None
+    imagen_base = None
+    TAMAÑO = 30  # Tamaño máximo; las imágenes más grandes se reducen a él
+    NUM_FOTOGRAMAS = 16
+    VELOCIDAD_ANIMACION = 0.1  # Avance del giro por paso de lógica
+    
     def __init__(self, x, y):
         super().__init__()
-        # Usar imagen de recursos
-        self.original_image = recursos.imagenes["moneda.png"]
-        # Ajustar el tamaño de la moneda si es necesario
-        if self.original_image.get_width() > 30 or self.original_image.get_height() > 30:
-            self.original_image = pygame.transform.scale(self.original_image, (30, 30))
-        self.image = self.original_image.copy()
+        if Moneda.fotogramas is None:
+            Moneda.precalcular_fotogramas()
+        # Imagen en reposo; la animación se dibuja con los fotogramas compartidos
+        self.image = Moneda.imagen_base
         self.rect = self.image.get_rect()
-        self.rect.x = x
-        self.rect.y = y
         self.valor = 10
-        # Añadir animación
-        self.contador = 0
-        self.velocidad_animacion = 0.1
-        self.tamaño_original = self.original_image.get_width()
+        self.colocar(x, y)
+        
+    def colocar(self, x, y):
+        """Cambia la posición de la moneda para reutilizarla."""
+        self.rect.topleft = (x, y)
+        
+    @classmethod
+    def precalcular_fotogramas(cls):
+        """Coloca en el atlas la imagen de la moneda a cada tamaño del giro."""
+        # Usar imagen de recursos
+        imagen = recursos.imagenes["moneda.png"]
+        # Ajustar el tamaño de la moneda si es necesario
+        tamaño_base = None
+        if imagen.get_width() > cls.TAMAÑO or imagen.get_height() > cls.TAMAÑO:
+            tamaño_base = (cls.TAMAÑO, cls.TAMAÑO)
+        cls.imagen_base = recursos.atlas.obtener("moneda.png", tamaño_base)
+        tamaño_original = cls.imagen_base.get_width()
+        
+        # Animación simple: hacer que la moneda "gire" (cambio de escala). Un
+        # ciclo de abs(sin) dura pi; se cuantiza en NUM_FOTOGRAMAS y los
+        # fotogramas del mismo tamaño comparten región del atlas
+        tamaños = [int(tamaño_original * (0.9 + 0.2 * abs(math.sin(math.pi * i / cls.NUM_FOTOGRAMAS))))
+                   for i in range(cls.NUM_FOTOGRAMAS)]
+        recursos.atlas.asegurar(("moneda.png", (tamaño, tamaño)) for tamaño in tamaños)
+        cls.fotogramas = []
+        for nuevo_tamaño in tamaños:
+            # Mantener la posición centrada
+            desplazamiento = tamaño_original // 2 - nuevo_tamaño // 2
+            cls.fotogramas.append((recursos.atlas.obtener("moneda.png", (nuevo_tamaño, nuevo_tamaño)),
+                                   (desplazamiento, desplazamiento)))
+            
+    @classmethod
+    def fotograma(cls, reloj_animacion):
+        """
+        Devuelve el fotograma del giro para un instante de la animación.
+        
+        Args:
+            reloj_animacion: Pasos de lógica transcurridos en el nivel
+            
+        Returns:
+            tuple: (superficie, desplazamiento respecto a rect.topleft)
+        """
+        fase = (reloj_animacion * cls.VELOCIDAD_ANIMACION / math.pi) % 1.0
+        return cls.fotogramas[int(fase * cls.NUM_FOTOGRAMAS) % cls.NUM_FOTOGRAMAS]
+        
+    @classmethod
+    def dibujar_grupo(cls, pantalla, monedas, reloj_animacion, camara_x=0):
+        """Dibuja todas las monedas con el fotograma actual de la animación."""
+        superficie, (dx, dy) = cls.fotograma(reloj_animacion)
+        dx -= camara_x
+        return pantalla.blits([(superficie, (moneda.rect.x + dx, moneda.rect.y + dy))
+                               for moneda in monedas])
 
-    def update(self):
-        # Animación simple: hacer que la moneda "gire" (cambio de escala)
-        self.contador += self.velocidad_animacion
-        factor_escala = 0.9 + 0.2 * abs(math.sin(self.contador))
-        nuevo_ancho = int(self.tamaño_original * factor_escala)
-        nuevo_alto = int(self.tamaño_original * factor_escala)
-        
-        # Mantener la posición centrada
-        pos_x = self.rect.centerx
-        pos_y = self.rect.centery
-        
-        # Crear una nueva imagen escalada a partir de la original
-        self.image = pygame.transform.scale(self.original_image, (nuevo_ancho, nuevo_alto))
-        self.rect = self.image.get_rect()
-        self.rect.centerx = pos_x
-        self.rect.centery = pos_y
+# Sprites de plataformas, enemigos y monedas listos para reutilizarse
+class ReservaSprites:
+    """
+    Sprites que no pertenecen a ningún segmento cargado.
+    
+    Al liberar un segmento sus sprites vuelven a la reserva y al activar
+    otro, de este nivel o de cualquier otro, se sacan de ella y se colocan
+    en su sitio. Una vez llena, recargar segmentos, reintentar una partida o
+    cambiar de nivel no crea sprites ni escala imágenes.
+    """
+    
+    def __init__(self):
+        self.libres = {}  # Clase -> lista de sprites libres
+        
+    def obtener(self, clase, *datos):
+        """
+        Devuelve un sprite de una clase colocado con unos datos.
+        
+        Args:
+            clase: Plataforma, Enemigo o Moneda
+            *datos: Argumentos de colocar() (los mismos que los del constructor)
+            
+        Returns:
+            pygame.sprite.Sprite: Sprite reutilizado, o nuevo si no queda ninguno libre
+        """
+        libres = self.libres.get(clase)
+        if not libres:
+            return clase(*datos)
+        sprite = libres.pop()
+        sprite.colocar(*datos)
+        return sprite
+        
+    def devolver(self, sprite):
+        """Saca un sprite de sus grupos y lo guarda para reutilizarlo."""
+        sprite.kill()
+        self.libres.setdefault(type(sprite), []).append(sprite)
+        
+    def __len__(self):
+        return sum(len(libres) for libres in self.libres.values())
+
+# Reserva compartida por todos los niveles
+reserva_sprites = ReservaSprites()
+
+def dibujar_interpolado(pantalla, grupo, alpha, camara_x=0):
+    """
+    Dibuja los sprites de un grupo entre su posición anterior y la actual.
+    
+    Args:
+        pantalla: Superficie donde dibujar
+        grupo: Grupo de sprites con rect y pos_anterior
+        alpha: Fracción del paso de lógica transcurrida (0.0 a 1.0)
+        camara_x: Posición horizontal de la cámara en el mundo
+        
+    Returns:
+        list: Rectángulos dibujados
+    """
+    rects = []
+    for sprite in grupo:
+        x_anterior, y_anterior = sprite.pos_anterior
+        x = x_anterior + (sprite.rect.x - x_anterior) * alpha
+        y = y_anterior + (sprite.rect.y - y_anterior) * alpha
+        rects.append(pantalla.blit(sprite.image, (round(x) - camara_x, round(y))))
+    return rects
+
+# Clase para un trozo vertical del mundo que se carga y libera por separado
+class Segmento:
+    """
+    Trozo del nivel de ANCHO_SEGMENTO píxeles que se carga y libera entero.
+
+    Las plataformas (partidas en sus bordes) y las monedas son del segmento
+    en el que están. Un enemigo, en cambio, es de todos los segmentos que
+    cubre su patrulla [límite izquierdo, límite derecho], no solo del de su
+    posición inicial: así sigue moviéndose, dibujándose y chocando mientras
+    alguno de ellos esté cargado. Como los enemigos están ordenados por
+    segmento, los de un segmento se guardan como el rango contiguo que los
+    contiene a todos (puede incluir algún enemigo vecino, que solo se activa
+    antes).
+    """
+    
+    def __init__(self, indice, datos):
+        self.indice = indice
+        # Rangos de sus entidades en las tablas del nivel compilado
+        self.plataformas = (int(datos.inicio_plataformas[indice]), int(datos.inicio_plataformas[indice + 1]))
+        self.enemigos = self.rango_enemigos(indice, datos)
+        self.monedas = (int(datos.inicio_monedas[indice]), int(datos.inicio_monedas[indice + 1]))
+        self.sprites = []  # Sprites de plataformas y monedas creados mientras está activo
+        
+    @staticmethod
+    def rango_enemigos(indice, datos):
+        """
+        Rango de los enemigos que empiezan en un segmento o cuya patrulla lo cruza.
+        
+        Returns:
+            tuple: (inicio, fin) en la tabla de enemigos; vacío si no hay ninguno
+        """
+        inicio, fin = int(datos.inicio_enemigos[indice]), int(datos.inicio_enemigos[indice + 1])
+        izquierda = indice * datos.ancho_segmento
+        tabla = datos.enemigos
+        cubren = np.flatnonzero((tabla[:, 2] < izquierda + datos.ancho_segmento) & (tabla[:, 3] > izquierda))
+        if len(cubren) == 0:
+            return (inicio, fin)
+        if inicio == fin:
+            return (int(cubren[0]), int(cubren[-1]) + 1)
+        return (min(inicio, int(cubren[0])), max(fin, int(cubren[-1]) + 1))
 
 # Clase para gestionar niveles
 class Nivel:
-    def __init__(self, numero):
+    def __init__(self, numero, ruta=None, semilla=None):
         self.numero = numero
+        self.ruta = ruta or niveles.ruta_nivel(numero)
         self.plataformas = pygame.sprite.Group()
         self.enemigos = pygame.sprite.Group()
         self.monedas = pygame.sprite.Group()
         self.tiempo_limite = 120  # 2 minutos por defecto
         self.tiempo_restante = self.tiempo_limite
-        self.ultimo_tiempo = pygame.time.get_ticks()
+        self.frames_segundo = 0  # Pasos de lógica desde el último segundo descontado
         self.monedas_totales = 0
+        self.reloj_animacion = 0  # Pasos de lógica para la animación de las monedas
+        # Generador aleatorio propio de la partida: con la misma semilla se
+        # repite la misma partida (las grabaciones guardan la semilla) sin
+        # tocar el módulo random global
+        self.semilla = int.from_bytes(os.urandom(8), "little") if semilla is None else semilla
+        self.aleatorio = random.Random(self.semilla)
         
-        # Configurar nivel según el número
+        # Configurar nivel según su archivo
         self.configurar_nivel()
         
     def configurar_nivel(self):
-        # Suelo base para todos los niveles
-        print(f"DEBUG - Configurando nivel {self.numero}")
-        print(f"DEBUG - Creando suelo base")
-        self.plataformas.add(Plataforma(0, ALTO - 50, ANCHO, 50))
-        
-        if self.numero == 1:
-            # Nivel 1: Fácil, pocas plataformas y enemigos
-            print(f"DEBUG - Configurando nivel 1")
-            print(f"DEBUG - Creando plataformas nivel 1")
-            self.plataformas.add(Plataforma(200, 400, 100, 20))
-            self.plataformas.add(Plataforma(400, 350, 100, 20))
-            self.plataformas.add(Plataforma(600, 300, 100, 20))
-            
-            print(f"DEBUG - Creando enemigos nivel 1")
-            self.enemigos.add(Enemigo(300, ALTO - 80))
-            self.enemigos.add(Enemigo(500, ALTO - 80))
-            
-            print(f"DEBUG - Creando monedas nivel 1")
-            for i in range(5):
-                self.monedas.add(Moneda(150 + i * 100, 350))
-                
-            self.tiempo_limite = 60  # 1 minuto
-            
-        elif self.numero == 2:
-            # Nivel 2: Dificultad media
-            self.plataformas.add(Plataforma(100, 450, 100, 20))
-            self.plataformas.add(Plataforma(300, 400, 100, 20))
-            self.plataformas.add(Plataforma(500, 350, 100, 20))
-            self.plataformas.add(Plataforma(300, 250, 100, 20))
-            self.plataformas.add(Plataforma(100, 200, 100, 20))
-            
-            self.enemigos.add(Enemigo(200, ALTO - 80))
-            self.enemigos.add(Enemigo(400, ALTO - 80))
-            self.enemigos.add(Enemigo(600, ALTO - 80))
-            
-            for i in range(8):
-                self.monedas.add(Moneda(100 + i * 80, 300))
-                
-            self.tiempo_limite = 90  # 1.5 minutos
-            
-        elif self.numero == 3:
-            # Nivel 3: Difícil
-            self.plataformas.add(Plataforma(100, 500, 100, 20))
-            self.plataformas.add(Plataforma(300, 450, 100, 20))
-            self.plataformas.add(Plataforma(500, 400, 100, 20))
-            self.plataformas.add(Plataforma(300, 350, 100, 20))
-            self.plataformas.add(Plataforma(100, 300, 100, 20))
-            self.plataformas.add(Plataforma(300, 250, 100, 20))
-            self.plataformas.add(Plataforma(500, 200, 100, 20))
-            
-            self.enemigos.add(Enemigo(150, ALTO - 80))
-            self.enemigos.add(Enemigo(350, ALTO - 80))
-            self.enemigos.add(Enemigo(550, ALTO - 80))
-            self.enemigos.add(Enemigo(250, 420))
-            self.enemigos.add(Enemigo(450, 320))
+        # Los niveles se describen en archivos de assets/niveles; los sprites
+        # se crean al cargar cada segmento
+        self.datos = niveles.cargar(self.ruta, ANCHO_SEGMENTO)
+        self.tiempo_limite = self.datos.tiempo_limite
+        self.tiempo_restante = self.tiempo_limite
+        self.monedas_totales = len(self.datos.monedas)
+        self.construir_segmentos()
+        
+    def construir_segmentos(self):
+        """Crea los segmentos, los índices espaciales, la cámara y el sistema de enemigos."""
+        datos = self.datos
+        self.ancho = datos.ancho
+        self.limites = (0, 0, self.ancho, ALTO - 50)
+        self.camara = renderizado.Camara(self.ancho, ANCHO, ALTO)
+        self.segmentos = {}  # Índice -> Segmento, creado la primera vez que se carga
+        self.segmentos_activos = {}  # Índice -> Segmento cargado
+        self.segmento_actual = None  # Segmento en el que está Nick
+        # Monedas recogidas (una casilla por moneda del nivel) y cuántas son
+        self.monedas_recogidas = np.zeros(len(datos.monedas), dtype=bool)
+        self.num_monedas_recogidas = 0
+        # Índice de moneda -> sprite, de las monedas de los segmentos cargados
+        self.sprites_monedas = {}
+        
+        # Los enemigos están ordenados por segmento, así que los de los
+        # segmentos activos forman un rango contiguo en los arrays del sistema;
+        # tienen sprite los de ese rango
+        tabla = datos.enemigos
+        num_enemigos = len(tabla)
+        filas = np.column_stack((tabla[:, 0], tabla[:, 1],
+                                 np.full(num_enemigos, Enemigo.TAMAÑO), np.full(num_enemigos, Enemigo.TAMAÑO),
+                                 np.full(num_enemigos, Enemigo.VELOCIDAD), np.ones(num_enemigos),
+                                 tabla[:, 2], tabla[:, 3]))
+        # Los enemigos se mueven cada paso: se consultan sobre sus arrays
+        self.sistema_enemigos = enemigos.SistemaEnemigos(filas)
+        self.sistema_enemigos.establecer_activos(0, 0)
+        
+        # Las plataformas de cada tamaño usado en el nivel se empaquetan en el
+        # atlas de una vez, antes de crear ningún sprite
+        tamaños = np.unique(datos.plataformas[:, 2:4], axis=0).tolist()
+        recursos.atlas.asegurar(("plataforma.png", tamaño) for tamaño in tamaños)
+        
+        self.rejilla_plataformas = fisica.RejillaEspacial()
+        self.rejilla_monedas = fisica.RejillaEspacial()
+        # Plataformas de cada segmento cargado compuestas en una superficie
+        self.capa_estatica = renderizado.CapaEstatica()
+        self.actualizar_segmentos(ANCHO // 4)
+        
+    def activar_segmento(self, segmento):
+        """Crea los sprites de un segmento y los registra en grupos e índices."""
+        inicio, fin = segmento.plataformas
+        for datos in self.datos.plataformas[inicio:fin].tolist():
+            plataforma = reserva_sprites.obtener(Plataforma, *datos)
+            segmento.sprites.append(plataforma)
+            self.plataformas.add(plataforma)
+            self.rejilla_plataformas.insertar(plataforma)
+        self.capa_estatica.crear(segmento.indice, segmento.sprites)
             
-            for i in range(10):
-                self.monedas.add(Moneda(80 + i * 70, 250))
+        inicio, fin = segmento.monedas
+        recogidas = self.monedas_recogidas[inicio:fin].tolist()
+        for i, (x, y) in enumerate(self.datos.monedas[inicio:fin].tolist(), inicio):
+            if not recogidas[i - inicio]:
+                moneda = reserva_sprites.obtener(Moneda, x, y)
+                moneda.indice = i
+                segmento.sprites.append(moneda)
+                self.sprites_monedas[i] = moneda
+                self.monedas.add(moneda)
+                self.rejilla_monedas.insertar(moneda)
+        
+    def liberar_segmento(self, segmento):
+        """Devuelve a la reserva los sprites de un segmento; su estado queda en los datos del nivel."""
+        for sprite in segmento.sprites:
+            self.rejilla_plataformas.eliminar(sprite)
+            self.rejilla_monedas.eliminar(sprite)
+            reserva_sprites.devolver(sprite)
+        self.capa_estatica.liberar(segmento.indice)
+        for i in range(*segmento.monedas):
+            self.sprites_monedas.pop(i, None)
+        segmento.sprites = []
+        
+    def activar_enemigos(self, inicio, fin):
+        """
+        Deja activos y con sprite exactamente los enemigos del rango [inicio, fin).
+        
+        Un enemigo puede ser de varios segmentos cargados, así que sus sprites
+        no son de ningún segmento: se crean al entrar en el rango activo y
+        vuelven a la reserva al salir de él.
+        """
+        sistema = self.sistema_enemigos
+        for i in range(sistema.inicio, sistema.fin):
+            if not inicio <= i < fin and sistema.sprites[i] is not None:
+                reserva_sprites.devolver(sistema.sprites[i])
+                sistema.sprites[i] = None
+        for i in range(inicio, fin):
+            if sistema.sprites[i] is None:
+                enemigo = reserva_sprites.obtener(Enemigo, int(sistema.x[i]), int(sistema.y[i]))
+                sistema.sprites[i] = enemigo
+                self.enemigos.add(enemigo)
+        sistema.establecer_activos(inicio, fin)
+        
+    def actualizar_segmentos(self, x_jugador):
+        """
+        Activa los segmentos cercanos a Nick y libera los lejanos.
+        
+        Args:
+            x_jugador: Posición horizontal de Nick en el mundo
+        """
+        actual = min(max(int(x_jugador), 0) // ANCHO_SEGMENTO, self.datos.num_segmentos - 1)
+        if actual == self.segmento_actual:
+            return
+        self.segmento_actual = actual
+        
+        # Solo se revisan los segmentos cargados y los cercanos, de modo que
+        # el coste no depende de la longitud del nivel
+        indices = [indice for indice in self.segmentos_activos
+                   if abs(indice - actual) <= SEGMENTOS_LIBERACION]
+        indices.extend(range(max(0, actual - SEGMENTOS_ACTIVACION),
+                             min(self.datos.num_segmentos, actual + SEGMENTOS_ACTIVACION + 1)))
+        self.cargar_segmentos(indices)
+        
+    def cargar_segmentos(self, indices):
+        """
+        Deja cargados exactamente los segmentos indicados.
+        
+        Args:
+            indices: Índices de los segmentos que deben quedar cargados
+        """
+        indices = set(indices)
+        for indice in list(self.segmentos_activos):
+            if indice not in indices:
+                self.liberar_segmento(self.segmentos_activos.pop(indice))
+        for indice in sorted(indices):
+            if indice not in self.segmentos_activos:
+                segmento = self.segmentos.get(indice)
+                if segmento is None:
+                    segmento = self.segmentos[indice] = Segmento(indice, self.datos)
+                self.activar_segmento(segmento)
+                self.segmentos_activos[indice] = segmento
                 
-            self.tiempo_limite = 120  # 2 minutos
-        
-        elif self.numero == 4:
-            # Nivel 4: Muy difícil
-            # Plataformas más pequeñas y dispersas
-            self.plataformas.add(Plataforma(100, 500, 80, 20))
-            self.plataformas.add(Plataforma(250, 450, 80, 20))
-            self.plataformas.add(Plataforma(400, 400, 80, 20))
-            self.plataformas.add(Plataforma(550, 350, 80, 20))
-            self.plataformas.add(Plataforma(400, 300, 80, 20))
-            self.plataformas.add(Plataforma(250, 250, 80, 20))
-            self.plataformas.add(Plataforma(100, 200, 80, 20))
-            self.plataformas.add(Plataforma(250, 150, 80, 20))
-            self.plataformas.add(Plataforma(400, 100, 80, 20))
-            
-            # Más enemigos y en posiciones estratégicas
-            self.enemigos.add(Enemigo(150, ALTO - 80))
-            self.enemigos.add(Enemigo(350, ALTO - 80))
-            self.enemigos.add(Enemigo(550, ALTO - 80))
-            self.enemigos.add(Enemigo(200, 470))
-            self.enemigos.add(Enemigo(350, 370))
-            self.enemigos.add(Enemigo(500, 270))
-            self.enemigos.add(Enemigo(300, 220))
-            
-            # Monedas más dispersas y difíciles de alcanzar
-            for i in range(5):
-                self.monedas.add(Moneda(120 + i * 150, 450 - i * 80))
-            
-            for i in range(5):
-                self.monedas.add(Moneda(700 - i * 150, 100 + i * 80))
-            
-            # Tiempo más ajustado
-            self.tiempo_limite = 150  # 2.5 minutos
+        rangos = [segmento.enemigos for segmento in self.segmentos_activos.values()
+                  if segmento.enemigos[0] < segmento.enemigos[1]]
+        if rangos:
+            self.activar_enemigos(min(inicio for inicio, _ in rangos), max(fin for _, fin in rangos))
+        else:
+            self.activar_enemigos(0, 0)
         
+    def reiniciar(self):
+        """
+        Devuelve el nivel a su estado inicial sin volver a crearlo.
+        
+        Conserva los datos compilados, los segmentos y los índices; los
+        sprites de los segmentos cargados pasan por la reserva y vuelven a
+        colocarse con todas las monedas y los enemigos en su posición
+        inicial, y la capa estática vuelve a componer sus superficies.
+        """
         self.tiempo_restante = self.tiempo_limite
-        self.monedas_totales = len(self.monedas)
+        self.frames_segundo = 0
+        self.reloj_animacion = 0
+        self.aleatorio.seed(self.semilla)
+        self.cargar_segmentos(())
+        self.monedas_recogidas[:] = False
+        self.num_monedas_recogidas = 0
+        self.sistema_enemigos.reiniciar()
+        self.segmento_actual = None
+        self.actualizar_segmentos(ANCHO // 4)
+        
+    def liberar(self):
+        """Devuelve a la reserva todos los sprites del nivel, que deja de usarse."""
+        self.cargar_segmentos(())
+        self.segmento_actual = None
+        
+    @property
+    def monedas_restantes(self):
+        """Número de monedas del nivel que quedan por recoger."""
+        return self.monedas_totales - self.num_monedas_recogidas
+        
+    def establecer_monedas_recogidas(self, recogidas, num_recogidas):
+        """
+        Cambia qué monedas están recogidas, tocando solo los sprites de las
+        monedas que cambian en los segmentos cargados.
+        
+        Args:
+            recogidas: Array de booleanos con una casilla por moneda
+            num_recogidas: Número de casillas a True
+        """
+        cambios = np.flatnonzero(recogidas != self.monedas_recogidas)
+        self.monedas_recogidas[:] = recogidas
+        self.num_monedas_recogidas = num_recogidas
+        if not len(cambios):
+            return
+        indices_segmento = np.searchsorted(self.datos.inicio_monedas, cambios, side="right") - 1
+        for i, indice_segmento in zip(cambios.tolist(), indices_segmento.tolist()):
+            # Las monedas recogidas conservan su sprite hasta que se libera
+            # el segmento
+            moneda = self.sprites_monedas.get(i)
+            if recogidas[i]:
+                if moneda is not None:
+                    moneda.kill()
+                    self.rejilla_monedas.eliminar(moneda)
+                continue
+            if moneda is None:
+                segmento = self.segmentos_activos.get(indice_segmento)
+                if segmento is None:
+                    continue
+                moneda = reserva_sprites.obtener(Moneda, *self.datos.monedas[i].tolist())
+                moneda.indice = i
+                segmento.sprites.append(moneda)
+                self.sprites_monedas[i] = moneda
+            self.monedas.add(moneda)
+            self.rejilla_monedas.insertar(moneda)
+        
+    def actualizar_enemigos(self):
+        self.sistema_enemigos.actualizar()
         
     def actualizar_tiempo(self):
-        tiempo_actual = pygame.time.get_ticks()
-        if tiempo_actual - self.ultimo_tiempo >= 1000:  # 1 segundo
+        # Se llama una vez por paso de lógica: FPS pasos equivalen a 1 segundo
+        # de juego, aunque se pierdan frames dibujados
+        self.frames_segundo += 1
+        if self.frames_segundo >= FPS:  # 1 segundo
             self.tiempo_restante -= 1
-            self.ultimo_tiempo = tiempo_actual
+            self.frames_segundo = 0
             
-    def dibujar(self, pantalla):
+    def enfocar(self, jugador, alpha=1.0):
+        """Centra la cámara en la posición interpolada de Nick."""
+        x_anterior = jugador.pos_anterior[0]
+        x = x_anterior + (jugador.rect.x - x_anterior) * alpha
+        self.camara.seguir(x + jugador.rect.width / 2)
+        
+    def dibujar(self, pantalla, alpha=1.0):
+        self.dibujar_estatico(pantalla)
+        self.dibujar_dinamico(pantalla, alpha)
+        self.dibujar_hud(pantalla)
+        
+    def dibujar_fondo(self, pantalla):
         # Dibujar fondo según el nivel
-        nombre_fondo = f"fondo_nivel{self.numero}.png"
+        nombre_fondo = self.datos.fondo
         if nombre_fondo in recursos.imagenes:
-            # Usar la imagen de fondo si existe
+            # Usar la imagen de fondo si existe, repetida en horizontal y
+            # desplazada más despacio que la cámara
             fondo = recursos.imagenes[nombre_fondo]
-            pantalla.blit(fondo, (0, 0))
+            ancho_fondo = fondo.get_width()
+            x = -(int(self.camara.x * PARALAJE_FONDO) % ancho_fondo)
+            while x < ANCHO:
+                pantalla.blit(fondo, (x, 0))
+                x += ancho_fondo
         else:
             # Si no existe, usar color de fondo predeterminado
             pantalla.fill(AZUL_CIELO)
         
+    def dibujar_estatico(self, pantalla):
+        """Dibuja lo que no se mueve: el fondo y, encima, las plataformas de los segmentos cargados."""
+        self.dibujar_fondo(pantalla)
+        self.capa_estatica.dibujar(pantalla, self.camara.x)
+        
+    def restaurar_zona(self, pantalla, rect):
+        """Vuelve a dibujar el contenido estático dentro de un rectángulo de pantalla."""
+        recorte = pantalla.get_clip()
+        pantalla.set_clip(rect)
+        self.dibujar_estatico(pantalla)
+        pantalla.set_clip(recorte)
+        
+    def dibujar_dinamico(self, pantalla, alpha=1.0):
+        """
+        Dibuja lo que cambia cada frame: enemigos y monedas.
+        
+        Returns:
+            list: Rectángulos dibujados
+        """
         # Dibujar elementos del nivel
-        self.plataformas.draw(pantalla)
-        self.enemigos.draw(pantalla)
-        self.monedas.draw(pantalla)
+        rects = self.sistema_enemigos.dibujar(pantalla, alpha, self.camara.x)
+        rects += Moneda.dibujar_grupo(pantalla, self.rejilla_monedas.consultar(self.camara.vista),
+                                      self.reloj_animacion, self.camara.x)
+        return rects
         
+    def dibujar_hud(self, pantalla):
+        """
+        Dibuja la información del nivel: número y tiempo restante.
+        
+        Returns:
+            list: Rectángulos dibujados
+        """
         # Dibujar información del nivel
-        fuente = pygame.font.Font(None, 36)
-        texto_nivel = fuente.render(f"Nivel: {self.numero}", True, NEGRO)
-        texto_tiempo = fuente.render(f"Tiempo: {self.tiempo_restante}", True, NEGRO)
+        texto_nivel = hud.renderizar("Nivel: ", self.numero)
+        texto_tiempo = hud.renderizar("Tiempo: ", self.tiempo_restante)
         
-        pantalla.blit(texto_nivel, (10, 10))
-        pantalla.blit(texto_tiempo, (ANCHO - 150, 10))
+        return [pantalla.blit(texto_nivel, (10, 10)),
+                pantalla.blit(texto_tiempo, (ANCHO - 150, 10))]
         
     def manejar_colisiones(self, jugador):
         # Colisiones con plataformas
-        fisica.detectar_colision_plataforma(jugador, self.plataformas)
+        fisica.detectar_colision_plataforma(jugador, self.plataformas, rejilla=self.rejilla_plataformas)
         
         # Colisiones con enemigos
-        if fisica.detectar_colision_enemigo(jugador, self.enemigos):
+        if fisica.detectar_colision_enemigo(jugador, self.enemigos, rejilla=self.sistema_enemigos):
             if jugador.perder_vida():
                 sonido.reproducir_efecto("game_over")
                 return GAME_OVER
             else:
                 jugador.reposicionar()
                 
-        # Colisiones con monedas
-        fisica.detectar_colision_moneda(jugador, self.monedas, jugador.recoger_moneda)
+        # Colisiones con monedas; una moneda recogida no vuelve a crearse si
+        # su segmento se recarga
+        def recoger_moneda(moneda):
+            self.monedas_recogidas[moneda.indice] = True
+            self.num_monedas_recogidas += 1
+            jugador.recoger_moneda(moneda)
+            
+        fisica.detectar_colision_moneda(jugador, self.monedas, recoger_moneda,
+                                        rejilla=self.rejilla_monedas)
         
         # Verificar victoria (todas las monedas recogidas)
-        if len(self.monedas) == 0:
+        if self.monedas_restantes == 0:
             sonido.reproducir_efecto("victoria")
             return VICTORIA
             
         return None
 
-# Clase para el menú principal
-class Menu:
-    def __init__(self):
-        self.fuente_titulo = pygame.font.Font(None, 72)
-        self.fuente_opciones = pygame.font.Font(None, 48)
+# Clase base para las pantallas de menú
+class PantallaMenu:
+    """
+    Pantalla de menú en modo retenido.
+    
+    El fondo, el título y las opciones se componen una sola vez; después
+    solo se vuelven a dibujar las dos opciones cuyo resaltado cambia al
+    mover opcion_seleccionada.
+    """
+    
+    def __init__(self, titulo, opciones, y_titulo, y_opciones,
+                 color_fondo=AZUL_CIELO, color_titulo=NEGRO, color_opciones=NEGRO):
+        self.fuente_titulo = recursos.cargar_fuente(None, 72)
+        self.fuente_opciones = recursos.cargar_fuente(None, 48)
         self.opcion_seleccionada = 0
-        self.opciones = ["Jugar", "Seleccionar Nivel", "Salir"]
+        self.opciones = opciones
+        self.titulo = titulo
+        self.y_titulo = y_titulo
+        self.y_opciones = y_opciones
+        self.color_fondo = color_fondo
+        self.color_titulo = color_titulo
+        self.color_opciones = color_opciones
         
-    def dibujar(self, pantalla):
-        pantalla.fill(AZUL_CIELO)
+        self.fondo = None  # Pantalla precompuesta con ninguna opción resaltada
+        self.opciones_resaltadas = []  # (superficie resaltada, rect) por opción
+        self.opcion_dibujada = None  # Opción resaltada en pantalla (None: redibujar todo)
+        
+    def componer(self):
+        """Compone el fondo con el título y todas las opciones sin resaltar."""
+        self.fondo = pygame.Surface((ANCHO, ALTO)).convert()
+        self.fondo.fill(self.color_fondo)
         
         # Título
-        texto_titulo = self.fuente_titulo.render("SuperNick", True, NEGRO)
-        pantalla.blit(texto_titulo, (ANCHO // 2 - texto_titulo.get_width() // 2, 100))
+        texto_titulo = self.fuente_titulo.render(self.titulo, True, self.color_titulo)
+        self.fondo.blit(texto_titulo, (ANCHO // 2 - texto_titulo.get_width() // 2, self.y_titulo))
         
         # Opciones
+        self.opciones_resaltadas = []
         for i, opcion in enumerate(self.opciones):
-            if i == self.opcion_seleccionada:
-                color = (255, 0, 0)  # Rojo para la opción seleccionada
-            else:
-                color = NEGRO
-                
-            texto_opcion = self.fuente_opciones.render(opcion, True, color)
-            pantalla.blit(texto_opcion, (ANCHO // 2 - texto_opcion.get_width() // 2, 250 + i * 60))
+            texto_opcion = self.fuente_opciones.render(opcion, True, self.color_opciones)
+            rect = texto_opcion.get_rect(topleft=(ANCHO // 2 - texto_opcion.get_width() // 2,
+                                                  self.y_opciones + i * 60))
+            self.fondo.blit(texto_opcion, rect)
+            
+            # Rojo para la opción seleccionada
+            texto_resaltado = self.fuente_opciones.render(opcion, True, (255, 0, 0))
+            self.opciones_resaltadas.append((texto_resaltado, rect))
+            
+    def invalidar(self):
+        """Obliga a redibujar la pantalla completa en el próximo dibujar()."""
+        self.opcion_dibujada = None
+        
+    def dibujar(self, pantalla):
+        """
+        Dibuja lo que haya cambiado desde la última llamada.
+        
+        Args:
+            pantalla: Superficie donde dibujar
+            
+        Returns:
+            list: Rectángulos de pantalla modificados (vacía si no cambió nada)
+        """
+        if self.fondo is None:
+            self.componer()
+            
+        if self.opcion_dibujada is None:
+            pantalla.blit(self.fondo, (0, 0))
+            texto_resaltado, rect = self.opciones_resaltadas[self.opcion_seleccionada]
+            pantalla.blit(texto_resaltado, rect)
+            self.opcion_dibujada = self.opcion_seleccionada
+            return [pantalla.get_rect()]
+            
+        if self.opcion_dibujada == self.opcion_seleccionada:
+            return []
+            
+        # Quitar el resaltado de la opción anterior y resaltar la nueva
+        _, rect_anterior = self.opciones_resaltadas[self.opcion_dibujada]
+        pantalla.blit(self.fondo, rect_anterior, rect_anterior)
+        texto_resaltado, rect = self.opciones_resaltadas[self.opcion_seleccionada]
+        pantalla.blit(self.fondo, rect, rect)
+        pantalla.blit(texto_resaltado, rect)
+        self.opcion_dibujada = self.opcion_seleccionada
+        return [rect_anterior, rect]
             
     def manejar_eventos(self, evento):
         if evento.type == KEYDOWN:
@@ -380,127 +766,247 @@ class Menu:
                 return self.opcion_seleccionada
         return None
 
+# Clase para el menú principal
+class Menu(PantallaMenu):
+    def __init__(self):
+        super().__init__("SuperNick", ["Jugar", "Seleccionar Nivel", "Salir"], 100, 250)
+
 # Clase para la pantalla de selección de nivel
-class SeleccionNivel:
+class SeleccionNivel(PantallaMenu):
     def __init__(self):
-        self.fuente_titulo = pygame.font.Font(None, 72)
-        self.fuente_opciones = pygame.font.Font(None, 48)
-        self.nivel_seleccionado = 0
-        self.niveles = ["Nivel 1", "Nivel 2", "Nivel 3", "Nivel 4", "Volver"]
-        
-    def dibujar(self, pantalla):
-        pantalla.fill(AZUL_CIELO)
-        
-        # Título
-        texto_titulo = self.fuente_titulo.render("Seleccionar Nivel", True, NEGRO)
-        pantalla.blit(texto_titulo, (ANCHO // 2 - texto_titulo.get_width() // 2, 100))
-        
-        # Opciones de niveles
-        for i, nivel in enumerate(self.niveles):
-            if i == self.nivel_seleccionado:
-                color = (255, 0, 0)  # Rojo para la opción seleccionada
-            else:
-                color = NEGRO
-                
-            texto_nivel = self.fuente_opciones.render(nivel, True, color)
-            pantalla.blit(texto_nivel, (ANCHO // 2 - texto_nivel.get_width() // 2, 250 + i * 60))
-            
-    def manejar_eventos(self, evento):
-        if evento.type == KEYDOWN:
-            if evento.key == K_UP:
-                self.nivel_seleccionado = (self.nivel_seleccionado - 1) % len(self.niveles)
-                sonido.reproducir_efecto("moneda")
-            elif evento.key == K_DOWN:
-                self.nivel_seleccionado = (self.nivel_seleccionado + 1) % len(self.niveles)
-                sonido.reproducir_efecto("moneda")
-            elif evento.key == K_RETURN:
-                sonido.reproducir_efecto("salto")
-                return self.nivel_seleccionado
-        return None
+        # Una opción por cada archivo de nivel disponible, más "Volver"
+        self.numeros = niveles.numeros_disponibles()
+        super().__init__("Seleccionar Nivel", [f"Nivel {numero}" for numero in self.numeros] + ["Volver"],
+                         100, 250)
 
 # Clase para la pantalla de Game Over
-class GameOver:
+class GameOver(PantallaMenu):
     def __init__(self):
-        self.fuente_titulo = pygame.font.Font(None, 72)
-        self.fuente_opciones = pygame.font.Font(None, 48)
-        self.opcion_seleccionada = 0
-        self.opciones = ["Reintentar", "Menú Principal"]
-        
-    def dibujar(self, pantalla):
-        pantalla.fill(NEGRO)
-        
-        # Título
-        texto_titulo = self.fuente_titulo.render("Game Over", True, (255, 0, 0))
-        pantalla.blit(texto_titulo, (ANCHO // 2 - texto_titulo.get_width() // 2, 200))
-        
-        # Opciones
-        for i, opcion in enumerate(self.opciones):
-            if i == self.opcion_seleccionada:
-                color = (255, 0, 0)
-            else:
-                color = BLANCO
-                
-            texto_opcion = self.fuente_opciones.render(opcion, True, color)
-            pantalla.blit(texto_opcion, (ANCHO // 2 - texto_opcion.get_width() // 2, 300 + i * 60))
-            
-    def manejar_eventos(self, evento):
-        if evento.type == KEYDOWN:
-            if evento.key == K_UP:
-                self.opcion_seleccionada = (self.opcion_seleccionada - 1) % len(self.opciones)
-                sonido.reproducir_efecto("moneda")
-            elif evento.key == K_DOWN:
-                self.opcion_seleccionada = (self.opcion_seleccionada + 1) % len(self.opciones)
-                sonido.reproducir_efecto("moneda")
-            elif evento.key == K_RETURN:
-                sonido.reproducir_efecto("salto")
-                return self.opcion_seleccionada
-        return None
+        super().__init__("Game Over", ["Reintentar", "Menú Principal"], 200, 300,
+                         color_fondo=NEGRO, color_titulo=(255, 0, 0), color_opciones=BLANCO)
 
 # Clase para la pantalla de Victoria
-class Victoria:
+class Victoria(PantallaMenu):
     def __init__(self):
-        self.fuente_titulo = pygame.font.Font(None, 72)
-        self.fuente_opciones = pygame.font.Font(None, 48)
-        self.opcion_seleccionada = 0
-        self.opciones = ["Siguiente Nivel", "Menú Principal"]
+        super().__init__("¡Nivel Completado!", ["Siguiente Nivel", "Menú Principal"], 200, 300)
+
+def inicializar(cronometro=None):
+    """
+    Inicializa lo que necesita la primera pantalla: pygame y la ventana.
+    Las imágenes empiezan a cargarse en segundo plano y el sonido se
+    inicializa después de mostrar el primer frame del menú.
+    
+    Args:
+        cronometro: rendimiento.CronometroArranque donde anotar las fases
+    """
+    global pantalla, reloj, carga_recursos
+    
+    cronometro = cronometro or rendimiento.CronometroArranque()
+    pygame.display.init()
+    pygame.font.init()
+    cronometro.marcar("pygame")
+    
+    # Configuración de la pantalla
+    pantalla = pygame.display.set_mode((ANCHO, ALTO))
+    pygame.display.set_caption(TITULO)
+    reloj = pygame.time.Clock()
+    cronometro.marcar("ventana")
+    
+    # Inicializar recursos
+    carga_recursos = recursos.iniciar_carga()
+    cronometro.marcar("imágenes")
+
+def dibujar_pantalla_carga(pantalla, progreso):
+    """
+    Dibuja la pantalla de carga con una barra de progreso.
+    
+    Args:
+        pantalla: Superficie donde dibujar
+        progreso: Fracción cargada (0.0 a 1.0)
+    """
+    pantalla.fill(NEGRO)
+    texto = recursos.cargar_fuente(None, 48).render("Cargando...", True, BLANCO)
+    pantalla.blit(texto, texto.get_rect(center=(ANCHO // 2, ALTO // 2 - 40)))
+    
+    barra = pygame.Rect(0, 0, ANCHO // 2, 20)
+    barra.center = (ANCHO // 2, ALTO // 2 + 20)
+    pygame.draw.rect(pantalla, BLANCO, barra, 2)
+    relleno = barra.inflate(-6, -6)
+    relleno.width = int(relleno.width * progreso)
+    pygame.draw.rect(pantalla, BLANCO, relleno)
+    pygame.display.flip()
+
+def esperar_recursos():
+    """Termina la carga de imágenes, mostrando la pantalla de carga si hace falta."""
+    if carga_recursos.terminada:
+        return
+    
+    def al_progresar(progreso):
+        pygame.event.pump()  # Mantener la ventana respondiendo
+        dibujar_pantalla_carga(pantalla, progreso)
         
-    def dibujar(self, pantalla):
-        pantalla.fill(AZUL_CIELO)
+    carga_recursos.esperar(al_progresar)
+
+def cargar_nivel(numero, anterior=None):
+    """
+    Prepara un nivel para jugarlo, esperando antes a que estén cargadas las imágenes.
+    
+    Args:
+        numero: Número del nivel
+        anterior: Nivel jugado hasta ahora (None si no hay ninguno); si es
+            el mismo se reinicia en lugar de crearlo de nuevo
+            
+    Returns:
+        Nivel: Nivel listo para empezar la partida
+    """
+    esperar_recursos()
+    if anterior is not None:
+        if anterior.numero == numero:
+            anterior.reiniciar()
+            return anterior
+        anterior.liberar()
+    return Nivel(numero)
+
+def aplicar_entradas(jugador, izquierda, derecha, saltar=False):
+    """
+    Aplica el estado de los controles a Nick.
+    
+    Args:
+        jugador: Instancia de Nick
+        izquierda: True si la flecha izquierda está pulsada
+        derecha: True si la flecha derecha está pulsada
+        saltar: True si se ha pulsado la barra espaciadora en este frame
+    """
+    if saltar:
+        jugador.saltar()
         
-        # Título
-        texto_titulo = self.fuente_titulo.render("¡Nivel Completado!", True, NEGRO)
-        pantalla.blit(texto_titulo, (ANCHO // 2 - texto_titulo.get_width() // 2, 200))
+    if izquierda:
+        jugador.mover_izquierda()
+    elif derecha:
+        jugador.mover_derecha()
+    else:
+        jugador.detener()
+
+def actualizar_partida(nivel, jugador, todos_los_sprites):
+    """
+    Avanza un paso de lógica de duración fija (PASO_LOGICO) del estado JUGANDO.
+    
+    Args:
+        nivel: Nivel en curso
+        jugador: Instancia de Nick
+        todos_los_sprites: Grupo con los sprites del jugador
         
-        # Opciones
-        for i, opcion in enumerate(self.opciones):
-            if i == self.opcion_seleccionada:
-                color = (255, 0, 0)
-            else:
-                color = NEGRO
-                
-            texto_opcion = self.fuente_opciones.render(opcion, True, color)
-            pantalla.blit(texto_opcion, (ANCHO // 2 - texto_opcion.get_width() // 2, 300 + i * 60))
-            
-    def manejar_eventos(self, evento):
-        if evento.type == KEYDOWN:
-            if evento.key == K_UP:
-                self.opcion_seleccionada = (self.opcion_seleccionada - 1) % len(self.opciones)
-                sonido.reproducir_efecto("moneda")
-            elif evento.key == K_DOWN:
-                self.opcion_seleccionada = (self.opcion_seleccionada + 1) % len(self.opciones)
-                sonido.reproducir_efecto("moneda")
-            elif evento.key == K_RETURN:
-                sonido.reproducir_efecto("salto")
-                return self.opcion_seleccionada
-        return None
+    Returns:
+        int: Nuevo estado del juego (GAME_OVER o VICTORIA) o None si no cambia
+    """
+    medidor = rendimiento.medidor
+    
+    # Cargar los segmentos cercanos a Nick y liberar los lejanos
+    nivel.actualizar_segmentos(jugador.rect.centerx)
+    jugador.limites = nivel.limites
+    
+    # Guardar posiciones para interpolar el dibujado
+    for sprite in todos_los_sprites:
+        sprite.guardar_posicion()
+    
+    # Actualizar sprites
+    todos_los_sprites.update()
+    medidor.marcar("sprites")
+    nivel.actualizar_enemigos()
+    nivel.reloj_animacion += 1  # Avanzar la animación de las monedas
+    
+    # Actualizar tiempo
+    nuevo_estado = None
+    nivel.actualizar_tiempo()
+    if nivel.tiempo_restante <= 0:
+        sonido.reproducir_efecto("game_over")
+        nuevo_estado = GAME_OVER
+    medidor.marcar("enemigos y monedas")
+        
+    # Manejar colisiones y verificar cambios de estado
+    estado_colisiones = nivel.manejar_colisiones(jugador)
+    if estado_colisiones:
+        nuevo_estado = estado_colisiones
+    medidor.marcar("colisiones")
+        
+    return nuevo_estado
+
+def dibujar_partida(pantalla, nivel, jugador, todos_los_sprites, alpha=1.0):
+    """
+    Dibuja los elementos móviles de la partida y el HUD sobre lo estático.
+    
+    Args:
+        pantalla: Superficie donde dibujar
+        nivel: Nivel en curso
+        jugador: Instancia de Nick
+        todos_los_sprites: Grupo con los sprites del jugador
+        alpha: Fracción del paso de lógica transcurrida (0.0 a 1.0)
+        
+    Returns:
+        list: Rectángulos dibujados
+    """
+    rects = nivel.dibujar_dinamico(pantalla, alpha)
+    rects += dibujar_interpolado(pantalla, todos_los_sprites, alpha, nivel.camara.x)
+    rendimiento.medidor.marcar("dibujo del nivel")
+    
+    # Dibujar la información del nivel, las vidas y la puntuación
+    rects += nivel.dibujar_hud(pantalla)
+    texto_vidas = hud.renderizar("Vidas: ", jugador.vidas)
+    texto_puntuacion = hud.renderizar("Puntos: ", jugador.puntuacion)
+    
+    rects.append(pantalla.blit(texto_vidas, (ANCHO - 150, 50)))
+    rects.append(pantalla.blit(texto_puntuacion, (10, 50)))
+    rendimiento.medidor.marcar("hud")
+    return rects
+
+def procesar_argumentos(argumentos=None):
+    """
+    Procesa los argumentos de la línea de comandos.
+    
+    Args:
+        argumentos: Lista de argumentos (None para usar sys.argv)
+        
+    Returns:
+        argparse.Namespace: Opciones del juego
+    """
+    parser = argparse.ArgumentParser(description=TITULO)
+    parser.add_argument("--renderizado-parcial", action="store_true",
+                        help="Redibujar y volcar solo las zonas que cambian (equipos lentos)")
+    parser.add_argument("--tiempos-arranque", action="store_true",
+                        help="Mostrar cuánto tarda cada fase del arranque")
+    parser.add_argument("--medir-frames", action="store_true",
+                        help="Empezar con el panel de tiempos por fase visible (se alterna con F3)")
+    parser.add_argument("--perfilar", type=float, nargs="?", const=DURACION_PERFIL, metavar="SEGUNDOS",
+                        help="Capturar un perfil desde el arranque (F4 lo captura durante la partida)")
+    parser.add_argument("--grabar", action="store_true",
+                        help="Grabar las entradas de cada partida en grabaciones/ para reproducirlas")
+    return parser.parse_args(argumentos)
 
 # Función principal del juego
 def main():
-    # Inicializar objetos del juego
+    cronometro = rendimiento.CronometroArranque(INICIO_PROCESO)
+    cronometro.marcar("importación")
+    opciones = procesar_argumentos()
+    if opciones.perfilar:
+        rendimiento.captura.iniciar(opciones.perfilar)
+    inicializar(cronometro)
+    
+    # Medición de las fases de cada frame, que se alterna con F3
+    medidor = rendimiento.medidor
+    if opciones.medir_frames:
+        medidor.alternar()
+    
+    # Renderizado por rectángulos sucios, opcional
+    renderizador = renderizado.RenderizadorParcial(pantalla) if opciones.renderizado_parcial else None
+    nivel_dibujado = None
+    camara_dibujada = None
+    
+    # Inicializar objetos del juego; Nick se crea al empezar la primera
+    # partida, cuando ya están cargadas las imágenes
     print("DEBUG - Iniciando juego")
-    nick = Nick()
+    nick = None
     todos_los_sprites = pygame.sprite.Group()
-    todos_los_sprites.add(nick)
+    grabadora = None  # Grabación de la partida en curso (con --grabar)
     
     # Inicializar menús
     print("DEBUG - Inicializando menús")
@@ -508,6 +1014,8 @@ def main():
     seleccion_nivel = SeleccionNivel()
     game_over = GameOver()
     victoria = Victoria()
+    cronometro.marcar("menús")
+    primer_frame = True
     
     # Estado inicial
     estado_actual = MENU
@@ -515,17 +1023,50 @@ def main():
     nivel_numero = 1
     print(f"DEBUG - Estado inicial: {estado_actual} (MENU={MENU}, JUGANDO={JUGANDO})")
     
+    # Tiempo real pendiente de simular y salto pulsado pendiente de aplicar
+    acumulador = 0.0
+    salto_pendiente = False
+    alpha = 1.0
+    
+    # Pantallas de menú por estado y estado que hay dibujado en pantalla
+    pantallas_menu = {
+        MENU: menu_principal,
+        SELECCION_NIVEL: seleccion_nivel,
+        GAME_OVER: game_over,
+        VICTORIA: victoria,
+    }
+    estado_dibujado = None
+    
     # Bucle principal del juego
     ejecutando = True
     while ejecutando:
-        # Control de FPS
-        reloj.tick(FPS)
+        # Control de FPS de dibujado; la lógica avanza en pasos fijos. Los
+        # menús solo cambian con el teclado y van a menos FPS. El primer frame
+        # no espera: se muestra en cuanto está listo
+        fps_objetivo = FPS_RENDER_MAXIMO if estado_actual == JUGANDO else FPS_MENU
+        delta = reloj.tick(0 if primer_frame else fps_objetivo) / 1000.0
+        medidor.empezar_frame()
+        
+        # Si el frame tarda demasiado se limita el número de pasos para no
+        # entrar en una espiral de pasos cada vez más largos
+        acumulador += min(delta, PASO_LOGICO * MAX_PASOS_POR_FRAME)
         
         # Manejo de eventos
         for evento in pygame.event.get():
             if evento.type == QUIT:
                 print("DEBUG - Evento QUIT detectado")
                 ejecutando = False
+            elif evento.type in (VIDEOEXPOSE, WINDOWEXPOSED):
+                # La ventana se ha descubierto: redibujar la pantalla completa
+                estado_dibujado = None
+            elif evento.type == KEYDOWN and evento.key == K_F3:
+                # Mostrar u ocultar el panel de tiempos; al ocultarlo hay que
+                # redibujar lo que tapaba
+                medidor.alternar()
+                estado_dibujado = None
+            elif evento.type == KEYDOWN and evento.key == K_F4:
+                # Capturar un perfil de los próximos segundos
+                rendimiento.captura.iniciar(DURACION_PERFIL)
                 
             # Manejo de eventos según el estado del juego
             if estado_actual == MENU:
@@ -533,7 +1074,7 @@ def main():
                 if opcion == 0:  # Jugar
                     print("DEBUG - Opción Jugar seleccionada")
                     estado_actual = JUGANDO
-                    nivel_actual = Nivel(nivel_numero)
+                    nivel_actual = cargar_nivel(nivel_numero, nivel_actual)
                     print(f"DEBUG - Nuevo estado: {estado_actual}")
                 elif opcion == 1:  # Seleccionar Nivel
                     print("DEBUG - Opción Seleccionar Nivel seleccionada")
@@ -545,29 +1086,28 @@ def main():
                     
             elif estado_actual == SELECCION_NIVEL:
                 opcion = seleccion_nivel.manejar_eventos(evento)
-                if opcion in [0, 1, 2, 3]:  # Niveles 1, 2, 3, 4
+                if opcion is not None and opcion < len(seleccion_nivel.numeros):  # Niveles
                     estado_actual = JUGANDO
-                    nivel_numero = opcion + 1
-                    nivel_actual = Nivel(nivel_numero)
-                elif opcion == 4:  # Volver
+                    nivel_numero = seleccion_nivel.numeros[opcion]
+                    nivel_actual = cargar_nivel(nivel_numero, nivel_actual)
+                elif opcion == len(seleccion_nivel.numeros):  # Volver
                     estado_actual = MENU
                     
             elif estado_actual == GAME_OVER:
                 opcion = game_over.manejar_eventos(evento)
                 if opcion == 0:  # Reintentar
+                    # Se reutilizan el nivel, Nick y sus sprites
                     estado_actual = JUGANDO
-                    nivel_actual = Nivel(nivel_numero)
-                    nick = Nick()
-                    todos_los_sprites = pygame.sprite.Group()
-                    todos_los_sprites.add(nick)
+                    nivel_actual = cargar_nivel(nivel_numero, nivel_actual)
+                    nick.reiniciar()
                 elif opcion == 1:  # Menú Principal
                     estado_actual = MENU
                     
             elif estado_actual == VICTORIA:
                 opcion = victoria.manejar_eventos(evento)
                 if opcion == 0:  # Siguiente Nivel
-                    nivel_numero = min(nivel_numero + 1, 4)
-                    nivel_actual = Nivel(nivel_numero)
+                    nivel_numero = niveles.siguiente(nivel_numero)
+                    nivel_actual = cargar_nivel(nivel_numero, nivel_actual)
                     estado_actual = JUGANDO
                 elif opcion == 1:  # Menú Principal
                     estado_actual = MENU
@@ -575,61 +1115,110 @@ def main():
             elif estado_actual == JUGANDO:
                 if evento.type == KEYDOWN:
                     if evento.key == K_SPACE:
-                        nick.saltar()
+                        # Se aplica en el siguiente paso de lógica
+                        salto_pendiente = True
+        
+        medidor.marcar("eventos")
+        
+        if estado_actual == JUGANDO and nick is None:
+            nick = Nick()
+            todos_los_sprites.add(nick)
+            
+        # Cada partida en un nivel nuevo empieza una grabación
+        if (opciones.grabar and estado_actual == JUGANDO
+                and (grabadora is None or grabadora.nivel is not nivel_actual)):
+            grabadora = repeticion.Grabadora(nivel_actual, nick)
         
         # Actualización del juego según el estado
         if estado_actual == JUGANDO:
             # Controles de movimiento
             teclas = pygame.key.get_pressed()
-            if teclas[K_LEFT]:
-                nick.mover_izquierda()
-            elif teclas[K_RIGHT]:
-                nick.mover_derecha()
-            else:
-                nick.detener()
-                
-            # Actualizar sprites
-            todos_los_sprites.update()
-            nivel_actual.enemigos.update()
-            nivel_actual.monedas.update()  # Actualizar monedas para animación
             
-            # Actualizar tiempo
-            nivel_actual.actualizar_tiempo()
-            if nivel_actual.tiempo_restante <= 0:
-                sonido.reproducir_efecto("game_over")
-                estado_actual = GAME_OVER
+            # Ejecutar todos los pasos de lógica pendientes; si el dibujado va
+            # lento se ejecutan varios por frame y el juego no se ralentiza
+            while acumulador >= PASO_LOGICO and estado_actual == JUGANDO:
+                if grabadora:
+                    grabadora.registrar(teclas[K_LEFT], teclas[K_RIGHT], salto_pendiente)
+                aplicar_entradas(nick, teclas[K_LEFT], teclas[K_RIGHT], salto_pendiente)
+                salto_pendiente = False
                 
-            # Manejar colisiones y verificar cambios de estado
-            nuevo_estado = nivel_actual.manejar_colisiones(nick)
-            if nuevo_estado:
-                estado_actual = nuevo_estado
+                nuevo_estado = actualizar_partida(nivel_actual, nick, todos_los_sprites)
+                if nuevo_estado:
+                    estado_actual = nuevo_estado
+                acumulador -= PASO_LOGICO
+                
+            # Fracción del siguiente paso ya transcurrida, para interpolar
+            alpha = acumulador / PASO_LOGICO
+            
+            # La grabación termina con la partida
+            if grabadora and estado_actual != JUGANDO:
+                grabadora.guardar()
+                grabadora = None
+        else:
+            # Fuera de la partida no se acumula tiempo de lógica
+            acumulador = 0.0
+            salto_pendiente = False
         
         # Dibujar según el estado del juego
-        if estado_actual == MENU:
-            menu_principal.dibujar(pantalla)
-        elif estado_actual == SELECCION_NIVEL:
-            seleccion_nivel.dibujar(pantalla)
+        if estado_actual in pantallas_menu:
+            # Los menús solo actualizan en pantalla lo que ha cambiado
+            pantalla_menu = pantallas_menu[estado_actual]
+            if estado_actual != estado_dibujado:
+                pantalla_menu.invalidar()
+            rects = pantalla_menu.dibujar(pantalla)
+            medidor.marcar("dibujo del nivel")
+            panel = medidor.dibujar(pantalla)
+            if panel:
+                rects.append(panel)
+            if rects:
+                pygame.display.update(rects)
+            medidor.marcar("volcado")
+            if primer_frame:
+                cronometro.marcar("primer frame")
+                if opciones.tiempos_arranque:
+                    print(cronometro.informe())
+                primer_frame = False
+                # El sonido se inicializa con el menú ya en pantalla y antes
+                # de atender ninguna tecla, que ya suena
+                sonido.inicializar()
         elif estado_actual == JUGANDO:
-            nivel_actual.dibujar(pantalla)
-            todos_los_sprites.draw(pantalla)
-            
-            # Dibujar vidas y puntuación
-            fuente = pygame.font.Font(None, 36)
-            texto_vidas = fuente.render(f"Vidas: {nick.vidas}", True, NEGRO)
-            texto_puntuacion = fuente.render(f"Puntos: {nick.puntuacion}", True, NEGRO)
-            
-            pantalla.blit(texto_vidas, (ANCHO - 150, 50))
-            pantalla.blit(texto_puntuacion, (10, 50))
-            
-        elif estado_actual == GAME_OVER:
-            game_over.dibujar(pantalla)
-        elif estado_actual == VICTORIA:
-            victoria.dibujar(pantalla)
+            nivel_actual.enfocar(nick, alpha)
+            if renderizador is None:
+                nivel_actual.dibujar_estatico(pantalla)
+                dibujar_partida(pantalla, nivel_actual, nick, todos_los_sprites, alpha)
+                medidor.dibujar(pantalla)
+                
+                # Actualizar pantalla
+                pygame.display.flip()
+                medidor.marcar("volcado")
+            else:
+                # Solo se restaura y vuelca lo que tocan los elementos móviles
+                # Si la cámara se ha movido cambia todo el contenido estático
+                if (estado_dibujado != JUGANDO or nivel_dibujado is not nivel_actual
+                        or nivel_actual.camara.x != camara_dibujada):
+                    renderizador.invalidar()
+                    nivel_actual.dibujar_estatico(pantalla)
+                    nivel_dibujado = nivel_actual
+                    camara_dibujada = nivel_actual.camara.x
+                else:
+                    renderizador.restaurar(nivel_actual.restaurar_zona)
+                rects = dibujar_partida(pantalla, nivel_actual, nick, todos_los_sprites, alpha)
+                panel = medidor.dibujar(pantalla)
+                if panel:
+                    rects.append(panel)
+                renderizador.presentar(rects)
+                medidor.marcar("volcado")
             
-        # Actualizar pantalla
-        pygame.display.flip()
+        estado_dibujado = estado_actual
+        
+        # Convertir las imágenes que ya se hayan decodificado, sin esperar;
+        # se hace tras dibujar para no retrasar el primer frame
+        carga_recursos.finalizar()
+        medidor.terminar_frame()
         
     # Salir del juego
+    if grabadora:
+        grabadora.guardar()
     pygame.quit()
     sys.exit()
 
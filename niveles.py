@@ -0,0 +1,254 @@
+"""
+Módulo para cargar los niveles del juego SuperNick.
+Los niveles se definen en archivos JSON en assets/niveles. Cada archivo se
+compila a una caché binaria con las tablas de entidades ya ordenadas por
+segmento; la caché se invalida por el hash del contenido del archivo y se
+lee de una vez, sin recorrer las entidades en Python.
+"""
+
+import os
+import re
+import json
+import struct
+import hashlib
+import numpy as np
+import recursos
+
+# Directorios de niveles y de la caché compilada
+DIR_NIVELES = os.path.join(recursos.DIR_ASSETS, "niveles")
+DIR_CACHE_NIVELES = os.path.join(recursos.DIR_CACHE, "niveles")
+
+# Formato de la caché: cabecera, nombre del fondo y tablas int32
+MAGIA = b"SNIV"
+VERSION_CACHE = 2
+# magia, versión, sha256 del archivo, ancho de segmento, ancho del mundo,
+# tiempo límite, nº de plataformas, enemigos, monedas y segmentos, longitud
+# del nombre del fondo
+CABECERA = struct.Struct("<4sI32siiiiiiiI")
+
+# Límite de patrulla que indica "usar el valor por defecto del segmento"
+LIMITE_POR_DEFECTO = -1
+
+PATRON_ARCHIVO = re.compile(r"^nivel(\d+)\.json$")
+
+class DatosNivel:
+    """
+    Tablas de un nivel compilado.
+
+    Las entidades están ordenadas por segmento; inicio_*[s]:inicio_*[s + 1]
+    es el rango de las entidades del segmento s en cada tabla.
+    """
+
+    def __init__(self, tiempo_limite, fondo, ancho, ancho_segmento,
+                 plataformas, enemigos, monedas,
+                 inicio_plataformas, inicio_enemigos, inicio_monedas):
+        self.tiempo_limite = tiempo_limite
+        self.fondo = fondo
+        self.ancho = ancho
+        self.ancho_segmento = ancho_segmento
+        self.plataformas = plataformas  # (x, y, ancho, alto)
+        self.enemigos = enemigos  # (x, y, límite izquierdo, límite derecho)
+        self.monedas = monedas  # (x, y)
+        self.inicio_plataformas = inicio_plataformas
+        self.inicio_enemigos = inicio_enemigos
+        self.inicio_monedas = inicio_monedas
+
+    @property
+    def num_segmentos(self):
+        return len(self.inicio_plataformas) - 1
+
+def ruta_nivel(numero):
+    """Devuelve la ruta del archivo de un nivel por su número."""
+    return os.path.join(DIR_NIVELES, f"nivel{numero}.json")
+
+def numeros_disponibles():
+    """
+    Devuelve los números de los niveles que hay en el directorio de niveles.
+
+    Returns:
+        list: Números de nivel ordenados
+    """
+    if not os.path.isdir(DIR_NIVELES):
+        return []
+    numeros = []
+    for nombre in os.listdir(DIR_NIVELES):
+        coincidencia = PATRON_ARCHIVO.match(nombre)
+        if coincidencia:
+            numeros.append(int(coincidencia.group(1)))
+    return sorted(numeros)
+
+def siguiente(numero):
+    """
+    Devuelve el número del nivel que sigue a otro.
+
+    Args:
+        numero: Número del nivel actual
+
+    Returns:
+        int: Siguiente nivel disponible, o el mismo si es el último
+    """
+    posteriores = [n for n in numeros_disponibles() if n > numero]
+    return posteriores[0] if posteriores else numero
+
+def _tabla(filas, columnas):
+    """Convierte una lista de filas en un array int32 de N x columnas."""
+    return np.array(filas, dtype=np.int32).reshape(-1, columnas)
+
+def _inicios(segmentos, num_segmentos):
+    """Índice de inicio de cada segmento en una tabla ordenada por segmento."""
+    conteo = np.bincount(segmentos, minlength=num_segmentos)
+    return np.concatenate(([0], np.cumsum(conteo))).astype(np.int32)
+
+def compilar(definicion, ancho_segmento):
+    """
+    Compila la definición JSON de un nivel en tablas ordenadas por segmento.
+
+    Args:
+        definicion: Diccionario leído del archivo del nivel
+        ancho_segmento: Ancho en píxeles de cada segmento del mundo
+
+    Returns:
+        DatosNivel: Nivel compilado
+    """
+    plataformas = _tabla(definicion.get("plataformas", []), 4)
+    monedas = _tabla(definicion.get("monedas", []), 2)
+
+    # Enemigos: (x, y) o (x, y, límite izquierdo, límite derecho)
+    enemigos = [list(enemigo) + [LIMITE_POR_DEFECTO] * (4 - len(enemigo))
+                for enemigo in definicion.get("enemigos", [])]
+    enemigos = _tabla(enemigos, 4)
+
+    # El mundo llega hasta el borde derecho de la plataforma más lejana
+    ancho = max(ancho_segmento, int((plataformas[:, 0] + plataformas[:, 2]).max(initial=0)))
+    num_segmentos = (ancho + ancho_segmento - 1) // ancho_segmento
+
+    # Las plataformas que cruzan un borde de segmento se parten en trozos
+    trozos = []
+    for x, y, ancho_plataforma, alto in plataformas.tolist():
+        while ancho_plataforma > 0:
+            indice = x // ancho_segmento
+            trozo = min(ancho_plataforma, (indice + 1) * ancho_segmento - x)
+            trozos.append((x, y, trozo, alto))
+            x += trozo
+            ancho_plataforma -= trozo
+    plataformas = _tabla(trozos, 4)
+
+    def ordenar(tabla):
+        segmentos = np.clip(tabla[:, 0] // ancho_segmento, 0, num_segmentos - 1)
+        orden = np.argsort(segmentos, kind="stable")
+        return tabla[orden], segmentos[orden]
+
+    plataformas, segmentos_plataformas = ordenar(plataformas)
+    enemigos, segmentos_enemigos = ordenar(enemigos)
+    monedas, segmentos_monedas = ordenar(monedas)
+
+    # Patrulla por defecto: el segmento menos 100 píxeles por lado
+    por_defecto = enemigos[:, 2] == LIMITE_POR_DEFECTO
+    enemigos[por_defecto, 2] = segmentos_enemigos[por_defecto] * ancho_segmento + 100
+    enemigos[por_defecto, 3] = (segmentos_enemigos[por_defecto] + 1) * ancho_segmento - 100
+
+    return DatosNivel(int(definicion.get("tiempo_limite", 120)), definicion.get("fondo", ""),
+                      ancho, ancho_segmento, plataformas, enemigos, monedas,
+                      _inicios(segmentos_plataformas, num_segmentos),
+                      _inicios(segmentos_enemigos, num_segmentos),
+                      _inicios(segmentos_monedas, num_segmentos))
+
+def _escribir_cache(ruta_cache, datos, resumen):
+    """Guarda un nivel compilado en la caché de forma atómica."""
+    fondo = datos.fondo.encode("utf-8")
+    relleno = b"\0" * (-(CABECERA.size + len(fondo)) % 4)
+    cabecera = CABECERA.pack(MAGIA, VERSION_CACHE, resumen, datos.ancho_segmento, datos.ancho, datos.tiempo_limite,
+                             len(datos.plataformas), len(datos.enemigos), len(datos.monedas),
+                             datos.num_segmentos, len(fondo))
+    tablas = [datos.plataformas, datos.enemigos, datos.monedas,
+              datos.inicio_plataformas, datos.inicio_enemigos, datos.inicio_monedas]
+
+    os.makedirs(os.path.dirname(ruta_cache), exist_ok=True)
+    ruta_temporal = ruta_cache + ".tmp"
+    with open(ruta_temporal, "wb") as f:
+        f.write(cabecera + fondo + relleno)
+        for tabla in tablas:
+            f.write(np.ascontiguousarray(tabla, dtype="<i4").tobytes())
+    os.replace(ruta_temporal, ruta_cache)
+
+def _leer_cache(ruta_cache):
+    """
+    Lee un nivel compilado de la caché con una única lectura del archivo.
+
+    Returns:
+        tuple: (cabecera desempaquetada, DatosNivel) o None si no es válida
+    """
+    try:
+        with open(ruta_cache, "rb") as f:
+            contenido = f.read()
+    except OSError:
+        return None
+    if len(contenido) < CABECERA.size:
+        return None
+
+    cabecera = CABECERA.unpack_from(contenido)
+    (magia, version, _, ancho_segmento, ancho, tiempo_limite,
+     num_plataformas, num_enemigos, num_monedas, num_segmentos, longitud_fondo) = cabecera
+    if magia != MAGIA or version != VERSION_CACHE:
+        return None
+
+    posicion = CABECERA.size
+    fondo = contenido[posicion:posicion + longitud_fondo].decode("utf-8")
+    posicion += longitud_fondo + (-(CABECERA.size + longitud_fondo) % 4)
+
+    # Las tablas se obtienen como vistas sobre el contenido leído
+    def tabla(filas, columnas):
+        nonlocal posicion
+        vista = np.frombuffer(contenido, dtype="<i4", count=filas * columnas, offset=posicion)
+        posicion += filas * columnas * 4
+        return vista.reshape(filas, columnas)
+
+    plataformas = tabla(num_plataformas, 4)
+    enemigos = tabla(num_enemigos, 4)
+    monedas = tabla(num_monedas, 2)
+    inicio_plataformas = tabla(num_segmentos + 1, 1).ravel()
+    inicio_enemigos = tabla(num_segmentos + 1, 1).ravel()
+    inicio_monedas = tabla(num_segmentos + 1, 1).ravel()
+
+    datos = DatosNivel(tiempo_limite, fondo, ancho, ancho_segmento, plataformas, enemigos, monedas,
+                       inicio_plataformas, inicio_enemigos, inicio_monedas)
+    return cabecera, datos
+
+def cargar(ruta, ancho_segmento):
+    """
+    Carga un nivel desde su archivo, usando la caché compilada si es válida.
+
+    El archivo se lee siempre y la caché solo se usa si guarda el mismo
+    hash del contenido: leer y resumir el JSON es barato comparado con
+    interpretarlo, y así ninguna edición que conserve la fecha o el tamaño
+    deja datos antiguos.
+
+    Args:
+        ruta: Ruta del archivo JSON del nivel
+        ancho_segmento: Ancho en píxeles de cada segmento del mundo
+
+    Returns:
+        DatosNivel: Nivel compilado
+    """
+    nombre = os.path.splitext(os.path.basename(ruta))[0]
+    # La ruta absoluta forma parte del nombre: dos niveles con el mismo
+    # nombre de archivo en directorios distintos no comparten caché
+    origen = hashlib.sha256(os.path.abspath(ruta).encode("utf-8")).hexdigest()[:16]
+    ruta_cache = os.path.join(DIR_CACHE_NIVELES, f"{nombre}_{origen}_{ancho_segmento}.bin")
+
+    with open(ruta, "rb") as f:
+        contenido = f.read()
+    resumen = hashlib.sha256(contenido).digest()
+
+    leido = _leer_cache(ruta_cache)
+    if leido is not None:
+        cabecera, datos = leido
+        if cabecera[2] == resumen and datos.ancho_segmento == ancho_segmento:
+            return datos
+
+    datos = compilar(json.loads(contenido.decode("utf-8")), ancho_segmento)
+    try:
+        _escribir_cache(ruta_cache, datos, resumen)
+    except OSError as e:
+        print(f"No se pudo guardar la caché del nivel {nombre}: {e}")
+    return datos
@@ -0,0 +1,186 @@
+"""
+Módulo para crear y leer el paquete de recursos del juego SuperNick.
+El paquete guarda todas las imágenes ya convertidas al formato de píxel de
+la pantalla en un único archivo con un índice. En tiempo de ejecución se
+abre con mmap sin decodificar ningún PNG. Las imágenes con alpha se
+construyen directamente sobre los datos mapeados, sin copiarlos. Las opacas
+(entre ellas los fondos) se copian una vez a una superficie con el formato
+de la pantalla: pygame no puede crear sobre un buffer una superficie sin
+alpha con el orden de canales de la pantalla, y dibujar una que no lo tenga
+es bastante más lento en cada frame que esa única copia al cargar.
+
+Uso como paso de construcción: python paquete.py
+"""
+
+import os
+import json
+import mmap
+import struct
+import numpy as np
+import pygame
+
+MAGIA = b"SNPQ"
+VERSION_PAQUETE = 1
+# magia, versión, longitud del índice en bytes
+CABECERA = struct.Struct("<4sII")
+ALINEACION = 16
+
+# Máscaras de las superficies que crea pygame.image.frombuffer con "BGRA"
+MASCARAS_BGRA = [0xFF0000, 0xFF00, 0xFF, 0xFF000000]
+
+def formato_pantalla():
+    """
+    Devuelve el formato de píxel de la pantalla actual.
+
+    Returns:
+        list: [bits por píxel, máscaras RGBA con alpha, máscaras RGBA sin alpha]
+    """
+    con_alpha = pygame.Surface((1, 1), pygame.SRCALPHA).convert_alpha()
+    sin_alpha = pygame.Surface((1, 1)).convert()
+    return [sin_alpha.get_bitsize(), list(con_alpha.get_masks()), list(sin_alpha.get_masks())]
+
+def es_opaca(superficie):
+    """
+    Indica si una superficie no tiene ningún píxel transparente.
+
+    Args:
+        superficie: Superficie a comprobar
+
+    Returns:
+        bool: True si es opaca
+    """
+    if not superficie.get_flags() & pygame.SRCALPHA:
+        return True
+    return int(np.min(pygame.surfarray.array_alpha(superficie), initial=255)) == 255
+
+def convertir(superficie):
+    """Convierte una superficie al formato de la pantalla, sin alpha si es opaca."""
+    if es_opaca(superficie):
+        return superficie.convert()
+    return superficie.convert_alpha()
+
+def _estado_origen(ruta):
+    """Fecha de modificación y tamaño de un archivo de origen."""
+    estado = os.stat(ruta)
+    return [estado.st_mtime_ns, estado.st_size]
+
+def escribir(ruta_paquete, superficies, rutas_origen):
+    """
+    Escribe el paquete de recursos de forma atómica.
+
+    Args:
+        ruta_paquete: Ruta del archivo del paquete
+        superficies: Diccionario nombre -> superficie ya convertida con convertir()
+        rutas_origen: Diccionario nombre -> ruta del archivo de origen
+    """
+    indice = {"formato": formato_pantalla(), "recursos": {}}
+    bloques = []
+    posicion = 0
+    for nombre, superficie in superficies.items():
+        datos = superficie.get_buffer().raw
+        relleno = -len(datos) % ALINEACION
+        indice["recursos"][nombre] = {
+            "posicion": posicion,
+            "ancho": superficie.get_width(),
+            "alto": superficie.get_height(),
+            "pitch": superficie.get_pitch(),
+            "opaca": not superficie.get_flags() & pygame.SRCALPHA,
+            "origen": _estado_origen(rutas_origen[nombre]),
+        }
+        bloques.append(datos + b"\0" * relleno)
+        posicion += len(datos) + relleno
+
+    texto_indice = json.dumps(indice).encode("utf-8")
+    texto_indice += b" " * (-(CABECERA.size + len(texto_indice)) % ALINEACION)
+
+    os.makedirs(os.path.dirname(ruta_paquete), exist_ok=True)
+    ruta_temporal = ruta_paquete + ".tmp"
+    with open(ruta_temporal, "wb") as f:
+        f.write(CABECERA.pack(MAGIA, VERSION_PAQUETE, len(texto_indice)))
+        f.write(texto_indice)
+        for bloque in bloques:
+            f.write(bloque)
+    os.replace(ruta_temporal, ruta_paquete)
+
+class Paquete:
+    """Paquete de recursos abierto con mmap."""
+
+    def __init__(self, ruta_paquete):
+        """
+        Args:
+            ruta_paquete: Ruta del archivo del paquete
+
+        Raises:
+            ValueError: Si el archivo no es un paquete válido
+            OSError: Si no se puede abrir
+        """
+        with open(ruta_paquete, "rb") as f:
+            self.mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.mapa) < CABECERA.size:
+            raise ValueError("paquete truncado")
+        magia, version, longitud_indice = CABECERA.unpack_from(self.mapa)
+        if magia != MAGIA or version != VERSION_PAQUETE:
+            raise ValueError("paquete de otra versión")
+        self.inicio_datos = CABECERA.size + longitud_indice
+        indice = json.loads(bytes(self.mapa[CABECERA.size:self.inicio_datos]))
+        self.formato = indice["formato"]
+        self.recursos = indice["recursos"]
+        self.datos = memoryview(self.mapa)
+
+    def compatible(self, rutas_origen):
+        """
+        Indica si el paquete sirve para la pantalla y los archivos actuales.
+
+        Args:
+            rutas_origen: Diccionario nombre -> ruta del archivo de origen
+
+        Returns:
+            bool: True si el formato coincide y ningún origen ha cambiado
+        """
+        if self.formato != formato_pantalla():
+            return False
+        for nombre, ruta in rutas_origen.items():
+            if nombre not in self.recursos or self.recursos[nombre]["origen"] != _estado_origen(ruta):
+                return False
+        return True
+
+    def superficie(self, nombre):
+        """
+        Construye la superficie de un recurso sobre los datos mapeados.
+
+        Las imágenes con alpha se crean sin copiar píxeles cuando la pantalla
+        usa el formato BGRA; las opacas, y todas si la pantalla usa otro
+        formato, se copian de una vez desde el mmap a una superficie con el
+        formato de la pantalla.
+
+        Args:
+            nombre: Nombre del recurso
+
+        Returns:
+            pygame.Surface: Superficie lista para dibujar
+        """
+        recurso = self.recursos[nombre]
+        tamaño = (recurso["ancho"], recurso["alto"])
+        inicio = self.inicio_datos + recurso["posicion"]
+        datos = self.datos[inicio:inicio + recurso["pitch"] * recurso["alto"]]
+        if recurso["opaca"] or self.formato[1] != MASCARAS_BGRA or recurso["pitch"] != recurso["ancho"] * 4:
+            superficie = pygame.Surface(tamaño, 0 if recurso["opaca"] else pygame.SRCALPHA)
+            superficie = superficie.convert() if recurso["opaca"] else superficie.convert_alpha()
+            # Copia directa desde el mmap; el buffer temporal desbloquea la
+            # superficie al terminar la instrucción
+            np.frombuffer(superficie.get_buffer(), dtype=np.uint8)[:] = np.frombuffer(datos, dtype=np.uint8)
+            return superficie
+        return pygame.image.frombuffer(datos, tamaño, "BGRA")
+
+if __name__ == "__main__":
+    # Paso de construcción: decodificar los PNG y escribir el paquete
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import recursos
+
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    existentes, _ = recursos.verificar_imagenes_existentes()
+    rutas = {nombre: os.path.join(recursos.DIR_IMAGENES, nombre) for nombre in existentes}
+    superficies = {nombre: convertir(pygame.image.load(ruta)) for nombre, ruta in rutas.items()}
+    escribir(recursos.RUTA_PAQUETE, superficies, rutas)
+    print(f"Paquete escrito en {recursos.RUTA_PAQUETE}: {len(superficies)} imágenes")
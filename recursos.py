@@ -1,5 +1,7 @@
 import pygame
 import os
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import paquete
 
 # Directorios de recursos
 DIR_PRINCIPAL = os.path.dirname(os.path.abspath(__file__))
@@ -7,12 +9,25 @@ DIR_ASSETS = os.path.join(DIR_PRINCIPAL, "assets")
 DIR_IMAGENES = os.path.join(DIR_ASSETS, "images")
 DIR_SONIDOS = os.path.join(DIR_ASSETS, "sounds")
 DIR_FUENTES = os.path.join(DIR_ASSETS, "fonts")
+DIR_CACHE = os.path.join(DIR_PRINCIPAL, "cache")  # Datos generados (no se versionan)
+
+# Paquete con las imágenes ya convertidas al formato de la pantalla
+RUTA_PAQUETE = os.path.join(DIR_CACHE, "recursos.paq")
 
 # Diccionarios para almacenar recursos
 imagenes = {}
 sonidos = {}
 fuentes = {}
 
+# Atlas con los sprites del juego a su tamaño de uso
+atlas = None
+
+# Paquete de recursos abierto (sus datos mapeados respaldan las superficies)
+paquete_abierto = None
+
+# Tamaño de cada página del atlas de texturas
+TAMAÑO_PAGINA_ATLAS = (1024, 1024)
+
 # Lista de imágenes necesarias para el juego
 IMAGENES_REQUERIDAS = [
     "nick.png",           # Personaje principal
@@ -29,40 +44,108 @@ IMAGENES_REQUERIDAS = [
     "fondo_menu.png",     # Fondo para el menú
 ]
 
-def cargar_imagen(nombre, escala=1):
-    """Carga una imagen desde el directorio de imágenes."""
-    if nombre in imagenes:
-        return imagenes[nombre]
-    
-    try:
-        ruta_completa = os.path.join(DIR_IMAGENES, nombre)
-        print(f"Intentando cargar: {ruta_completa}")
-        print(f"¿El archivo existe? {os.path.exists(ruta_completa)}")
-        
-        imagen = pygame.image.load(ruta_completa).convert_alpha()
-        
-        # Imprimir información de depuración para plataforma.png y enemigo.png
-        if nombre == "plataforma.png" or nombre == "enemigo.png":
-            print(f"DEBUG - {nombre} cargada:")
-            print(f"  - Tamaño: {imagen.get_width()}x{imagen.get_height()}")
-            print(f"  - Tiene canal alpha: {imagen.get_alpha() is not None}")
-            print(f"  - Ruta: {ruta_completa}")
-        
-        if escala != 1:
-            ancho_original = imagen.get_width()
-            alto_original = imagen.get_height()
-            nuevo_ancho = int(ancho_original * escala)
-            nuevo_alto = int(alto_original * escala)
-            imagen = pygame.transform.scale(imagen, (nuevo_ancho, nuevo_alto))
-            
-        imagenes[nombre] = imagen
-        return imagen
-    except pygame.error as e:
-        print(f"No se pudo cargar la imagen {nombre}: {e}")
-        # Crear una superficie de reemplazo (para desarrollo)
-        superficie = pygame.Surface((50, 50))
-        superficie.fill((255, 0, 255))  # Magenta para indicar error
-        return superficie
+class AtlasTexturas:
+    """
+    Empaqueta imágenes ya escaladas en superficies grandes (páginas) con el
+    formato de píxel de la pantalla.
+
+    Cada imagen se pide por su nombre en recursos.imagenes y el tamaño al que
+    se va a dibujar; los sprites reciben una subsuperficie de la página, que
+    no copia píxeles. Las imágenes se colocan por estantes: filas de la
+    altura de la imagen más alta que contienen.
+    """
+
+    def __init__(self, tamaño_pagina=TAMAÑO_PAGINA_ATLAS):
+        self.tamaño_pagina = tamaño_pagina
+        self.paginas = []  # Superficies del atlas
+        self.estantes = []  # Por página: lista de [y, alto, x libre]
+        self.regiones = {}  # (nombre, tamaño) -> subsuperficie
+
+    def _nueva_pagina(self, ancho, alto):
+        """Crea una página vacía en el formato de la pantalla y devuelve su índice."""
+        pagina = pygame.Surface((ancho, alto), pygame.SRCALPHA)
+        if pygame.display.get_surface() is not None:
+            pagina = pagina.convert_alpha()
+        pagina.fill((0, 0, 0, 0))
+        self.paginas.append(pagina)
+        self.estantes.append([])
+        return len(self.paginas) - 1
+
+    def _colocar(self, ancho, alto):
+        """
+        Busca sitio para un rectángulo de ancho x alto.
+
+        Returns:
+            tuple: (índice de página, x, y)
+        """
+        ancho_pagina, alto_pagina = self.tamaño_pagina
+        if ancho > ancho_pagina or alto > alto_pagina:
+            # Las imágenes más grandes que una página van en una página propia
+            return self._nueva_pagina(ancho, alto), 0, 0
+
+        for indice, estantes in enumerate(self.estantes):
+            if self.paginas[indice].get_size() != self.tamaño_pagina:
+                continue
+            for estante in estantes:
+                y, alto_estante, x_libre = estante
+                if alto <= alto_estante and x_libre + ancho <= ancho_pagina:
+                    estante[2] += ancho
+                    return indice, x_libre, y
+            y_libre = estantes[-1][0] + estantes[-1][1] if estantes else 0
+            if y_libre + alto <= alto_pagina:
+                estantes.append([y_libre, alto, ancho])
+                return indice, 0, y_libre
+
+        indice = self._nueva_pagina(ancho_pagina, alto_pagina)
+        self.estantes[indice].append([0, alto, ancho])
+        return indice, 0, 0
+
+    def asegurar(self, peticiones):
+        """
+        Añade al atlas las imágenes que todavía no estén.
+
+        Args:
+            peticiones: Iterable de (nombre, tamaño); tamaño es (ancho, alto)
+                o None para usar el tamaño original de la imagen
+        """
+        pendientes = []
+        for nombre, tamaño in peticiones:
+            clave = (nombre, tuple(tamaño) if tamaño else None)
+            if clave not in self.regiones and clave not in pendientes:
+                pendientes.append(clave)
+
+        # Las más altas primero para llenar mejor los estantes
+        imagenes_escaladas = []
+        for nombre, tamaño in pendientes:
+            imagen = imagenes[nombre]
+            if tamaño and tamaño != imagen.get_size():
+                imagen = pygame.transform.scale(imagen, tamaño)
+            imagenes_escaladas.append(((nombre, tamaño), imagen))
+        imagenes_escaladas.sort(key=lambda elemento: elemento[1].get_height(), reverse=True)
+
+        for clave, imagen in imagenes_escaladas:
+            ancho, alto = imagen.get_size()
+            indice, x, y = self._colocar(ancho, alto)
+            pagina = self.paginas[indice]
+            # Copia exacta (también del canal alpha) sobre la zona transparente
+            pagina.blit(imagen, (x, y), special_flags=pygame.BLEND_RGBA_MAX)
+            self.regiones[clave] = pagina.subsurface((x, y, ancho, alto))
+
+    def obtener(self, nombre, tamaño=None):
+        """
+        Devuelve la subsuperficie de una imagen a un tamaño, añadiéndola si falta.
+
+        Args:
+            nombre: Nombre de la imagen en recursos.imagenes
+            tamaño: (ancho, alto) al que se dibuja, o None para el original
+
+        Returns:
+            pygame.Surface: Subsuperficie del atlas
+        """
+        clave = (nombre, tuple(tamaño) if tamaño else None)
+        if clave not in self.regiones:
+            self.asegurar([clave])
+        return self.regiones[clave]
 
 def cargar_sonido(nombre):
     """Carga un sonido desde el directorio de sonidos."""
@@ -79,14 +162,17 @@ def cargar_sonido(nombre):
         return None
 
 def cargar_fuente(nombre, tamaño):
-    """Carga una fuente desde el directorio de fuentes o usa la predeterminada."""
+    """
+    Carga una fuente desde el directorio de fuentes o usa la predeterminada.
+    Con nombre None se usa directamente la fuente predeterminada de pygame.
+    """
     clave = f"{nombre}_{tamaño}"
     
     if clave in fuentes:
         return fuentes[clave]
     
     try:
-        ruta_completa = os.path.join(DIR_FUENTES, nombre)
+        ruta_completa = os.path.join(DIR_FUENTES, nombre) if nombre else None
         fuente = pygame.font.Font(ruta_completa, tamaño)
         fuentes[clave] = fuente
         return fuente
@@ -155,26 +241,165 @@ def verificar_imagenes_existentes():
     
     return imagenes_existentes, imagenes_faltantes
 
-def inicializar_recursos():
-    """Inicializa todos los recursos necesarios para el juego."""
-    # Verificar qué imágenes existen
-    imagenes_existentes, imagenes_faltantes = verificar_imagenes_existentes()
-    
-    # Cargar imágenes existentes
-    for nombre in imagenes_existentes:
-        cargar_imagen(nombre)
-        print(f"Imagen cargada: {nombre}")
+def _decodificar(nombre):
+    """Decodifica una imagen del disco (se ejecuta en un hilo del pool)."""
+    return pygame.image.load(os.path.join(DIR_IMAGENES, nombre))
+
+class CargaImagenes:
+    """
+    Carga de las imágenes del juego en segundo plano.
+
+    Los PNG se decodifican en un pool de hilos; la conversión al formato de
+    la pantalla se hace en el hilo principal al llamar a finalizar(), que no
+    bloquea y solo procesa las imágenes ya decodificadas. Al terminar se
+    escribe el paquete de recursos para que el siguiente arranque no tenga
+    que decodificar nada.
+
+    Si el paquete de recursos está al día no se decodifica nada: la primera
+    llamada a finalizar() crea las superficies sobre sus datos.
+    """
+
+    def __init__(self, nombres, hilos=None, desde_paquete=None):
+        self.nombres = list(nombres)
+        self.total = len(nombres)
+        self.completadas = 0
+        self.errores = []
+        self.desde_paquete = desde_paquete
+        self.ejecutor = None
+        self.pendientes = {}
+        if self.nombres and desde_paquete is None:
+            self.ejecutor = ThreadPoolExecutor(max_workers=hilos or min(4, os.cpu_count() or 1),
+                                               thread_name_prefix="recursos")
+            self.pendientes = {self.ejecutor.submit(_decodificar, nombre): nombre
+                               for nombre in self.nombres}
+        self.terminada = False
+
+    @property
+    def progreso(self):
+        """Fracción de imágenes ya cargadas (0.0 a 1.0)."""
+        return self.completadas / self.total if self.total else 1.0
+
+    def finalizar(self, espera=0):
+        """
+        Convierte y guarda las imágenes ya decodificadas.
+
+        Args:
+            espera: Segundos que se puede esperar a que termine alguna imagen
+
+        Returns:
+            bool: True si la carga ha terminado
+        """
+        if self.terminada:
+            return True
+        if self.desde_paquete is not None:
+            for nombre in self.nombres:
+                imagenes[nombre] = self.desde_paquete.superficie(nombre)
+            self.completadas = self.total
+            _completar_carga()
+            self.terminada = True
+            return True
+        
+        listas = []
+        if self.pendientes:
+            listas, _ = wait(self.pendientes, timeout=espera, return_when=FIRST_COMPLETED)
+        for futuro in listas:
+            nombre = self.pendientes.pop(futuro)
+            try:
+                imagenes[nombre] = paquete.convertir(futuro.result())
+            except pygame.error as e:
+                print(f"No se pudo cargar la imagen {nombre}: {e}")
+                self.errores.append(nombre)
+            self.completadas += 1
+        if not self.pendientes:
+            if self.ejecutor is not None:
+                self.ejecutor.shutdown(wait=False)
+            if self.nombres and not self.errores:
+                _guardar_paquete(self.nombres)
+            _completar_carga()
+            self.terminada = True
+        return self.terminada
+
+    def esperar(self, al_progresar=None, intervalo=1 / 30):
+        """
+        Bloquea hasta que se hayan cargado todas las imágenes.
+
+        Args:
+            al_progresar: Función al_progresar(progreso) llamada mientras se
+                espera, por ejemplo para dibujar una pantalla de carga
+            intervalo: Segundos máximos entre llamadas a al_progresar
+        """
+        while not self.finalizar(intervalo):
+            if al_progresar is not None:
+                al_progresar(self.progreso)
+
+def _rutas_origen(nombres):
+    """Rutas de los archivos de las imágenes."""
+    return {nombre: os.path.join(DIR_IMAGENES, nombre) for nombre in nombres}
+
+def _guardar_paquete(nombres):
+    """Escribe el paquete de recursos con las imágenes ya convertidas."""
+    try:
+        paquete.escribir(RUTA_PAQUETE, {nombre: imagenes[nombre] for nombre in nombres},
+                         _rutas_origen(nombres))
+    except OSError as e:
+        print(f"No se pudo guardar el paquete de recursos: {e}")
+
+def _abrir_paquete(nombres):
+    """
+    Abre el paquete de recursos si existe y corresponde a las imágenes actuales.
+
+    Returns:
+        paquete.Paquete: Paquete abierto, o None si hay que decodificar los PNG
+    """
+    try:
+        abierto = paquete.Paquete(RUTA_PAQUETE)
+    except (OSError, ValueError):
+        return None
+    return abierto if abierto.compatible(_rutas_origen(nombres)) else None
+
+def _completar_carga():
+    """Crea las imágenes que faltan y el atlas cuando termina la carga."""
+    global atlas
     
+    imagenes_faltantes = [nombre for nombre in IMAGENES_REQUERIDAS if nombre not in imagenes]
     # Crear imágenes temporales para las que faltan
     if imagenes_faltantes:
-        print("Algunas imágenes no se encontraron. Usando imágenes temporales:")
-        for nombre in imagenes_faltantes:
-            print(f"  - {nombre}")
+        print(f"Usando imágenes temporales para: {', '.join(imagenes_faltantes)}")
         crear_imagenes_temporales()
     else:
         print("Todas las imágenes se cargaron correctamente.")
         
+    # Atlas vacío: cada parte del juego añade sus imágenes al tamaño de uso.
+    # Se crea una sola vez; al volver a inicializar se reutiliza con lo que
+    # ya tenga empaquetado
+    if atlas is None:
+        atlas = AtlasTexturas()
+
+def iniciar_carga():
+    """
+    Empieza a cargar en segundo plano las imágenes del juego.
+
+    Returns:
+        CargaImagenes: Carga en curso; hay que llamar a su método finalizar()
+            o esperar() desde el hilo principal
+    """
+    global paquete_abierto
+    
+    imagenes_existentes, _ = verificar_imagenes_existentes()
+    pendientes = [nombre for nombre in imagenes_existentes if nombre not in imagenes]
+    
+    # Con el paquete al día las superficies se crearán sobre sus datos, sin
+    # decodificar PNG ni lanzar hilos
+    abierto = _abrir_paquete(pendientes) if pendientes else None
+    if abierto is not None:
+        paquete_abierto = abierto
+    return CargaImagenes(pendientes, desde_paquete=abierto)
+
+def inicializar_recursos():
+    """Inicializa todos los recursos necesarios para el juego, esperando a que se carguen."""
+    iniciar_carga().esperar()
+        
     # Aquí se cargarían los sonidos cuando estén disponibles
     # Por ejemplo:
     # cargar_sonido("salto.wav")
-    # etc. 
\ No newline at end of file
+    # etc.
@@ -0,0 +1,127 @@
+"""
+Módulo de renderizado de SuperNick.
+Incluye la cámara que sigue a Nick por niveles más anchos que la pantalla y
+el renderizado por rectángulos sucios (dirty rects): en lugar de redibujar y
+volcar la pantalla completa cada frame, restaura solo las zonas que ocupaban
+los elementos móviles en el frame anterior y actualiza en pantalla
+únicamente esas zonas y las nuevas. Las plataformas de cada segmento se
+componen en una superficie al cargarlo, de modo que desplazar la cámara no
+obliga a volver a componer nada.
+"""
+
+import pygame
+
+class Camara:
+    """Ventana horizontal sobre el mundo que sigue a un objetivo."""
+
+    def __init__(self, ancho_mundo, ancho_vista, alto_vista):
+        self.ancho_mundo = ancho_mundo
+        self.ancho_vista = ancho_vista
+        self.alto_vista = alto_vista
+        self.x = 0
+
+    def seguir(self, x_objetivo):
+        """
+        Centra la cámara en una posición horizontal sin salirse del mundo.
+
+        Args:
+            x_objetivo: Posición horizontal del objetivo en el mundo
+        """
+        x = int(round(x_objetivo)) - self.ancho_vista // 2
+        self.x = max(0, min(x, self.ancho_mundo - self.ancho_vista))
+
+    @property
+    def vista(self):
+        """Rectángulo visible en coordenadas del mundo."""
+        return pygame.Rect(self.x, 0, self.ancho_vista, self.alto_vista)
+
+class CapaEstatica:
+    """
+    Contenido que no se mueve de los segmentos cargados, una superficie por segmento.
+
+    Cada superficie se compone una sola vez, al cargar su segmento, y se
+    descarta al liberarlo; mientras la cámara se desplaza, dibujar la capa
+    es un blit por segmento visible. Cada superficie cubre solo el
+    rectángulo que ocupan los sprites del segmento y es transparente fuera
+    de ellos, para dibujarse sobre el fondo con paralaje, que va aparte.
+    """
+
+    def __init__(self):
+        # Índice de segmento -> (superficie compuesta, zona del mundo que cubre)
+        self.superficies = {}
+
+    def crear(self, indice, sprites):
+        """
+        Compone la superficie de un segmento.
+
+        Args:
+            indice: Índice del segmento
+            sprites: Sprites del segmento, con su rect en coordenadas del mundo
+        """
+        if not sprites:
+            self.superficies.pop(indice, None)
+            return
+        zona = sprites[0].rect.unionall([sprite.rect for sprite in sprites])
+        superficie = pygame.Surface(zona.size, pygame.SRCALPHA)
+        superficie.blits([(sprite.image, sprite.rect.move(-zona.x, -zona.y)) for sprite in sprites],
+                         doreturn=False)
+        # Codificada por tramos (RLE): el blit se salta las zonas transparentes
+        superficie.set_alpha(255, pygame.RLEACCEL)
+        self.superficies[indice] = (superficie, zona)
+
+    def liberar(self, indice):
+        """Descarta la superficie de un segmento."""
+        self.superficies.pop(indice, None)
+
+    def dibujar(self, pantalla, camara_x):
+        """
+        Dibuja las superficies de los segmentos que caen en la pantalla.
+
+        Args:
+            pantalla: Superficie donde dibujar
+            camara_x: Posición horizontal de la cámara en el mundo
+        """
+        derecha = camara_x + pantalla.get_width()
+        pantalla.blits([(superficie, (zona.x - camara_x, zona.y))
+                        for superficie, zona in self.superficies.values()
+                        if zona.right > camara_x and zona.x < derecha],
+                       doreturn=False)
+
+class RenderizadorParcial:
+    """Gestiona los rectángulos sucios entre un frame y el siguiente."""
+
+    def __init__(self, pantalla):
+        self.pantalla = pantalla
+        self.rects_anteriores = []  # Zonas dibujadas en el frame anterior
+        self.completo = True  # True si el próximo frame debe ser completo
+
+    def invalidar(self):
+        """Obliga a que el próximo frame se dibuje y vuelque completo."""
+        self.completo = True
+
+    def restaurar(self, restaurar_zona):
+        """
+        Restaura el contenido estático bajo los elementos del frame anterior.
+
+        Args:
+            restaurar_zona: Función restaurar_zona(pantalla, rect) que dibuja
+                el contenido estático dentro de rect
+        """
+        if self.completo:
+            return
+        for rect in self.rects_anteriores:
+            restaurar_zona(self.pantalla, rect)
+
+    def presentar(self, rects):
+        """
+        Vuelca a la pantalla las zonas modificadas en este frame.
+
+        Args:
+            rects: Rectángulos dibujados en este frame
+        """
+        if self.completo:
+            pygame.display.flip()
+            self.completo = False
+        else:
+            pygame.display.update(self.rects_anteriores + rects)
+        self.rects_anteriores = rects
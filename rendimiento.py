@@ -0,0 +1,286 @@
+"""
+Módulo de medición de rendimiento del juego SuperNick.
+Incluye el cronómetro del arranque, que mide cuánto tarda cada fase desde
+que se lanza el juego hasta que se muestra el primer frame, el medidor de
+frames, que mide cada fase del bucle principal y la muestra en pantalla, y
+la captura de perfiles por muestreo, que guarda las pilas del hilo
+principal en el formato "collapsed" de las herramientas de flamegraph.
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import Counter
+import numpy as np
+import pygame
+import recursos
+
+class CronometroArranque:
+    """Duración de las fases consecutivas del arranque."""
+
+    def __init__(self, inicio=None):
+        """
+        Args:
+            inicio: Instante de inicio según time.perf_counter() (None para ahora)
+        """
+        self.inicio = inicio if inicio is not None else time.perf_counter()
+        self.ultima_marca = self.inicio
+        self.fases = []  # Lista de (nombre, segundos)
+
+    def marcar(self, nombre):
+        """
+        Cierra la fase en curso; su duración es el tiempo desde la marca anterior.
+
+        Args:
+            nombre: Nombre de la fase que acaba de terminar
+        """
+        ahora = time.perf_counter()
+        self.fases.append((nombre, ahora - self.ultima_marca))
+        self.ultima_marca = ahora
+
+    @property
+    def total(self):
+        """Segundos desde el inicio hasta la última marca."""
+        return self.ultima_marca - self.inicio
+
+    def informe(self):
+        """
+        Devuelve un resumen legible de las fases.
+
+        Returns:
+            str: Una línea por fase con su duración en milisegundos
+        """
+        ancho = max((len(nombre) for nombre, _ in self.fases), default=0)
+        lineas = [f"  {nombre:<{ancho}}  {segundos * 1000:8.1f} ms" for nombre, segundos in self.fases]
+        lineas.append(f"  {'total':<{ancho}}  {self.total * 1000:8.1f} ms")
+        return "Tiempos de arranque:\n" + "\n".join(lineas)
+
+class MedidorFrames:
+    """
+    Tiempo de cada fase del bucle principal en los últimos frames.
+
+    El bucle llama a marcar(fase) al terminar cada fase; el tiempo desde la
+    marca anterior se suma a esa fase en el frame en curso. Desactivado,
+    cada llamada solo comprueba un atributo y vuelve.
+    """
+
+    FASES = ("eventos", "sprites", "enemigos y monedas", "colisiones",
+             "dibujo del nivel", "hud", "volcado")
+    CAPACIDAD = 240  # Frames que se guardan para las estadísticas y la gráfica
+    FRAMES_POR_REFRESCO = 15  # Frames entre recomposiciones del panel
+    ANCHO_PANEL = 300
+    ALTO_GRAFICA = 60
+    MS_GRAFICA = 33.3  # Milisegundos que corresponden al alto de la gráfica
+    MS_OBJETIVO = 1000 / 60  # Línea de referencia de la gráfica
+
+    def __init__(self):
+        self.activo = False
+        self.indices = {fase: i for i, fase in enumerate(self.FASES)}
+        # Una fila por frame: tiempo de cada fase y, al final, el total
+        self.muestras = np.zeros((self.CAPACIDAD, len(self.FASES) + 1))
+        self.frame_actual = np.zeros(len(self.FASES))
+        self.num_frames = 0
+        self.inicio_frame = 0.0
+        self.ultima_marca = 0.0
+        self.panel = None
+
+    def alternar(self):
+        """Activa o desactiva la medición; al activarla empieza de cero."""
+        self.activo = not self.activo
+        self.num_frames = 0
+        self.panel = None
+
+    def empezar_frame(self):
+        """Marca el inicio de un frame."""
+        if not self.activo:
+            return
+        self.frame_actual[:] = 0.0
+        self.inicio_frame = self.ultima_marca = time.perf_counter()
+
+    def marcar(self, fase):
+        """
+        Suma a una fase el tiempo transcurrido desde la marca anterior.
+
+        Args:
+            fase: Nombre de la fase (uno de FASES)
+        """
+        if not self.activo:
+            return
+        ahora = time.perf_counter()
+        self.frame_actual[self.indices[fase]] += ahora - self.ultima_marca
+        self.ultima_marca = ahora
+
+    def descartar(self):
+        """Ignora el tiempo desde la marca anterior (por ejemplo, el del propio panel)."""
+        if not self.activo:
+            return
+        self.ultima_marca = time.perf_counter()
+
+    def terminar_frame(self):
+        """Guarda las fases del frame y su duración total."""
+        if not self.activo:
+            return
+        fila = self.muestras[self.num_frames % self.CAPACIDAD]
+        fila[:-1] = self.frame_actual
+        fila[-1] = time.perf_counter() - self.inicio_frame
+        self.num_frames += 1
+
+    def estadisticas(self):
+        """
+        Calcula la mediana y el percentil 99 de cada fase y del frame completo.
+
+        Returns:
+            list: (nombre, p50 en ms, p99 en ms) por fase, y "frame" al final
+        """
+        muestras = self.muestras[:min(self.num_frames, self.CAPACIDAD)] * 1000
+        if not len(muestras):
+            return []
+        p50, p99 = np.percentile(muestras, (50, 99), axis=0)
+        nombres = self.FASES + ("frame",)
+        return list(zip(nombres, p50.tolist(), p99.tolist()))
+
+    def componer_panel(self):
+        """Dibuja el panel con la tabla de tiempos y la gráfica de frames."""
+        fuente = recursos.cargar_fuente(None, 20)
+        estadisticas = self.estadisticas()
+        alto_linea = fuente.get_linesize()
+        alto = alto_linea * (len(estadisticas) + 1) + self.ALTO_GRAFICA + 12
+        panel = pygame.Surface((self.ANCHO_PANEL, alto))
+        panel.fill((0, 0, 0))
+
+        y = 4
+        for texto, x in (("fase", 6), ("p50 ms", 170), ("p99 ms", 235)):
+            panel.blit(fuente.render(texto, True, (160, 160, 160)), (x, y))
+        for nombre, p50, p99 in estadisticas:
+            y += alto_linea
+            color = (255, 255, 0) if nombre == "frame" else (255, 255, 255)
+            panel.blit(fuente.render(nombre, True, color), (6, y))
+            panel.blit(fuente.render(f"{p50:6.2f}", True, color), (170, y))
+            panel.blit(fuente.render(f"{p99:6.2f}", True, color), (235, y))
+
+        # Gráfica con la duración de los últimos frames, el más reciente a la derecha
+        grafica = pygame.Rect(6, y + alto_linea + 4, self.ANCHO_PANEL - 12, self.ALTO_GRAFICA)
+        pygame.draw.rect(panel, (40, 40, 40), grafica)
+        escala = grafica.height / self.MS_GRAFICA
+        y_objetivo = grafica.bottom - int(self.MS_OBJETIVO * escala)
+        pygame.draw.line(panel, (0, 160, 0), (grafica.left, y_objetivo), (grafica.right - 1, y_objetivo))
+        cantidad = min(self.num_frames, self.CAPACIDAD, grafica.width)
+        if cantidad > 1:
+            ultimos = np.arange(self.num_frames - cantidad, self.num_frames) % self.CAPACIDAD
+            alturas = np.minimum(self.muestras[ultimos, -1] * 1000 * escala, grafica.height)
+            puntos = [(grafica.right - cantidad + i, grafica.bottom - 1 - int(h))
+                      for i, h in enumerate(alturas.tolist())]
+            pygame.draw.lines(panel, (255, 80, 80), False, puntos)
+        self.panel = panel
+
+    def dibujar(self, pantalla, posicion=(10, 90)):
+        """
+        Dibuja el panel si el medidor está activo.
+
+        Args:
+            pantalla: Superficie donde dibujar
+            posicion: Esquina superior izquierda del panel
+
+        Returns:
+            pygame.Rect: Zona dibujada, o None si está desactivado
+        """
+        if not self.activo:
+            return None
+        if self.panel is None or self.num_frames % self.FRAMES_POR_REFRESCO == 0:
+            self.componer_panel()
+        rect = pantalla.blit(self.panel, posicion)
+        self.descartar()
+        return rect
+
+# Medidor compartido por el bucle principal y las funciones que instrumenta
+medidor = MedidorFrames()
+
+# Directorio donde se guardan las capturas de perfil
+DIR_PERFILES = os.path.join(recursos.DIR_PRINCIPAL, "perfiles")
+
+class CapturaPerfil:
+    """
+    Perfil por muestreo del hilo principal durante unos segundos.
+
+    Un hilo aparte lee la pila del hilo principal a intervalos fijos, así
+    que la captura cubre todo lo que ocurra: partida, menús o la creación
+    de un nivel. Al terminar escribe un archivo de texto con una línea por
+    pila distinta, "funcion_exterior;...;funcion_interior muestras", que
+    leen flamegraph.pl, speedscope o inferno.
+    """
+
+    INTERVALO = 0.001  # Segundos entre muestras
+
+    def __init__(self):
+        self.hilo = None
+        self.ultima_ruta = None
+
+    @property
+    def en_curso(self):
+        return self.hilo is not None and self.hilo.is_alive()
+
+    def iniciar(self, duracion, ruta=None):
+        """
+        Empieza a capturar durante un tiempo; no hace nada si ya hay una en curso.
+
+        Args:
+            duracion: Segundos que dura la captura
+            ruta: Archivo de salida (None para uno con fecha en DIR_PERFILES)
+
+        Returns:
+            bool: True si se ha iniciado la captura
+        """
+        if self.en_curso:
+            return False
+        if ruta is None:
+            ruta = os.path.join(DIR_PERFILES, time.strftime("perfil_%Y%m%d_%H%M%S.txt"))
+        self.hilo = threading.Thread(target=self._muestrear,
+                                     args=(threading.get_ident(), duracion, ruta),
+                                     name="perfil", daemon=True)
+        self.hilo.start()
+        print(f"Capturando perfil durante {duracion} s")
+        return True
+
+    @staticmethod
+    def _pila(frame):
+        """Convierte la pila de un frame en la cadena "exterior;...;interior"."""
+        nombres = []
+        while frame is not None:
+            codigo = frame.f_code
+            nombres.append(f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:"
+                           f"{codigo.co_firstlineno})")
+            frame = frame.f_back
+        return ";".join(reversed(nombres))
+
+    def _muestrear(self, id_hilo, duracion, ruta):
+        """Bucle del hilo de muestreo."""
+        muestras = Counter()
+        # Con el intervalo de cambio de hilo por defecto (5 ms) el muestreo
+        # no podría ir más deprisa
+        intervalo_anterior = sys.getswitchinterval()
+        sys.setswitchinterval(self.INTERVALO)
+        try:
+            fin = time.perf_counter() + duracion
+            while time.perf_counter() < fin:
+                frame = sys._current_frames().get(id_hilo)
+                if frame is None:
+                    break  # El hilo principal ha terminado
+                muestras[self._pila(frame)] += 1
+                del frame
+                time.sleep(self.INTERVALO)
+        finally:
+            sys.setswitchinterval(intervalo_anterior)
+
+        try:
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(ruta, "w", encoding="utf-8") as f:
+                for pila, cantidad in muestras.most_common():
+                    f.write(f"{pila} {cantidad}\n")
+            self.ultima_ruta = ruta
+            print(f"Perfil guardado en {ruta} ({sum(muestras.values())} muestras)")
+        except OSError as e:
+            print(f"No se pudo guardar el perfil: {e}")
+
+# Captura compartida, iniciada con F4 o con --perfilar
+captura = CapturaPerfil()
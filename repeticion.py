@@ -0,0 +1,301 @@
+"""
+Módulo para grabar y reproducir partidas del juego SuperNick.
+Una grabación guarda el nivel, la semilla y las entradas de cada paso de
+lógica, codificadas como tramos de entradas iguales, y fotografías
+periódicas del estado de la partida (fotogramas clave). Como la lógica
+avanza en pasos fijos, reproducir las mismas entradas por el mismo camino
+(aplicar_entradas y actualizar_partida) da exactamente la misma partida, y
+los fotogramas clave permiten saltar a cualquier paso sin reproducir desde
+el principio.
+
+Uso:
+    python repeticion.py ARCHIVO               Mostrar el contenido de una grabación
+    python repeticion.py ARCHIVO --frame N     Saltar al paso N y mostrar el estado
+    python repeticion.py ARCHIVO --verificar   Reproducir entera y comprobar los fotogramas clave
+"""
+
+import os
+import sys
+import time
+import zlib
+import struct
+import hashlib
+import numpy as np
+import recursos
+import niveles
+import instantaneas
+
+# Directorio donde se guardan las grabaciones de las partidas
+DIR_GRABACIONES = os.path.join(recursos.DIR_PRINCIPAL, "grabaciones")
+
+MAGIA = b"SNRP"
+VERSION_GRABACION = 2  # 2: fotogramas clave en el formato de instantaneas.py
+# magia, versión, número de nivel, semilla, sha256 del archivo del nivel,
+# pasos grabados, pasos entre fotogramas clave, nº de tramos de entradas,
+# nº de fotogramas clave, longitud de la ruta del nivel
+CABECERA = struct.Struct("<4sIiQ32sIIIII")
+# Tramo de entradas: pasos seguidos con las mismas entradas y sus bits
+TRAMO = np.dtype([("pasos", "<u2"), ("bits", "u1")])
+# Fotograma clave: paso y longitud de su estado comprimido
+CLAVE = struct.Struct("<II")
+
+# Bits de las entradas de un paso
+IZQUIERDA = 1
+DERECHA = 2
+SALTAR = 4
+
+# Pasos de lógica entre fotogramas clave (10 segundos de juego)
+INTERVALO_CLAVES = 600
+
+def codificar_entradas(izquierda, derecha, saltar):
+    """Convierte las entradas de un paso en sus bits."""
+    return (IZQUIERDA if izquierda else 0) | (DERECHA if derecha else 0) | (SALTAR if saltar else 0)
+
+def decodificar_entradas(bits):
+    """
+    Convierte los bits de un paso en sus entradas.
+
+    Returns:
+        tuple: (izquierda, derecha, saltar)
+    """
+    return bool(bits & IZQUIERDA), bool(bits & DERECHA), bool(bits & SALTAR)
+
+def _tramos(entradas):
+    """Agrupa los bits de cada paso en tramos de bits iguales."""
+    entradas = np.asarray(entradas, dtype=np.uint8)
+    if not len(entradas):
+        return np.zeros(0, dtype=TRAMO)
+    cambios = np.flatnonzero(np.diff(entradas)) + 1
+    inicios = np.concatenate(([0], cambios))
+    longitudes = np.diff(np.concatenate((inicios, [len(entradas)])))
+    # Los tramos de más de 65535 pasos se parten en varios
+    partes = (longitudes + 0xFFFF - 1) // 0xFFFF
+    tramos = np.zeros(int(partes.sum()), dtype=TRAMO)
+    tramos["bits"] = np.repeat(entradas[inicios], partes)
+    tramos["pasos"] = 0xFFFF
+    ultimos = np.cumsum(partes) - 1
+    tramos["pasos"][ultimos] = longitudes - (partes - 1) * 0xFFFF
+    return tramos
+
+def resumen_nivel(ruta):
+    """Hash del archivo de un nivel, para detectar si ha cambiado desde la grabación."""
+    with open(ruta, "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+def capturar_estado(nivel, jugador):
+    """
+    Guarda el estado de la partida para un fotograma clave.
+
+    Args:
+        nivel: Nivel en curso
+        jugador: Instancia de Nick
+
+    Returns:
+        bytes: Instantánea del estado (ver instantaneas.py)
+    """
+    return instantaneas.capturar(nivel, jugador).tobytes()
+
+def restaurar_estado(nivel, jugador, estado):
+    """
+    Devuelve la partida al estado guardado con capturar_estado().
+
+    Args:
+        nivel: Nivel creado con el mismo archivo que el del estado
+        jugador: Instancia de Nick
+        estado: Bytes devueltos por capturar_estado()
+    """
+    instantanea = np.frombuffer(estado, dtype=instantaneas.formato_nivel(nivel), count=1)[0]
+    instantaneas.restaurar(nivel, jugador, instantanea)
+
+class Grabacion:
+    """Entradas y fotogramas clave de una partida en un nivel."""
+
+    def __init__(self, nivel_numero, semilla, resumen, entradas=None, claves=None, ruta_nivel=""):
+        """
+        Args:
+            nivel_numero: Número del nivel
+            semilla: Semilla del generador aleatorio de la partida
+            resumen: sha256 del archivo del nivel
+            entradas: Array uint8 con los bits de las entradas de cada paso
+            claves: Diccionario paso -> estado de capturar_estado()
+            ruta_nivel: Archivo del nivel si no es el de assets/niveles
+        """
+        self.nivel_numero = nivel_numero
+        self.semilla = semilla
+        self.resumen = resumen
+        self.entradas = np.zeros(0, dtype=np.uint8) if entradas is None else entradas
+        self.claves = {} if claves is None else claves
+        self.ruta_nivel = ruta_nivel
+
+    @property
+    def num_frames(self):
+        return len(self.entradas)
+
+    def entradas_del_paso(self, frame):
+        """
+        Devuelve las entradas del paso que lleva la partida del paso frame al frame + 1.
+
+        Returns:
+            tuple: (izquierda, derecha, saltar)
+        """
+        return decodificar_entradas(int(self.entradas[frame]))
+
+    def clave_anterior(self, frame):
+        """Devuelve el paso del último fotograma clave que no pasa de frame."""
+        anteriores = [paso for paso in self.claves if paso <= frame]
+        if not anteriores:
+            raise ValueError(f"No hay fotogramas clave antes del paso {frame}")
+        return max(anteriores)
+
+    def guardar(self, ruta):
+        """
+        Escribe la grabación de forma atómica.
+
+        Args:
+            ruta: Archivo de destino
+        """
+        tramos = _tramos(self.entradas)
+        ruta_nivel = self.ruta_nivel.encode("utf-8")
+        partes = [CABECERA.pack(MAGIA, VERSION_GRABACION, self.nivel_numero, self.semilla,
+                                self.resumen, self.num_frames, INTERVALO_CLAVES, len(tramos),
+                                len(self.claves), len(ruta_nivel)),
+                  ruta_nivel, tramos.tobytes()]
+        for paso in sorted(self.claves):
+            comprimido = zlib.compress(self.claves[paso])
+            partes.append(CLAVE.pack(paso, len(comprimido)))
+            partes.append(comprimido)
+
+        os.makedirs(os.path.dirname(os.path.abspath(ruta)), exist_ok=True)
+        ruta_temporal = ruta + ".tmp"
+        with open(ruta_temporal, "wb") as f:
+            f.write(b"".join(partes))
+        os.replace(ruta_temporal, ruta)
+
+    @classmethod
+    def leer(cls, ruta):
+        """
+        Lee una grabación.
+
+        Args:
+            ruta: Archivo de la grabación
+
+        Returns:
+            Grabacion: Grabación leída
+
+        Raises:
+            ValueError: Si el archivo no es una grabación válida
+        """
+        with open(ruta, "rb") as f:
+            contenido = f.read()
+        if len(contenido) < CABECERA.size:
+            raise ValueError("grabación truncada")
+        (magia, version, nivel_numero, semilla, resumen, num_frames, _,
+         num_tramos, num_claves, longitud_ruta) = CABECERA.unpack_from(contenido)
+        if magia != MAGIA or version != VERSION_GRABACION:
+            raise ValueError("grabación de otra versión")
+
+        posicion = CABECERA.size
+        ruta_nivel = contenido[posicion:posicion + longitud_ruta].decode("utf-8")
+        posicion += longitud_ruta
+        tramos = np.frombuffer(contenido, dtype=TRAMO, count=num_tramos, offset=posicion)
+        posicion += tramos.nbytes
+        entradas = np.repeat(tramos["bits"], tramos["pasos"])
+        if len(entradas) != num_frames:
+            raise ValueError("grabación dañada")
+
+        claves = {}
+        for _ in range(num_claves):
+            paso, longitud = CLAVE.unpack_from(contenido, posicion)
+            posicion += CLAVE.size
+            claves[paso] = zlib.decompress(contenido[posicion:posicion + longitud])
+            posicion += longitud
+        return cls(nivel_numero, semilla, resumen, entradas, claves, ruta_nivel)
+
+class Grabadora:
+    """
+    Graba las entradas de una partida mientras se juega.
+
+    Se crea al empezar la partida, recibe las entradas de cada paso de
+    lógica justo antes de aplicarlas y se guarda al terminar.
+    """
+
+    def __init__(self, nivel, jugador):
+        """
+        Args:
+            nivel: Nivel de la partida, recién creado o reiniciado; se graba
+                la semilla de su generador aleatorio
+            jugador: Instancia de Nick
+        """
+        ruta_nivel = "" if nivel.ruta == niveles.ruta_nivel(nivel.numero) else nivel.ruta
+        self.grabacion = Grabacion(nivel.numero, nivel.semilla, resumen_nivel(nivel.ruta),
+                                   ruta_nivel=ruta_nivel)
+        self.nivel = nivel
+        self.jugador = jugador
+        self.entradas = bytearray()
+
+    def registrar(self, izquierda, derecha, saltar):
+        """
+        Guarda las entradas del siguiente paso de lógica.
+
+        Cada INTERVALO_CLAVES pasos guarda también el estado anterior al paso.
+        """
+        if len(self.entradas) % INTERVALO_CLAVES == 0:
+            self.grabacion.claves[len(self.entradas)] = capturar_estado(self.nivel, self.jugador)
+        self.entradas.append(codificar_entradas(izquierda, derecha, saltar))
+
+    def guardar(self, ruta=None):
+        """
+        Guarda la grabación con un fotograma clave del estado final.
+
+        Args:
+            ruta: Archivo de salida (None para uno con fecha en DIR_GRABACIONES)
+
+        Returns:
+            str: Ruta del archivo guardado, o None si no se pudo guardar
+        """
+        if ruta is None:
+            nombre = time.strftime(f"partida_%Y%m%d_%H%M%S_nivel{self.nivel.numero}.snr")
+            ruta = os.path.join(DIR_GRABACIONES, nombre)
+        grabacion = self.grabacion
+        grabacion.entradas = np.frombuffer(bytes(self.entradas), dtype=np.uint8)
+        grabacion.claves[len(self.entradas)] = capturar_estado(self.nivel, self.jugador)
+        try:
+            grabacion.guardar(ruta)
+        except OSError as e:
+            print(f"No se pudo guardar la grabación: {e}")
+            return None
+        print(f"Grabación guardada en {ruta} ({grabacion.num_frames} pasos)")
+        return ruta
+
+if __name__ == "__main__":
+    import argparse
+    import simulacion
+
+    parser = argparse.ArgumentParser(description="Reproducir grabaciones de SuperNick")
+    parser.add_argument("archivo", help="Archivo de la grabación")
+    parser.add_argument("--frame", type=int, help="Saltar a este paso y mostrar el estado")
+    parser.add_argument("--verificar", action="store_true",
+                        help="Reproducir desde el principio y comparar con cada fotograma clave")
+    opciones = parser.parse_args()
+
+    grabacion = Grabacion.leer(opciones.archivo)
+    print(f"Nivel {grabacion.nivel_numero}{' (' + grabacion.ruta_nivel + ')' if grabacion.ruta_nivel else ''}, "
+          f"semilla {grabacion.semilla}, {grabacion.num_frames} pasos, "
+          f"{len(grabacion.claves)} fotogramas clave, {os.path.getsize(opciones.archivo)} bytes")
+
+    reproduccion = simulacion.Reproduccion(grabacion)
+    if opciones.frame is not None:
+        inicio = time.perf_counter()
+        sim = reproduccion.ir_a(opciones.frame)
+        duracion = time.perf_counter() - inicio
+        nick = sim.nick
+        print(f"Paso {sim.frame} en {duracion * 1000:.1f} ms: Nick en {nick.rect.topleft}, "
+              f"vidas {nick.vidas}, puntuación {nick.puntuacion}, "
+              f"tiempo {sim.nivel.tiempo_restante}, monedas restantes {sim.nivel.monedas_restantes}")
+
+    if opciones.verificar:
+        diferencias = reproduccion.verificar()
+        if diferencias:
+            print(f"La reproducción no coincide en los pasos {diferencias}")
+            sys.exit(1)
+        print("La reproducción coincide con todos los fotogramas clave")
@@ -0,0 +1,241 @@
+"""
+Módulo de simulación sin ventana para el juego SuperNick.
+Permite avanzar un Nivel y a Nick frame a frame sin pantalla, sin limitar
+los FPS y sin sistema de sonido, para pruebas por lotes y benchmarks.
+"""
+
+import os
+import sys
+import time
+from collections import namedtuple
+
+import pygame
+import recursos
+import repeticion
+import instantaneas
+import main
+
+# Entradas de un frame: flechas pulsadas y si se pulsó saltar en ese frame
+Entradas = namedtuple("Entradas", ["izquierda", "derecha", "saltar"])
+SIN_ENTRADAS = Entradas(False, False, False)
+
+# Duración simulada de un frame (un paso de lógica) en milisegundos
+MS_POR_FRAME = main.PASO_LOGICO * 1000.0
+
+_inicializado = False
+
+def inicializar_sin_ventana():
+    """
+    Inicializa pygame con el driver de vídeo "dummy" y carga las imágenes.
+    No abre ventana ni inicializa el mezclador de sonido.
+    """
+    global _inicializado
+
+    if _inicializado:
+        return
+
+    # El driver "dummy" de SDL debe elegirse antes de inicializar el vídeo
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+    # Superficie mínima: convert_alpha necesita un modo de vídeo activo
+    pygame.display.set_mode((1, 1))
+    recursos.inicializar_recursos()
+    _inicializado = True
+
+class Simulacion:
+    """Núcleo de simulación de una partida en un nivel."""
+
+    def __init__(self, nivel_numero=1, ruta=None, historial=0, semilla=None):
+        """
+        Args:
+            nivel_numero: Número del nivel
+            ruta: Archivo del nivel (None para el de assets/niveles)
+            historial: Pasos recientes que se guardan para volver a ellos
+                con rebobinar() (0 para no guardar ninguno)
+            semilla: Semilla del generador aleatorio del nivel (None para una nueva)
+        """
+        inicializar_sin_ventana()
+
+        self.nivel_numero = nivel_numero
+        self.nivel = main.Nivel(nivel_numero, ruta, semilla)
+        self.nick = main.Nick()
+        self.todos_los_sprites = pygame.sprite.Group()
+        self.todos_los_sprites.add(self.nick)
+
+        self.estado = main.JUGANDO
+        self.frame = 0
+        self.historial = instantaneas.Historial(self.nivel, historial) if historial else None
+
+    def reiniciar(self):
+        """Vuelve a empezar la partida reutilizando el nivel y Nick, como al reintentar."""
+        self.nivel.reiniciar()
+        self.nick.reiniciar()
+        self.estado = main.JUGANDO
+        self.frame = 0
+
+    @property
+    def tiempo_simulado(self):
+        """Tiempo simulado transcurrido en milisegundos."""
+        return int(self.frame * MS_POR_FRAME)
+
+    @property
+    def terminada(self):
+        """True si la partida ha acabado (victoria o game over)."""
+        return self.estado != main.JUGANDO
+
+    def step(self, entradas=SIN_ENTRADAS):
+        """
+        Avanza un frame de la simulación.
+
+        Args:
+            entradas: Entradas del frame (izquierda, derecha, saltar)
+
+        Returns:
+            int: Estado del juego tras el frame (JUGANDO, GAME_OVER o VICTORIA)
+        """
+        if self.terminada:
+            return self.estado
+
+        if self.historial is not None:
+            self.historial.guardar(self.frame, self.nivel, self.nick)
+        self.frame += 1
+        main.aplicar_entradas(self.nick, entradas.izquierda, entradas.derecha, entradas.saltar)
+        nuevo_estado = main.actualizar_partida(self.nivel, self.nick, self.todos_los_sprites)
+        if nuevo_estado:
+            self.estado = nuevo_estado
+
+        return self.estado
+
+    def rebobinar(self, frame):
+        """
+        Vuelve al estado de un frame reciente para simular de nuevo desde él,
+        por ejemplo con otras entradas (rollback).
+
+        Args:
+            frame: Frame anterior al actual que siga en el historial
+
+        Raises:
+            KeyError: Si el frame no está en el historial
+        """
+        if self.historial is None or frame >= self.frame:
+            raise KeyError(f"El frame {frame} no está en el historial")
+        self.historial.restaurar(frame, self.nivel, self.nick)
+        self.frame = frame
+        self.estado = main.JUGANDO
+
+    def ejecutar(self, entradas, max_frames=None):
+        """
+        Ejecuta la simulación con una secuencia de entradas hasta que termine.
+
+        Args:
+            entradas: Iterable de Entradas (una por frame)
+            max_frames: Número máximo de frames a simular (None sin límite)
+
+        Returns:
+            int: Estado final del juego
+        """
+        for entrada in entradas:
+            if self.terminada or (max_frames is not None and self.frame >= max_frames):
+                break
+            self.step(entrada)
+        return self.estado
+
+class Reproduccion:
+    """
+    Reproduce una grabación por el mismo camino de lógica que el juego.
+
+    Para llegar a un paso se restaura el fotograma clave anterior y se
+    simulan solo los pasos que faltan desde él.
+    """
+
+    def __init__(self, grabacion):
+        """
+        Args:
+            grabacion: repeticion.Grabacion a reproducir
+        """
+        self.grabacion = grabacion
+        self.ruta_nivel = grabacion.ruta_nivel or None
+        ruta = self.ruta_nivel or main.niveles.ruta_nivel(grabacion.nivel_numero)
+        if repeticion.resumen_nivel(ruta) != grabacion.resumen:
+            print(f"Aviso: el nivel {grabacion.nivel_numero} ha cambiado desde la grabación")
+
+    def desde_clave(self, paso):
+        """
+        Crea una simulación en el estado del fotograma clave de un paso.
+
+        Args:
+            paso: Paso de un fotograma clave de la grabación
+
+        Returns:
+            Simulacion: Simulación en ese paso
+        """
+        # La lógica del juego aún no usa números aleatorios, así que los
+        # fotogramas clave no guardan el estado del generador: solo desde el
+        # paso 0 sigue la misma secuencia que en la partida grabada
+        simulacion = Simulacion(self.grabacion.nivel_numero, self.ruta_nivel,
+                                semilla=self.grabacion.semilla)
+        repeticion.restaurar_estado(simulacion.nivel, simulacion.nick, self.grabacion.claves[paso])
+        simulacion.frame = paso
+        return simulacion
+
+    def avanzar(self, simulacion, hasta):
+        """
+        Simula los pasos grabados hasta llegar al paso indicado o al final.
+
+        Returns:
+            Simulacion: La misma simulación
+        """
+        hasta = min(hasta, self.grabacion.num_frames)
+        while simulacion.frame < hasta and not simulacion.terminada:
+            simulacion.step(Entradas(*self.grabacion.entradas_del_paso(simulacion.frame)))
+        return simulacion
+
+    def ir_a(self, frame):
+        """
+        Devuelve una simulación en el paso indicado sin reproducir desde el principio.
+
+        Args:
+            frame: Paso de lógica al que saltar
+
+        Returns:
+            Simulacion: Simulación en ese paso (o en el último si la grabación es más corta)
+        """
+        frame = max(0, min(frame, self.grabacion.num_frames))
+        return self.avanzar(self.desde_clave(self.grabacion.clave_anterior(frame)), frame)
+
+    def verificar(self):
+        """
+        Reproduce la grabación desde el principio y la compara con cada fotograma clave.
+
+        Returns:
+            list: Pasos cuyo estado no coincide con el grabado (vacía si todo coincide)
+        """
+        simulacion = self.desde_clave(0)
+        diferencias = []
+        for paso in sorted(self.grabacion.claves):
+            self.avanzar(simulacion, paso)
+            estado = repeticion.capturar_estado(simulacion.nivel, simulacion.nick)
+            if simulacion.frame != paso or estado != self.grabacion.claves[paso]:
+                diferencias.append(paso)
+        return diferencias
+
+def entradas_constantes(entrada=SIN_ENTRADAS):
+    """Generador infinito que repite siempre las mismas entradas."""
+    while True:
+        yield entrada
+
+if __name__ == "__main__":
+    # Uso: python simulacion.py [nivel] [frames]
+    nivel_numero = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    frames = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+
+    simulacion = Simulacion(nivel_numero)
+    inicio = time.perf_counter()
+    simulacion.ejecutar(entradas_constantes(Entradas(False, True, False)), frames)
+    duracion = time.perf_counter() - inicio
+
+    print(f"Nivel {nivel_numero}: {simulacion.frame} frames en {duracion:.3f} s "
+          f"({simulacion.frame / max(duracion, 1e-9):.0f} frames/s, "
+          f"estado final {simulacion.estado})")
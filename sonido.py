@@ -1,9 +1,13 @@
 """
 Módulo para gestionar el sonido del juego SuperNick.
+Los efectos se sintetizan con NumPy en el formato real del mezclador y se
+guardan en una caché en disco para no repetir la síntesis en cada arranque.
 """
 
 import pygame
 import os
+import hashlib
+import numpy as np
 import recursos
 
 # Constantes
@@ -13,121 +17,156 @@ VOLUMEN_EFECTOS = 0.7
 # Diccionario para almacenar efectos de sonido
 efectos = {}
 
+# Caché en disco de los efectos sintetizados
+DIR_CACHE_SONIDOS = os.path.join(recursos.DIR_CACHE, "sonidos")
+VERSION_SINTESIS = 2  # Cambiar si cambia la forma de sintetizar
+
+# Efectos sintéticos: nombre -> (frecuencia inicial en Hz, variación de la
+# frecuencia en Hz por segundo, duración en segundos)
+EFECTOS_SINTETICOS = {
+    "salto": (440, 0, 0.3),       # Tono agudo
+    "moneda": (880, 0, 0.1),      # Tono más agudo y corto
+    "dano": (220, 0, 0.5),        # Tono grave
+    "victoria": (440, 440, 1.0),  # Secuencia ascendente
+    "game_over": (880, -660, 1.0),  # Secuencia descendente
+}
+
+# Tipo de muestra de NumPy para cada tamaño que devuelve mixer.get_init()
+# (negativo: con signo). Con 32 bits pygame siempre devuelve -32 y SDL usa
+# muestras en coma flotante entre -1 y 1
+TIPOS_MUESTRA = {
+    8: np.uint8,
+    -8: np.int8,
+    16: np.uint16,
+    -16: np.int16,
+    -32: np.float32,
+}
+
+# Formato por defecto si el mezclador no está inicializado: 44,1 kHz, 16 bits
+# con signo, mono
+FORMATO_POR_DEFECTO = (44100, -16, 1)
+
 def inicializar():
-    """Inicializa el sistema de sonido."""
-    pygame.mixer.init()
+    """Inicializa el sistema de sonido; no hace nada si ya está inicializado."""
+    if pygame.mixer.get_init() is not None and efectos:
+        return
+    try:
+        pygame.mixer.init()
+    except pygame.error as e:
+        print(f"No se pudo inicializar el sonido: {e}")
+        return
     cargar_efectos_temporales()
 
 def cargar_efectos_temporales():
     """Crea efectos de sonido temporales para desarrollo."""
     # En una implementación real, estos serían archivos de sonido
-    # Por ahora, creamos sonidos sintéticos para pruebas
-    
-    # Sonido de salto (tono agudo)
-    salto = pygame.mixer.Sound(buffer=crear_sonido_sintetico(440, 0.3))
-    salto.set_volume(VOLUMEN_EFECTOS)
-    efectos["salto"] = salto
-    
-    # Sonido de moneda (tono más agudo y corto)
-    moneda = pygame.mixer.Sound(buffer=crear_sonido_sintetico(880, 0.1))
-    moneda.set_volume(VOLUMEN_EFECTOS)
-    efectos["moneda"] = moneda
-    
-    # Sonido de daño (tono grave)
-    dano = pygame.mixer.Sound(buffer=crear_sonido_sintetico(220, 0.5))
-    dano.set_volume(VOLUMEN_EFECTOS)
-    efectos["dano"] = dano
-    
-    # Sonido de victoria (secuencia ascendente)
-    victoria = pygame.mixer.Sound(buffer=crear_sonido_victoria())
-    victoria.set_volume(VOLUMEN_EFECTOS)
-    efectos["victoria"] = victoria
-    
-    # Sonido de game over (secuencia descendente)
-    game_over = pygame.mixer.Sound(buffer=crear_sonido_game_over())
-    game_over.set_volume(VOLUMEN_EFECTOS)
-    efectos["game_over"] = game_over
+    # Por ahora, creamos sonidos sintéticos en el formato del mezclador
+    formato = pygame.mixer.get_init()
+    if formato is None:
+        return
+    
+    for nombre, (frecuencia, variacion, duracion) in EFECTOS_SINTETICOS.items():
+        buffer = obtener_buffer(frecuencia, variacion, duracion, formato)
+        efecto = pygame.mixer.Sound(buffer=buffer)
+        efecto.set_volume(VOLUMEN_EFECTOS)
+        efectos[nombre] = efecto
 
-def crear_sonido_sintetico(frecuencia, duracion):
+def sintetizar(frecuencia, variacion, duracion, formato=FORMATO_POR_DEFECTO):
     """
-    Crea un sonido sintético con una frecuencia y duración específicas.
+    Genera una onda sinusoidal en un único paso vectorizado.
     
     Args:
-        frecuencia: Frecuencia del sonido en Hz
+        frecuencia: Frecuencia inicial en Hz
+        variacion: Variación de la frecuencia en Hz por segundo
         duracion: Duración del sonido en segundos
+        formato: Tupla (frecuencia de muestreo, tamaño, canales) como la
+            devuelve pygame.mixer.get_init()
         
     Returns:
-        bytearray: Buffer de audio
+        bytes: Buffer de audio en el formato indicado
     """
-    import math
-    import array
-    
-    # Parámetros de audio
-    bits = 16
-    sample_rate = 44100
+    sample_rate, tamaño, canales = formato
+    tipo = np.dtype(TIPOS_MUESTRA[tamaño])
     
     # Calcular número de muestras
     n_samples = int(round(duracion * sample_rate))
-    
-    # Crear buffer
-    buf = array.array('h', [0] * n_samples)
-    
-    # Generar onda sinusoidal
-    for i in range(n_samples):
-        t = float(i) / sample_rate
-        buf[i] = int(32767.0 * math.sin(2.0 * math.pi * frecuencia * t))
-    
-    return buf
+    t = np.arange(n_samples) / sample_rate
+    onda = np.sin(2.0 * np.pi * (frecuencia + variacion * t) * t)
+    
+    # Convertir al tipo de muestra del mezclador
+    if tipo.kind == "f":
+        muestras = onda.astype(tipo)
+    else:
+        maximo = np.iinfo(tipo).max
+        if tipo.kind == "u":
+            # Sin signo: el silencio está en la mitad del rango
+            muestras = ((onda + 1.0) * (maximo / 2.0)).astype(tipo)
+        else:
+            muestras = (onda * maximo).astype(tipo)
+    
+    # Misma señal en todos los canales, intercalada por muestra
+    if canales > 1:
+        muestras = np.repeat(muestras, canales)
+    return muestras.tobytes()
 
-def crear_sonido_victoria():
-    """Crea un sonido de victoria (secuencia ascendente)."""
-    import math
-    import array
+def obtener_buffer(frecuencia, variacion, duracion, formato=FORMATO_POR_DEFECTO):
+    """
+    Devuelve el buffer de un efecto, leyéndolo de la caché en disco si existe.
     
-    # Parámetros de audio
-    bits = 16
-    sample_rate = 44100
-    duracion = 1.0
+    La caché se indexa por los parámetros de la onda y el formato del
+    mezclador, así que un arranque con la caché llena no sintetiza nada.
     
-    # Calcular número de muestras
-    n_samples = int(round(duracion * sample_rate))
+    Args:
+        frecuencia: Frecuencia inicial en Hz
+        variacion: Variación de la frecuencia en Hz por segundo
+        duracion: Duración del sonido en segundos
+        formato: Tupla (frecuencia de muestreo, tamaño, canales)
+        
+    Returns:
+        bytes: Buffer de audio en el formato indicado
+    """
+    parametros = repr((VERSION_SINTESIS, frecuencia, variacion, duracion, tuple(formato)))
+    clave = hashlib.sha256(parametros.encode("utf-8")).hexdigest()[:16]
+    ruta_cache = os.path.join(DIR_CACHE_SONIDOS, f"{clave}.pcm")
     
-    # Crear buffer
-    buf = array.array('h', [0] * n_samples)
+    try:
+        with open(ruta_cache, "rb") as f:
+            return f.read()
+    except OSError:
+        pass
     
-    # Generar secuencia ascendente
-    for i in range(n_samples):
-        t = float(i) / sample_rate
-        # Frecuencia que aumenta con el tiempo
-        freq = 440 + 440 * t
-        buf[i] = int(32767.0 * math.sin(2.0 * math.pi * freq * t))
+    buffer = sintetizar(frecuencia, variacion, duracion, formato)
+    try:
+        os.makedirs(DIR_CACHE_SONIDOS, exist_ok=True)
+        ruta_temporal = ruta_cache + ".tmp"
+        with open(ruta_temporal, "wb") as f:
+            f.write(buffer)
+        os.replace(ruta_temporal, ruta_cache)
+    except OSError as e:
+        print(f"No se pudo guardar la caché de sonido: {e}")
+    return buffer
+
+def crear_sonido_sintetico(frecuencia, duracion, formato=FORMATO_POR_DEFECTO):
+    """
+    Crea un sonido sintético con una frecuencia y duración específicas.
     
-    return buf
+    Args:
+        frecuencia: Frecuencia del sonido en Hz
+        duracion: Duración del sonido en segundos
+        formato: Tupla (frecuencia de muestreo, tamaño, canales)
+        
+    Returns:
+        bytes: Buffer de audio
+    """
+    return obtener_buffer(frecuencia, 0, duracion, formato)
+
+def crear_sonido_victoria(formato=FORMATO_POR_DEFECTO):
+    """Crea un sonido de victoria (secuencia ascendente)."""
+    return obtener_buffer(*EFECTOS_SINTETICOS["victoria"], formato)
 
-def crear_sonido_game_over():
+def crear_sonido_game_over(formato=FORMATO_POR_DEFECTO):
     """Crea un sonido de game over (secuencia descendente)."""
-    import math
-    import array
-    
-    # Parámetros de audio
-    bits = 16
-    sample_rate = 44100
-    duracion = 1.0
-    
-    # Calcular número de muestras
-    n_samples = int(round(duracion * sample_rate))
-    
-    # Crear buffer
-    buf = array.array('h', [0] * n_samples)
-    
-    # Generar secuencia descendente
-    for i in range(n_samples):
-        t = float(i) / sample_rate
-        # Frecuencia que disminuye con el tiempo
-        freq = 880 - 660 * t
-        buf[i] = int(32767.0 * math.sin(2.0 * math.pi * freq * t))
-    
-    return buf
+    return obtener_buffer(*EFECTOS_SINTETICOS["game_over"], formato)
 
 def reproducir_efecto(nombre):
     """